@@ -0,0 +1,46 @@
+import unittest
+
+from Benchmarks import benchmark_network, compare_to_baseline, time_call
+
+
+class BenchmarkTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.options = {'num_of_inputs': 8, 'num_of_outputs': 3, 'epoch_size': 16, 'min_time': 0.0, 'repeats': 2}
+
+    def test_time_call(self):
+        print("\nTime Call Test:")
+        calls = []
+        call_times = time_call(lambda: calls.append(1), min_time=0.001, repeats=3)
+        self.assertEqual(len(call_times), 3)
+        self.assertTrue(all(call_time > 0 for call_time in call_times))
+        self.assertGreater(len(calls), 3)
+
+    def test_per_sample_benchmarks(self):
+        print("\nPer Sample Benchmark Test:")
+        results = benchmark_network(4, 2, 'relu', 1, **self.options)
+        self.assertEqual([result['benchmark'] for result in results],
+                         ['forward_prop', 'back_prop', 'update_weights', 'update_biases', 'epoch'])
+
+    def test_batched_benchmarks(self):
+        print("\nBatched Benchmark Test:")
+        results = benchmark_network(4, 1, 'sigmoid', 8, **self.options)
+        self.assertEqual([result['benchmark'] for result in results],
+                         ['predict', 'compute_gradients', 'apply_gradients', 'epoch'])
+        for result in results:
+            self.assertGreater(result['samples_per_second'], 0)
+
+    def test_compare_to_baseline(self):
+        print("\nBaseline Comparison Test:")
+        baseline_results = benchmark_network(4, 1, 'sigmoid', 8, **self.options)
+        results = [dict(result) for result in baseline_results]
+        results[0]['samples_per_second'] = baseline_results[0]['samples_per_second'] * 0.5
+        results[1]['samples_per_second'] = baseline_results[1]['samples_per_second'] * 0.9
+
+        regressions = compare_to_baseline(results, baseline_results, tolerance=0.2)
+        self.assertEqual(len(regressions), 1)
+        self.assertEqual(regressions[0][0]['benchmark'], 'predict')
+        self.assertAlmostEqual(regressions[0][2], -0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
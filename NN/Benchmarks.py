@@ -0,0 +1,309 @@
+"""
+Measures the throughput and latency of the Network's forward, backward
+and update steps over a sweep of layer widths, depths, activations and
+batch sizes
+
+Run from the NN folder:
+    python Benchmarks.py --quick --output results.json
+    python Benchmarks.py --quick --save-baseline benchmark_baseline.json
+    python Benchmarks.py --quick --baseline benchmark_baseline.json
+
+Comparing against a baseline exits with status 1 if any benchmark's
+samples/sec dropped by more than the tolerance, so it can gate a deploy.
+Baselines are only meaningful on the machine that recorded them.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+from Network import Network
+
+SWEEPS = {
+    'full': {
+        'widths': [32, 128, 512],
+        'depths': [1, 2, 3],
+        'activations': ['sigmoid', 'relu'],
+        'batch_sizes': [1, 32, 256],
+    },
+    'quick': {
+        'widths': [32, 128],
+        'depths': [1, 2],
+        'activations': ['sigmoid'],
+        'batch_sizes': [1, 64],
+    },
+}
+
+RESULT_KEYS = ('benchmark', 'width', 'depth', 'activation', 'batch_size', 'dtype')
+
+
+def time_call(function, min_time=0.05, repeats=5):
+    """
+    Times a function the way `timeit` does
+
+    Parameters
+    ----------
+    function : callable
+        Called with no arguments
+
+    min_time : float
+        Each repeat calls the function enough times to take at least this many seconds
+
+    repeats : int
+        How many repeats to time
+
+    Returns
+    -------
+    call_times : list
+        The mean seconds per call for each repeat
+    """
+    function()
+    num_of_calls = 1
+    while True:
+        start_time = time.perf_counter()
+        for _ in range(num_of_calls):
+            function()
+        elapsed_time = time.perf_counter() - start_time
+        if elapsed_time >= min_time:
+            break
+        num_of_calls *= 2
+
+    call_times = [elapsed_time / num_of_calls]
+    for _ in range(repeats - 1):
+        start_time = time.perf_counter()
+        for _ in range(num_of_calls):
+            function()
+        call_times.append((time.perf_counter() - start_time) / num_of_calls)
+    return call_times
+
+
+def _make_network(num_of_inputs, width, depth, activation, num_of_outputs, dtype):
+    layers = {f'layer{index + 1}': {'activation': activation, 'neurons': width} for index in range(depth)}
+    network = Network(num_of_inputs, layers, dtype)
+    network.add_layer(num_of_outputs)
+    network.learning_rate = 0.01
+    return network
+
+
+def benchmark_network(width, depth, activation, batch_size, num_of_inputs=784, num_of_outputs=10,
+                      epoch_size=2048, dtype=np.float64, min_time=0.05, repeats=5):
+    """
+    Benchmarks one network layout
+
+    The per-sample methods (`forward_prop`, `back_prop`, `update_weights` and
+    `update_biases`) are only timed for a batch size of 1. Larger batch sizes
+    time the batched steps instead: `predict` for the forward pass,
+    `compute_gradients` for the forward and backward pass and `apply_gradients`
+    for the update. `epoch` times `train` over `epoch_size` samples.
+
+    Parameters
+    ----------
+    width : int
+        The number of neurons in each hidden layer
+
+    depth : int
+        The number of hidden layers
+
+    activation : str
+        The activation of the hidden layers
+
+    batch_size : int
+        How many samples go through each call
+
+    num_of_inputs : int
+        The size of each sample, 784 is an MNIST image
+
+    num_of_outputs : int
+        The size of the sigmoid output layer
+
+    epoch_size : int
+        How many samples are in the epoch benchmark
+
+    dtype : np.dtype
+        The network's float type
+
+    min_time : float
+        See `time_call`
+
+    repeats : int
+        See `time_call`
+
+    Returns
+    -------
+    results : list
+        One dict per benchmark with the layout, the median latency
+        per call in seconds and the samples per second
+    """
+    np.random.seed(0)
+    network = _make_network(num_of_inputs, width, depth, activation, num_of_outputs, dtype)
+    inputs = np.random.random_sample((max(batch_size, epoch_size), num_of_inputs)).astype(dtype)
+    labels = np.eye(num_of_outputs, dtype=dtype)[np.random.randint(0, num_of_outputs, len(inputs))]
+    batch_inputs, batch_labels = inputs[:batch_size], labels[:batch_size]
+
+    if batch_size == 1:
+        sample, label = batch_inputs[0], batch_labels[0]
+        network.forward_prop(sample)
+        network.back_prop(label)
+        calls = {
+            'forward_prop': lambda: network.forward_prop(sample),
+            'back_prop': lambda: network.back_prop(label),
+            'update_weights': lambda: network.update_weights(sample),
+            'update_biases': network.update_biases,
+        }
+    else:
+        network.compute_gradients(batch_inputs, batch_labels)
+        calls = {
+            'predict': lambda: network.predict(batch_inputs),
+            'compute_gradients': lambda: network.compute_gradients(batch_inputs, batch_labels),
+            'apply_gradients': network.apply_gradients,
+        }
+
+    results = []
+    # Repeating the same update many times can overflow the weights, only the timings matter here
+    with np.errstate(over='ignore', invalid='ignore'):
+        for benchmark, function in calls.items():
+            latency = float(np.median(time_call(function, min_time, repeats)))
+            results.append(_result(benchmark, width, depth, activation, batch_size, dtype, latency, batch_size))
+
+        epoch = lambda: network.train(inputs[:epoch_size], labels[:epoch_size], batch_size=batch_size, epochs=1)
+        latency = float(np.median(time_call(epoch, min_time, max(repeats // 2, 1))))
+        results.append(_result('epoch', width, depth, activation, batch_size, dtype, latency, epoch_size))
+    return results
+
+
+def _result(benchmark, width, depth, activation, batch_size, dtype, latency, num_of_samples):
+    return {
+        'benchmark': benchmark,
+        'width': width,
+        'depth': depth,
+        'activation': activation,
+        'batch_size': batch_size,
+        'dtype': np.dtype(dtype).name,
+        'latency': latency,
+        'samples_per_second': num_of_samples / latency,
+    }
+
+
+def run_suite(widths, depths, activations, batch_sizes, dtype=np.float64, verbose=True, **benchmark_options):
+    """
+    Runs `benchmark_network` over every combination of the sweep
+
+    Returns
+    -------
+    results : list
+        Every result from every layout
+    """
+    results = []
+    for width, depth, activation, batch_size in itertools.product(widths, depths, activations, batch_sizes):
+        layout_results = benchmark_network(width, depth, activation, batch_size, dtype=dtype, **benchmark_options)
+        if verbose:
+            for result in layout_results:
+                print(_format_result(result))
+        results.extend(layout_results)
+    return results
+
+
+def _format_result(result):
+    return (f'{result["benchmark"]:<18}width {result["width"]:<5}depth {result["depth"]:<3}'
+            f'{result["activation"]:<9}batch {result["batch_size"]:<5}{result["dtype"]:<9}'
+            f'{result["latency"] * 1e6:>12.1f}us {result["samples_per_second"]:>14.0f} samples/s')
+
+
+def _result_key(result):
+    return tuple(result[key] for key in RESULT_KEYS)
+
+
+def compare_to_baseline(results, baseline_results, tolerance=0.2):
+    """
+    Finds benchmarks that got slower than a baseline
+
+    Parameters
+    ----------
+    results : list
+        Results from `run_suite`
+
+    baseline_results : list
+        Earlier results, only benchmarks in both are compared
+
+    tolerance : float
+        The fraction samples/sec can drop by before it counts as a regression
+
+    Returns
+    -------
+    regressions : list
+        (result, baseline result, change in samples/sec as a fraction) for each regression
+    """
+    baseline = {_result_key(result): result for result in baseline_results}
+    regressions = []
+    for result in results:
+        baseline_result = baseline.get(_result_key(result))
+        if baseline_result is None:
+            continue
+        change = result['samples_per_second'] / baseline_result['samples_per_second'] - 1
+        if change < -tolerance:
+            regressions.append((result, baseline_result, change))
+    return regressions
+
+
+def _environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def _save_results(path, results):
+    with open(path, 'w') as results_file:
+        json.dump({'environment': _environment(), 'results': results}, results_file, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--quick', action='store_true', help='run the small sweep')
+    parser.add_argument('--widths', type=int, nargs='+')
+    parser.add_argument('--depths', type=int, nargs='+')
+    parser.add_argument('--activations', nargs='+')
+    parser.add_argument('--batch-sizes', type=int, nargs='+')
+    parser.add_argument('--dtype', default='float64', choices=['float64', 'float32'])
+    parser.add_argument('--min-time', type=float, default=0.05, help='seconds per timing repeat')
+    parser.add_argument('--output', help='write the results to this json file')
+    parser.add_argument('--save-baseline', help='write the results to this json file as the new baseline')
+    parser.add_argument('--baseline', help='compare the results against this baseline json file')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed drop in samples/sec, 0.2 is 20%%')
+    args = parser.parse_args(argv)
+
+    sweep = dict(SWEEPS['quick' if args.quick else 'full'])
+    for option in ('widths', 'depths', 'activations', 'batch_sizes'):
+        if getattr(args, option):
+            sweep[option] = getattr(args, option)
+
+    results = run_suite(dtype=np.dtype(args.dtype), min_time=args.min_time, **sweep)
+
+    if args.output:
+        _save_results(args.output, results)
+    if args.save_baseline:
+        _save_results(args.save_baseline, results)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline_results = json.load(baseline_file)['results']
+        regressions = compare_to_baseline(results, baseline_results, args.tolerance)
+
+        print(f'\n{len(regressions)} regressions against {args.baseline}')
+        for result, baseline_result, change in regressions:
+            print(f'{_format_result(result)}   was {baseline_result["samples_per_second"]:.0f} ({change:+.0%})')
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,150 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from Callbacks import Callback, RollingStats, LogWriter, SamplingProfiler, ThrottledProgress
+from Network import Network
+
+np.random.seed(0)
+
+
+class RecordingCallback(Callback):
+    def __init__(self):
+        self.calls = []
+
+    def on_train_start(self, network, logs):
+        self.calls.append('train_start')
+
+    def on_epoch_start(self, network, logs):
+        self.calls.append('epoch_start')
+
+    def on_batch_start(self, network, logs):
+        self.calls.append('batch_start')
+
+    def on_batch_end(self, network, logs):
+        self.calls.append('batch_end')
+
+    def on_epoch_end(self, network, logs):
+        self.calls.append('epoch_end')
+
+    def on_train_end(self, network, logs):
+        self.calls.append('train_end')
+
+
+class StopAfter(Callback):
+    def __init__(self, num_of_batches):
+        self.num_of_batches = num_of_batches
+        self.batches_seen = 0
+
+    def on_batch_end(self, network, logs):
+        self.batches_seen += 1
+        if self.batches_seen == self.num_of_batches:
+            network.stop_training = True
+
+
+class CallbackTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.layers = {
+            'layer1': {
+                'activation': 'relu',
+                'neurons': 5,
+            },
+            'layer2': {
+                'activation': 'sigmoid',
+                'neurons': 2,
+            }
+        }
+        self.network = Network(4, self.layers)
+        self.inputs = np.random.random_sample((20, 4))
+        self.labels = np.eye(2)[np.random.randint(0, 2, 20)]
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_hook_order(self):
+        print("\nHook Order Test:")
+        recorder = RecordingCallback()
+        self.network.train(self.inputs, self.labels, batch_size=10, epochs=2, callbacks=[recorder])
+        epoch_calls = ['epoch_start', 'batch_start', 'batch_end', 'batch_start', 'batch_end', 'epoch_end']
+        self.assertEqual(recorder.calls, ['train_start'] + epoch_calls * 2 + ['train_end'])
+
+    def test_callbacks_match_plain_training(self):
+        print("\nCallbacks Training Result Test:")
+        results = []
+        for callbacks in (None, [RollingStats()]):
+            np.random.seed(3)
+            network = Network(4, self.layers)
+            errors = network.train(self.inputs, self.labels, batch_size=8, epochs=2, callbacks=callbacks)
+            results.append((errors, network.layers[0].weights))
+
+        (errors, weights), (callback_errors, callback_weights) = results
+        self.assertEqual(callback_errors, errors)
+        np.testing.assert_array_equal(callback_weights, weights)
+
+    def test_stop_training(self):
+        print("\nStop Training Test:")
+        stopper = StopAfter(3)
+        errors = self.network.train(self.inputs, self.labels, batch_size=5, epochs=4, callbacks=[stopper])
+        self.assertEqual(stopper.batches_seen, 3)
+        self.assertEqual(len(errors), 1)
+
+    def test_rolling_stats(self):
+        print("\nRolling Stats Test:")
+        stats = RollingStats(window=3)
+        self.assertEqual(stats.summary(), {})
+
+        self.network.train(self.inputs, self.labels, batch_size=4, epochs=2, callbacks=[stats])
+        summary = stats.summary()
+        print(f"\t{summary}")
+        self.assertEqual(summary['num_of_batches'], 3)
+        self.assertEqual(len(summary['layer_forward_times']), 2)
+        self.assertGreater(summary['samples_per_second'], 0)
+        self.assertEqual(len(stats.epoch_logs), 2)
+
+    def test_log_writer_csv(self):
+        print("\nCSV Log Test:")
+        path = os.path.join(self.directory.name, 'log.csv')
+        self.network.train(self.inputs, self.labels, batch_size=10, epochs=2, callbacks=[LogWriter(path)])
+        with open(path) as log_file:
+            rows = list(csv.DictReader(log_file))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[-1]['epoch'], '1')
+
+    def test_log_writer_jsonl(self):
+        print("\nJSON Lines Log Test:")
+        path = os.path.join(self.directory.name, 'log.jsonl')
+        writer = LogWriter(path, per_batch=False)
+        self.network.train(self.inputs, self.labels, batch_size=10, epochs=3, callbacks=[writer])
+        with open(path) as log_file:
+            rows = [json.loads(line) for line in log_file]
+        self.assertEqual([row['epoch'] for row in rows], [0, 1, 2])
+
+        with self.assertRaises(ValueError):
+            LogWriter(path, 'xml')
+
+    def test_sampling_profiler(self):
+        print("\nSampling Profiler Test:")
+        profiler = SamplingProfiler(every=3)
+        self.network.train(self.inputs, self.labels, batch_size=2, epochs=1, callbacks=[profiler])
+        self.assertEqual(profiler.num_of_profiled_batches, 4)
+        self.assertIn('compute_gradients', profiler.report())
+
+        profiler = SamplingProfiler(enabled=False)
+        self.network.train(self.inputs, self.labels, batch_size=2, epochs=1, callbacks=[profiler])
+        self.assertEqual(profiler.num_of_profiled_batches, 0)
+
+    def test_throttled_progress(self):
+        print("\nThrottled Progress Test:")
+        reports = []
+        progress = ThrottledProgress(lambda network, logs: reports.append(logs['batch']), interval=60)
+        self.network.train(self.inputs, self.labels, batch_size=2, epochs=1, callbacks=[progress])
+        self.assertEqual(reports, [0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,265 @@
+import cProfile
+import csv
+import io
+import json
+import pstats
+import time
+from collections import deque
+
+import numpy as np
+
+
+class Callback:
+    """
+    Hooks into `Network.train`
+
+    Override any of the hooks, each is given the network being trained
+    and a dict of logs. Set `network.stop_training` to stop after the current batch.
+
+    Logs
+    ----
+    on_train_start
+        epochs, batch_size, num_of_samples
+
+    on_epoch_start
+        epoch
+
+    on_batch_start
+        epoch, batch, batch_size
+
+    on_batch_end
+        epoch, batch, batch_size, error (mean per sample), samples_per_second
+        and the seconds taken by the whole batch (batch_time) and each phase:
+        data_time, forward_time, backward_time, gradients_time, update_time.
+        layer_forward_times and layer_backward_times list the seconds per layer
+
+    on_epoch_end
+        epoch, error (mean per sample), num_of_samples, epoch_time, samples_per_second.
+        When batches are prefetched, starved_batches and data_wait_time give how
+        many batches training waited for and the seconds spent waiting
+
+    on_train_end
+        errors, the mean error of each epoch
+    """
+
+    def on_train_start(self, network, logs):
+        pass
+
+    def on_epoch_start(self, network, logs):
+        pass
+
+    def on_batch_start(self, network, logs):
+        pass
+
+    def on_batch_end(self, network, logs):
+        pass
+
+    def on_epoch_end(self, network, logs):
+        pass
+
+    def on_train_end(self, network, logs):
+        pass
+
+
+class RollingStats(Callback):
+    def __init__(self, window=100):
+        """
+        Keeps rolling averages over the most recent batches
+
+        Parameters
+        ----------
+        window : int
+            How many batches are averaged over
+
+        Examples
+        --------
+        >>> stats = RollingStats(window=50)
+        >>> network.train(inputs, labels, callbacks=[stats])
+        >>> stats.summary()['samples_per_second']
+        """
+        self.window = window
+        self.batch_logs = deque(maxlen=window)
+        self.epoch_logs = []
+
+    def on_batch_end(self, network, logs):
+        self.batch_logs.append(logs)
+
+    def on_epoch_end(self, network, logs):
+        self.epoch_logs.append(logs)
+
+    def summary(self) -> dict:
+        """
+        Averages the batches in the window
+
+        Returns
+        -------
+        summary : dict
+            The mean error, phase times and per-layer times, and the
+            samples per second over the whole window. Empty if no batches have run
+        """
+        if not self.batch_logs:
+            return {}
+
+        num_of_samples = sum(logs['batch_size'] for logs in self.batch_logs)
+        total_time = sum(logs['batch_time'] for logs in self.batch_logs)
+        summary = {
+            'num_of_batches': len(self.batch_logs),
+            'error': sum(logs['error'] * logs['batch_size'] for logs in self.batch_logs) / num_of_samples,
+            'samples_per_second': num_of_samples / total_time,
+        }
+        for phase in ('batch_time', 'data_time', 'forward_time', 'backward_time', 'update_time'):
+            summary[phase] = float(np.mean([logs[phase] for logs in self.batch_logs]))
+        for layer_times in ('layer_forward_times', 'layer_backward_times'):
+            summary[layer_times] = np.mean([logs[layer_times] for logs in self.batch_logs], axis=0).tolist()
+        return summary
+
+
+class LogWriter(Callback):
+    SCALAR_FIELDS = ('epoch', 'batch', 'batch_size', 'error', 'samples_per_second', 'batch_time',
+                     'data_time', 'forward_time', 'backward_time', 'update_time')
+    EPOCH_FIELDS = ('epoch', 'error', 'num_of_samples', 'epoch_time', 'samples_per_second')
+
+    def __init__(self, path: str, file_format=None, per_batch=True):
+        """
+        Writes the training logs to a CSV or JSON lines file
+
+        Parameters
+        ----------
+        path : str
+            Where to write the logs
+
+        file_format : str, optional
+            'csv' or 'jsonl', defaults to the path's extension. CSV files
+            leave out the per-layer times
+
+        per_batch : bool
+            Writes a row for every batch, otherwise only for every epoch
+        """
+        self.path = path
+        self.file_format = file_format or ('csv' if path.endswith('.csv') else 'jsonl')
+        if self.file_format not in ('csv', 'jsonl'):
+            raise ValueError(f'{self.file_format} is not a supported log format, use csv or jsonl')
+        self.per_batch = per_batch
+
+        self._log_file = None
+        self._csv_writer = None
+
+    def on_train_start(self, network, logs):
+        self._log_file = open(self.path, 'a', newline='')
+        if self.file_format == 'csv':
+            fields = self.SCALAR_FIELDS if self.per_batch else self.EPOCH_FIELDS
+            self._csv_writer = csv.DictWriter(self._log_file, fields, extrasaction='ignore')
+            if self._log_file.tell() == 0:
+                self._csv_writer.writeheader()
+
+    def _write(self, logs):
+        if self._csv_writer is not None:
+            self._csv_writer.writerow(logs)
+        else:
+            self._log_file.write(json.dumps(logs) + '\n')
+
+    def on_batch_end(self, network, logs):
+        if self.per_batch:
+            self._write(logs)
+
+    def on_epoch_end(self, network, logs):
+        if not self.per_batch:
+            self._write(logs)
+        self._log_file.flush()
+
+    def on_train_end(self, network, logs):
+        self._log_file.close()
+        self._log_file = None
+        self._csv_writer = None
+
+
+class SamplingProfiler(Callback):
+    def __init__(self, every=100, enabled=True):
+        """
+        Runs cProfile on one batch out of every `every` batches
+
+        Profiling every batch slows training down a lot, sampling keeps the
+        overhead low while still showing where the time goes
+
+        Parameters
+        ----------
+        every : int
+            How often a batch is profiled
+
+        enabled : bool
+            Can be flipped at any time to switch profiling on or off
+
+        Examples
+        --------
+        >>> profiler = SamplingProfiler(every=20)
+        >>> network.train(inputs, labels, callbacks=[profiler])
+        >>> print(profiler.report(limit=10))
+        """
+        self.every = every
+        self.enabled = enabled
+        self.num_of_profiled_batches = 0
+
+        self._profiler = cProfile.Profile()
+        self._profiling = False
+        self._num_of_batches = 0
+
+    def on_batch_start(self, network, logs):
+        if self.enabled and self._num_of_batches % self.every == 0:
+            self._profiling = True
+            self._profiler.enable()
+
+    def on_batch_end(self, network, logs):
+        if self._profiling:
+            self._profiler.disable()
+            self._profiling = False
+            self.num_of_profiled_batches += 1
+        self._num_of_batches += 1
+
+    def report(self, sort_by='cumulative', limit=20) -> str:
+        """
+        Formats the profile of the sampled batches
+
+        Parameters
+        ----------
+        sort_by : str
+            A `pstats` sort key
+
+        limit : int
+            How many functions to list
+
+        Returns
+        -------
+        report : str
+        """
+        if self.num_of_profiled_batches == 0:
+            return 'No batches have been profiled'
+        output = io.StringIO()
+        pstats.Stats(self._profiler, stream=output).sort_stats(sort_by).print_stats(limit)
+        return output.getvalue()
+
+
+class ThrottledProgress(Callback):
+    def __init__(self, report, interval=1.0):
+        """
+        Calls `report(network, logs)` after a batch at most once every `interval` seconds
+
+        Parameters
+        ----------
+        report : callable
+            Given the network and the logs of the batch that just finished
+
+        interval : float
+            The fewest seconds between reports, the first batch is always reported
+        """
+        self.report = report
+        self.interval = interval
+        self._last_report_time = None
+
+    def on_train_start(self, network, logs):
+        self._last_report_time = None
+
+    def on_batch_end(self, network, logs):
+        now = time.perf_counter()
+        if self._last_report_time is None or now - self._last_report_time >= self.interval:
+            self._last_report_time = now
+            self.report(network, logs)
@@ -0,0 +1,97 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b'PNNCKPT1'
+ALIGNMENT = 64
+_HEADER_SIZE = struct.Struct('<Q')
+
+
+def _align(position):
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+def save_arrays(path: str, metadata: dict, arrays: dict):
+    """
+    Saves named arrays and some json metadata in one binary file
+
+    The file is laid out as the magic bytes, the length of a json header,
+    the json header then the raw array data. Every array starts on a 64 byte
+    boundary so it can be memory mapped in place by `load_arrays`.
+
+    Parameters
+    ----------
+    path : str
+        Where to save the file, it is replaced once the new file is complete
+
+    metadata : dict
+        Anything json serialisable
+
+    arrays : dict
+        Maps names to numpy arrays
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+
+    array_specs = {}
+    offset = 0
+    for name, array in arrays.items():
+        array_specs[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset = _align(offset + array.nbytes)
+
+    header = json.dumps({'metadata': metadata, 'arrays': array_specs}).encode('utf-8')
+    data_start = _align(len(MAGIC) + _HEADER_SIZE.size + len(header))
+
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as checkpoint_file:
+        checkpoint_file.write(MAGIC)
+        checkpoint_file.write(_HEADER_SIZE.pack(len(header)))
+        checkpoint_file.write(header)
+        for name, array in arrays.items():
+            checkpoint_file.seek(data_start + array_specs[name]['offset'])
+            checkpoint_file.write(array.tobytes())
+    os.replace(temp_path, path)
+
+
+def load_arrays(path: str, mmap_mode=None):
+    """
+    Loads a file written by `save_arrays`
+
+    Parameters
+    ----------
+    path : str
+        The location of the file
+
+    mmap_mode : str, optional
+        None reads the arrays into memory, otherwise they are memory mapped
+        with this mode, see `np.memmap`. 'r' gives read-only arrays that
+        share their pages with every other process mapping the same file
+
+    Returns
+    -------
+    metadata : dict
+        The metadata that was saved
+
+    arrays : dict
+        Maps names to numpy arrays
+    """
+    with open(path, 'rb') as checkpoint_file:
+        if checkpoint_file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} is not a network checkpoint')
+        header_size, = _HEADER_SIZE.unpack(checkpoint_file.read(_HEADER_SIZE.size))
+        header = json.loads(checkpoint_file.read(header_size).decode('utf-8'))
+
+    data_start = _align(len(MAGIC) + _HEADER_SIZE.size + header_size)
+
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype, shape = np.dtype(spec['dtype']), tuple(spec['shape'])
+        if 0 in shape:
+            arrays[name] = np.zeros(shape, dtype)
+            continue
+
+        array = np.memmap(path, dtype=dtype, mode=mmap_mode or 'r', offset=data_start + spec['offset'], shape=shape)
+        arrays[name] = array if mmap_mode else np.array(array)
+
+    return header['metadata'], arrays
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from Dataset import read_idx, load_mnist
+
+
+def write_idx(path, array, data_type_code=0x08):
+    with open(path, 'wb') as idx_file:
+        idx_file.write(bytes([0, 0, data_type_code, array.ndim]))
+        idx_file.write(np.asarray(array.shape, dtype='>u4').tobytes())
+        idx_file.write(array.tobytes())
+
+
+class DatasetTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.images_path = os.path.join(self.directory.name, 'images.idx3-ubyte')
+        self.labels_path = os.path.join(self.directory.name, 'labels.idx1-ubyte')
+
+        self.images = np.arange(5 * 3 * 2, dtype=np.uint8).reshape(5, 3, 2) * 8
+        self.raw_labels = np.array([3, 0, 9, 1, 3], dtype=np.uint8)
+        write_idx(self.images_path, self.images)
+        write_idx(self.labels_path, self.raw_labels)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_read_idx(self):
+        print("\nRead IDX Test:")
+        images = read_idx(self.images_path)
+        self.assertIsInstance(images, np.memmap)
+        self.assertEqual(images.shape, (5, 3, 2))
+        np.testing.assert_array_equal(images, self.images)
+
+    def test_read_idx_big_endian(self):
+        print("\nRead Big Endian IDX Test:")
+        path = os.path.join(self.directory.name, 'ints.idx1-int')
+        write_idx(path, np.array([1, -2, 70000], dtype='>i4'), 0x0C)
+        np.testing.assert_array_equal(read_idx(path), [1, -2, 70000])
+
+    def test_read_idx_rejects_other_files(self):
+        print("\nRead Bad IDX Test:")
+        path = os.path.join(self.directory.name, 'bad')
+        with open(path, 'wb') as bad_file:
+            bad_file.write(b'not an idx file')
+        with self.assertRaises(ValueError):
+            read_idx(path)
+
+    def test_load_mnist(self):
+        print("\nLoad MNIST Test:")
+        inputs, labels = load_mnist(self.images_path, self.labels_path)
+        self.assertEqual(inputs.shape, (5, 6))
+        np.testing.assert_allclose(inputs, self.images.reshape(5, 6) / 255)
+        np.testing.assert_array_equal(labels.argmax(axis=1), self.raw_labels)
+        self.assertEqual(labels.sum(), 5)
+        self.assertFalse(inputs.flags.writeable)
+
+    def test_load_mnist_float32(self):
+        print("\nLoad MNIST Float32 Test:")
+        inputs, labels = load_mnist(self.images_path, self.labels_path, dtype=np.float32)
+        self.assertEqual(inputs.dtype, np.float32)
+        self.assertEqual(labels.dtype, np.float32)
+        np.testing.assert_allclose(inputs, self.images.reshape(5, 6) / 255, rtol=1e-6)
+
+    def test_load_mnist_reuses_cache(self):
+        print("\nLoad MNIST Cache Test:")
+        load_mnist(self.images_path, self.labels_path)
+        cache_directory = os.path.join(self.directory.name, 'cache')
+        cache_times = [os.path.getmtime(os.path.join(cache_directory, name)) for name in sorted(os.listdir(cache_directory))]
+
+        inputs, labels = load_mnist(self.images_path, self.labels_path)
+        self.assertIsInstance(inputs, np.memmap)
+        self.assertEqual(cache_times, [os.path.getmtime(os.path.join(cache_directory, name))
+                                       for name in sorted(os.listdir(cache_directory))])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+import os
+
+import numpy as np
+
+IDX_DATA_TYPES = {
+    0x08: np.dtype('u1'),
+    0x09: np.dtype('i1'),
+    0x0B: np.dtype('>i2'),
+    0x0C: np.dtype('>i4'),
+    0x0D: np.dtype('>f4'),
+    0x0E: np.dtype('>f8'),
+}
+
+MNIST_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mnistDataset')
+
+
+def read_idx(path: str) -> np.memmap:
+    """
+    Memory maps an IDX file without reading its contents
+
+    Parameters
+    ----------
+    path : str
+        The location of the `.idx*-ubyte` file
+
+    Returns
+    -------
+    data : np.memmap
+        A read-only array shaped by the file's header. Slicing it
+        gives views, pages are only read from disk when used
+
+    References
+    ----------
+        See : http://yann.lecun.com/exdb/mnist/
+              for the layout of IDX files
+    """
+    with open(path, 'rb') as idx_file:
+        magic = idx_file.read(4)
+        if len(magic) != 4 or magic[0] != 0 or magic[1] != 0:
+            raise ValueError(f'{path} is not an IDX file')
+
+        data_type_code, num_of_dimensions = magic[2], magic[3]
+        if data_type_code not in IDX_DATA_TYPES:
+            raise ValueError(f'{path} has an unknown IDX data type: {data_type_code:#04x}')
+
+        shape = tuple(int(size) for size in np.frombuffer(idx_file.read(4 * num_of_dimensions), dtype='>u4'))
+
+    header_size = 4 + 4 * num_of_dimensions
+    return np.memmap(path, dtype=IDX_DATA_TYPES[data_type_code], mode='r', offset=header_size, shape=shape)
+
+
+def _cache_is_fresh(cache_path, source_path):
+    """Checks the cache exists and was made after its source file"""
+    return os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(source_path)
+
+
+def _write_cache(cache_path, dtype, shape, fill):
+    """Writes a `.npy` file through a memmap then moves it into place once complete"""
+    temp_path = f'{cache_path}.{os.getpid()}.tmp'
+    cache = np.lib.format.open_memmap(temp_path, mode='w+', dtype=dtype, shape=shape)
+    fill(cache)
+    cache.flush()
+    del cache
+    os.replace(temp_path, cache_path)
+
+
+def cache_inputs(images: np.ndarray, cache_path: str, dtype=np.float64, chunk_size=4096):
+    """
+    Writes images as normalised, flattened float inputs to a `.npy` cache
+
+    Parameters
+    ----------
+    images : np.ndarray
+        A (samples, ...) array of pixel values from 0 to 255
+
+    cache_path : str
+        Where to save the cache
+
+    dtype : np.dtype
+        The float type of the inputs
+
+    chunk_size : int
+        How many images are converted at once, bounds the memory used
+    """
+    shape = (len(images), int(np.prod(images.shape[1:])))
+
+    def fill(cache):
+        for start in range(0, len(images), chunk_size):
+            chunk = images[start:start + chunk_size].reshape(-1, shape[1])
+            np.divide(chunk, 255, out=cache[start:start + chunk_size], dtype=cache.dtype)
+
+    _write_cache(cache_path, dtype, shape, fill)
+
+
+def cache_labels(raw_labels: np.ndarray, cache_path: str, num_of_classes=10, dtype=np.float64):
+    """
+    Writes labels as one-hot rows to a `.npy` cache
+
+    Parameters
+    ----------
+    raw_labels : np.ndarray
+        A (samples,) array of class ids
+
+    cache_path : str
+        Where to save the cache
+
+    num_of_classes : int
+        How many classes there are
+
+    dtype : np.dtype
+        The float type of the labels
+    """
+    def fill(cache):
+        cache[:] = 0
+        cache[np.arange(len(raw_labels)), raw_labels] = 1
+
+    _write_cache(cache_path, dtype, (len(raw_labels), num_of_classes), fill)
+
+
+def load_mnist(images_path: str, labels_path: str, cache_directory=None, num_of_classes=10, dtype=np.float64):
+    """
+    Loads an IDX image and label pair ready for `Network.train`
+
+    The first call writes the normalised inputs and one-hot labels to
+    `.npy` files in `cache_directory`, later calls just memory map them.
+    The caches are rebuilt if the IDX files are newer.
+
+    Parameters
+    ----------
+    images_path : str
+        The location of an `.idx3-ubyte` image file
+
+    labels_path : str
+        The location of an `.idx1-ubyte` label file
+
+    cache_directory : str, optional
+        Where to keep the caches, defaults to a `cache` folder next to the images
+
+    num_of_classes : int
+        How many classes the labels are one-hot encoded over
+
+    dtype : np.dtype
+        The float type of the inputs and labels, match it to the `Network`'s
+        dtype so batches don't need converting. Each dtype has its own cache
+
+    Returns
+    -------
+    inputs : np.ndarray
+        A read-only (samples, pixels) array of floats from 0 to 1
+
+    labels : np.ndarray
+        A read-only (samples, num_of_classes) array of one-hot labels
+
+    Examples
+    --------
+    >>> inputs, labels = load_mnist(os.path.join(MNIST_DIRECTORY, 'train-images.idx3-ubyte'),
+    ...                             os.path.join(MNIST_DIRECTORY, 'train-labels.idx1-ubyte'))
+    >>> network.train(inputs, labels, batch_size=64)
+    """
+    if cache_directory is None:
+        cache_directory = os.path.join(os.path.dirname(os.path.abspath(images_path)), 'cache')
+    os.makedirs(cache_directory, exist_ok=True)
+
+    dtype = np.dtype(dtype)
+    inputs_cache = os.path.join(cache_directory, f'{os.path.basename(images_path)}.{dtype.name}.inputs.npy')
+    labels_cache = os.path.join(cache_directory, f'{os.path.basename(labels_path)}.{dtype.name}.labels.npy')
+
+    if not _cache_is_fresh(inputs_cache, images_path):
+        cache_inputs(read_idx(images_path), inputs_cache, dtype)
+    if not _cache_is_fresh(labels_cache, labels_path):
+        cache_labels(read_idx(labels_path), labels_cache, num_of_classes, dtype)
+
+    inputs = np.load(inputs_cache, mmap_mode='r')
+    labels = np.load(labels_cache, mmap_mode='r')
+    if len(inputs) != len(labels):
+        raise ValueError(f'{images_path} has {len(inputs)} images but {labels_path} has {len(labels)} labels')
+    return inputs, labels
@@ -0,0 +1,118 @@
+import unittest
+
+import numpy as np
+
+from Ensemble import Ensemble, group_by_layout
+from Network import Network
+from Optimizers import Adam
+
+
+class EnsembleTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.random_state = np.random.get_state()
+        np.random.seed(0)
+        self.layers = {
+            'layer1': {
+                'activation': 'relu',
+                'neurons': 8,
+            },
+            'layer2': {
+                'activation': 'softmax',
+                'neurons': 3,
+            }
+        }
+        self.networks = [Network(5, self.layers) for _ in range(4)]
+        self.inputs = np.random.random_sample((40, 5))
+        self.labels = np.eye(3)[np.random.randint(0, 3, 40)]
+
+    def tearDown(self) -> None:
+        np.random.set_state(self.random_state)
+
+    def test_predict_matches_networks(self):
+        print("\nEnsemble Predict Test:")
+        ensemble = Ensemble(self.networks)
+        expected = np.array([network.predict(self.inputs) for network in self.networks])
+
+        np.testing.assert_allclose(ensemble.predict(self.inputs, combine=None), expected)
+        np.testing.assert_allclose(ensemble.predict(self.inputs), expected.mean(axis=0))
+
+        per_model_inputs = np.random.random_sample((4, 6, 5))
+        np.testing.assert_allclose(ensemble.predict(per_model_inputs, combine=None),
+                                   [network.predict(inputs) for network, inputs in zip(self.networks, per_model_inputs)])
+
+    def test_vote(self):
+        print("\nEnsemble Vote Test:")
+        ensemble = Ensemble(self.networks)
+        votes, classes = ensemble.predict(self.inputs, combine='vote', return_classes=True)
+        model_classes = np.array([network.predict(self.inputs).argmax(axis=1) for network in self.networks])
+
+        np.testing.assert_allclose(votes.sum(axis=1), 1)
+        for sample in range(len(self.inputs)):
+            counts = np.bincount(model_classes[:, sample], minlength=3)
+            np.testing.assert_allclose(votes[sample], counts / 4)
+            self.assertEqual(classes[sample], counts.argmax())
+
+    def test_train_matches_networks(self):
+        print("\nEnsemble Train Test:")
+        for network, learning_rate in zip(self.networks, (0.05, 0.1, 0.2, 0.4)):
+            network.learning_rate = learning_rate
+        ensemble = Ensemble(self.networks)
+
+        np.random.seed(1)
+        ensemble_errors = ensemble.train(self.inputs, self.labels, batch_size=8, epochs=2)
+        for index, (network, trained_network) in enumerate(zip(self.networks, ensemble.to_networks())):
+            np.random.seed(1)
+            errors = network.train(self.inputs, self.labels, batch_size=8, epochs=2)
+
+            np.testing.assert_allclose([epoch_errors[index] for epoch_errors in ensemble_errors], errors)
+            for layer, trained_layer in zip(network.layers, trained_network.layers):
+                np.testing.assert_allclose(trained_layer.weights, layer.weights)
+                np.testing.assert_allclose(trained_layer.biases, layer.biases)
+            self.assertEqual(trained_network.learning_rate, network.learning_rate)
+
+    def test_evaluate_matches_networks(self):
+        print("\nEnsemble Evaluate Test:")
+        results = Ensemble(self.networks).evaluate(self.inputs, self.labels.argmax(axis=1), chunk_size=16)
+
+        for index, network in enumerate(self.networks):
+            network_results = network.evaluate(self.inputs, self.labels)
+            self.assertAlmostEqual(results['loss'][index], network_results['loss'])
+            self.assertAlmostEqual(results['accuracy'][index], network_results['accuracy'])
+
+    def test_different_layouts(self):
+        print("\nEnsemble Layout Test:")
+        wider_network = Network(5, dict(self.layers, layer1={'activation': 'relu', 'neurons': 9}))
+        with self.assertRaises(ValueError):
+            Ensemble(self.networks + [wider_network])
+
+        groups = group_by_layout([self.networks[0], wider_network, self.networks[1]])
+        self.assertEqual([indexes for indexes, _ in groups], [[0, 2], [1]])
+        self.assertEqual(groups[0][1].num_of_models, 2)
+
+    def test_only_sgd_networks(self):
+        print("\nEnsemble Optimizer Test:")
+        self.networks[1].optimizer = Adam(learning_rate=0.001)
+        with self.assertRaises(ValueError):
+            Ensemble(self.networks)
+
+        groups = group_by_layout(self.networks)
+        self.assertEqual([indexes for indexes, _ in groups], [[0, 2, 3]])
+
+    def test_image_networks(self):
+        print("\nEnsemble Image Network Test:")
+        image_network = Network(16, {
+            'pool': {'type': 'maxpool', 'input_shape': (1, 4, 4), 'pool_size': 2},
+            'flatten': {'type': 'flatten'},
+            'output': {'activation': 'softmax', 'neurons': 3},
+        })
+        with self.assertRaises(ValueError):
+            Ensemble([image_network])
+        with self.assertRaises(ValueError):
+            Ensemble(self.networks[:1] + [image_network])
+
+        groups = group_by_layout([self.networks[0], image_network, self.networks[1]])
+        self.assertEqual([indexes for indexes, _ in groups], [[0, 2]])
+
+
+if __name__ == '__main__':
+    unittest.main()
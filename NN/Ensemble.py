@@ -0,0 +1,412 @@
+import numpy as np
+
+from Network import Network, Layer, ACTIVATION_DERIVATIVES, batch_indexes, cross_entropy, softmax
+
+
+def _layout(network):
+    """What networks must share to be stacked, their dtype and each layer's shape and activation"""
+    return (network.dtype,) + tuple((layer.weights.shape, layer.activation_function.__name__)
+                                    for layer in network.layers)
+
+
+class Ensemble:
+    def __init__(self, networks):
+        """
+        Many networks with the same layout stacked together so they run as one
+
+        Each layer's weights are stacked into a (models, neurons, inputs)
+        array and its biases into a (models, neurons) array, so a batch goes
+        through every model with one batched matrix multiply per layer
+        instead of one call per network. The first layer of all the models is
+        a single matrix multiply when they share the inputs.
+
+        Parameters
+        ----------
+        networks : list
+            Networks with the same layer sizes, activations and dtype, using
+            the SGD optimizer. They are copied, later changes to them do not
+            affect the ensemble, see `to_networks`
+
+        Attributes
+        ----------
+        learning_rates : np.ndarray
+            A (models,) array of each model's learning rate for `train`,
+            taken from the networks' optimizers
+
+        Methods
+        ------
+        create(num_of_models, input_array_length, layers)
+            Makes an ensemble of freshly initialised models
+
+        predict(inputs, combine='mean', return_classes=False)
+            Runs a batch through every model
+
+        evaluate(inputs, labels)
+            Measures every model and the combined ensemble on a data set
+
+        train(inputs, labels, batch_size=32, epochs=1)
+            Trains every model at once with stochastic gradient descent
+
+        to_networks
+            Unstacks the models back into networks
+
+        Examples
+        --------
+        >>> ensemble = Ensemble([user.network for user in users.values()])
+        >>> accuracies = ensemble.evaluate(test_inputs, test_labels)['accuracy']
+        >>> outputs, classes = ensemble.predict(test_inputs, combine='vote', return_classes=True)
+        """
+        if not networks:
+            raise ValueError('An ensemble needs at least one network')
+        for index, network in enumerate(networks):
+            if not network.is_fully_connected:
+                raise ValueError(f'Network {index} has image layers, only fully connected networks can be stacked')
+            # The ensemble only trains with SGD, any other optimizer's settings and state would be lost
+            if network.optimizer.name != 'sgd':
+                raise ValueError(f'Network {index} uses the {network.optimizer.name} optimizer, '
+                                 f'only networks using sgd can be stacked')
+        layout = _layout(networks[0])
+        for index, network in enumerate(networks):
+            if _layout(network) != layout:
+                raise ValueError(f'Network {index} has a different layout to the first network, '
+                                 f'only networks with the same layer sizes, activations and dtype can be stacked')
+
+        self.dtype = networks[0].dtype
+        self.input_array_length = networks[0].input_array_length
+        self.activation_functions = [layer.activation_function for layer in networks[0].layers]
+        self.weights = []
+        self.biases = []
+        self.masks = []
+        for index, layer in enumerate(networks[0].layers):
+            layers = [network.layers[index] for network in networks]
+            self.weights.append(np.stack([layer.weights for layer in layers]))
+            self.biases.append(np.stack([layer.biases for layer in layers]))
+            if all(layer.mask is None for layer in layers):
+                self.masks.append(None)
+            else:
+                self.masks.append(np.stack([np.ones(layer.weights.shape, bool) if layer.mask is None else layer.mask
+                                            for layer in layers]))
+        self.learning_rates = np.array([network.learning_rate for network in networks], self.dtype)
+
+    @classmethod
+    def create(cls, num_of_models: int, input_array_length: int, layers: dict, dtype=np.float64) -> 'Ensemble':
+        """
+        Makes an ensemble of freshly initialised models
+
+        Parameters
+        ----------
+        num_of_models : int
+            How many models to make
+
+        input_array_length, layers, dtype
+            The layout of every model, see `Network`
+
+        Returns
+        -------
+        ensemble : Ensemble
+        """
+        return cls([Network(input_array_length, layers, dtype) for _ in range(num_of_models)])
+
+    @property
+    def num_of_models(self) -> int:
+        return len(self.learning_rates)
+
+    @property
+    def loss(self) -> str:
+        """See `Network.loss`"""
+        return 'cross_entropy' if self.activation_functions[-1] is softmax else 'squared_error'
+
+    def _pre_activations(self, index, inputs):
+        """Multiplies a (batch, inputs) or (models, batch, inputs) array by every model's layer"""
+        weights, biases = self.weights[index], self.biases[index]
+        num_of_models, num_of_neurons, num_of_inputs = weights.shape
+        if inputs.ndim == 2:
+            # All the models' rows are multiplied by the shared inputs in one matrix multiply
+            pre_activations = inputs @ weights.reshape(num_of_models * num_of_neurons, num_of_inputs).T
+            pre_activations = pre_activations.reshape(len(inputs), num_of_models, num_of_neurons).transpose(1, 0, 2)
+            pre_activations = np.ascontiguousarray(pre_activations)
+        else:
+            pre_activations = inputs @ weights.transpose(0, 2, 1)
+        pre_activations += biases[:, None, :]
+        return pre_activations
+
+    def _forward(self, inputs):
+        layer_outputs = inputs
+        for index, activation_function in enumerate(self.activation_functions):
+            layer_outputs = activation_function(self._pre_activations(index, layer_outputs))
+        return layer_outputs
+
+    def _as_inputs(self, inputs):
+        inputs = np.asarray(inputs, dtype=self.dtype)
+        return inputs[None] if inputs.ndim == 1 else inputs
+
+    def predict(self, inputs, combine='mean', return_classes=False):
+        """
+        Runs a batch through every model
+
+        Parameters
+        ----------
+        inputs : array_like
+            A (samples, features) array shared by every model or a
+            (models, samples, features) array with each model's own inputs
+
+        combine : str, optional
+            'mean' averages the models' outputs, 'vote' gives the fraction of
+            models that picked each class and None returns every model's outputs
+
+        return_classes : bool
+            Also returns the index of the largest output for each sample
+
+        Returns
+        -------
+        outputs : np.ndarray
+            A (samples, outputs) array, or (models, samples, outputs) when `combine` is None
+
+        classes : np.ndarray
+            A (samples,) array of class ids, or (models, samples) when
+            `combine` is None, only returned if `return_classes` is set
+        """
+        if combine not in ('mean', 'vote', None):
+            raise ValueError(f"combine must be 'mean', 'vote' or None, got {combine!r}")
+        outputs = self._forward(self._as_inputs(inputs))
+
+        if combine == 'mean':
+            outputs = outputs.mean(axis=0)
+        elif combine == 'vote':
+            outputs = self._votes(outputs.argmax(axis=-1), outputs.shape[-1])
+
+        if return_classes:
+            return outputs, outputs.argmax(axis=-1)
+        return outputs
+
+    def _votes(self, classes, num_of_classes):
+        """Turns a (models, samples) array of classes into the fraction of votes each class got"""
+        num_of_samples = classes.shape[1]
+        votes = np.bincount((np.arange(num_of_samples) * num_of_classes + classes).ravel(),
+                            minlength=num_of_samples * num_of_classes)
+        return votes.reshape(num_of_samples, num_of_classes) / self.num_of_models
+
+    def evaluate(self, inputs, labels, chunk_size=1024) -> dict:
+        """
+        Measures every model and the combined ensemble on a data set
+
+        Parameters
+        ----------
+        inputs : array_like
+            A (samples, features) array of input data, it can be a memory map
+
+        labels : array_like
+            A (samples, outputs) array of one-hot labels or a (samples,) array of class ids
+
+        chunk_size : int
+            How many samples are run at once
+
+        Returns
+        -------
+        results : dict
+            loss and accuracy
+                (models,) arrays of each model's mean error per sample and accuracy, see `Network.evaluate`
+            mean_accuracy and vote_accuracy
+                The accuracy of the averaged outputs and of the majority vote
+        """
+        labels = np.asarray(labels)
+        if len(inputs) != len(labels):
+            raise ValueError(f'Got {len(inputs)} inputs but {len(labels)} labels')
+
+        num_of_classes = self.weights[-1].shape[1]
+        total_errors = np.zeros(self.num_of_models)
+        correct = np.zeros(self.num_of_models, np.int64)
+        mean_correct = vote_correct = 0
+        for start in range(0, len(inputs), chunk_size):
+            layer_outputs = np.asarray(inputs[start:start + chunk_size], dtype=self.dtype)
+            for index, activation_function in enumerate(self.activation_functions[:-1]):
+                layer_outputs = activation_function(self._pre_activations(index, layer_outputs))
+            pre_activations = self._pre_activations(len(self.weights) - 1, layer_outputs)
+            outputs = self.activation_functions[-1](pre_activations)
+
+            chunk_labels = labels[start:start + chunk_size]
+            if chunk_labels.ndim == 1:
+                classes = chunk_labels.astype(np.intp)
+                chunk_labels = np.eye(num_of_classes, dtype=self.dtype)[classes]
+            else:
+                classes = chunk_labels.argmax(axis=1)
+
+            if self.loss == 'cross_entropy':
+                total_errors += cross_entropy(pre_activations, chunk_labels, axis=(1, 2))
+            else:
+                total_errors += 0.5 * np.sum((chunk_labels - outputs) ** 2, axis=(1, 2))
+
+            model_classes = outputs.argmax(axis=-1)
+            correct += np.sum(model_classes == classes, axis=1)
+            mean_correct += np.sum(outputs.mean(axis=0).argmax(axis=-1) == classes)
+            vote_correct += np.sum(self._votes(model_classes, num_of_classes).argmax(axis=-1) == classes)
+
+        num_of_samples = len(labels)
+        return {
+            'loss': total_errors / num_of_samples,
+            'accuracy': correct / num_of_samples,
+            'mean_accuracy': float(mean_correct) / num_of_samples,
+            'vote_accuracy': float(vote_correct) / num_of_samples,
+        }
+
+    def compute_gradients(self, inputs: np.ndarray, labels: np.ndarray):
+        """
+        Passes a batch forward then backward through every model, see `Network.compute_gradients`
+
+        Parameters
+        ----------
+        inputs : np.ndarray
+            A (batch, features) array shared by every model or a (models, batch, features) array
+
+        labels : np.ndarray
+            A (batch, outputs) array shared by every model or a (models, batch, outputs) array
+
+        Returns
+        -------
+        errors : np.ndarray
+            A (models,) array of each model's summed error over the batch
+
+        gradients : list
+            A (weight_gradients, bias_gradients) pair for every layer, averaged over the batch
+        """
+        layer_inputs, pre_activations, outputs = [], [], []
+        layer_outputs = inputs
+        for index, activation_function in enumerate(self.activation_functions):
+            layer_inputs.append(layer_outputs)
+            pre_activations.append(self._pre_activations(index, layer_outputs))
+            layer_outputs = activation_function(pre_activations[-1])
+            outputs.append(layer_outputs)
+
+        error_gradients = labels - layer_outputs
+        if self.loss == 'cross_entropy':
+            errors = cross_entropy(pre_activations[-1], labels, axis=(1, 2))
+        else:
+            errors = 0.5 * np.sum(error_gradients ** 2, axis=(1, 2))
+
+        batch_size = error_gradients.shape[1]
+        gradients = [None] * len(self.weights)
+        for index in reversed(range(len(self.weights))):
+            deltas = error_gradients
+            if not (index == len(self.weights) - 1 and self.loss == 'cross_entropy'):
+                derivative = ACTIVATION_DERIVATIVES[self.activation_functions[index].__name__]
+                deltas = derivative(pre_activations[index], outputs[index]) * error_gradients
+
+            if layer_inputs[index].ndim == 2:
+                # Like the forward pass, shared inputs take one matrix multiply for all the models
+                num_of_models, _, num_of_neurons = deltas.shape
+                weight_gradients = deltas.transpose(0, 2, 1).reshape(num_of_models * num_of_neurons, batch_size)
+                weight_gradients = (weight_gradients @ layer_inputs[index]).reshape(self.weights[index].shape)
+            else:
+                weight_gradients = deltas.transpose(0, 2, 1) @ layer_inputs[index]
+            weight_gradients /= batch_size
+            gradients[index] = weight_gradients, deltas.mean(axis=1)
+            if index > 0:
+                error_gradients = deltas @ self.weights[index]
+        return errors, gradients
+
+    def apply_gradients(self, gradients):
+        """
+        Adds each model's gradients scaled by its learning rate, then zeroes any pruned weights
+
+        Parameters
+        ----------
+        gradients : list
+            The gradients from `compute_gradients`
+        """
+        for weights, biases, mask, (weight_gradients, bias_gradients) in zip(
+                self.weights, self.biases, self.masks, gradients):
+            weight_gradients *= self.learning_rates[:, None, None]
+            weights += weight_gradients
+            bias_gradients *= self.learning_rates[:, None]
+            biases += bias_gradients
+            if mask is not None:
+                weights *= mask
+
+    def train(self, inputs, labels, batch_size=32, epochs=1, shuffle=True) -> list:
+        """
+        Trains every model at once with stochastic gradient descent
+
+        Every model sees the same batches, so they differ by their starting
+        weights and `learning_rates`. It matches training each network on its
+        own with `Network.train` and the SGD optimizer.
+
+        Parameters
+        ----------
+        inputs : array_like
+            A (samples, features) array of input data
+
+        labels : array_like
+            A (samples, outputs) array of what the models should output
+
+        batch_size : int
+            How many samples are used for each weight update
+
+        epochs : int
+            How many passes to make over the data
+
+        shuffle : bool
+            Shuffles the order of the samples at the start of each epoch
+
+        Returns
+        -------
+        errors : list
+            A (models,) array of each model's mean error per sample for each epoch
+        """
+        inputs, labels = np.asarray(inputs), np.asarray(labels)
+        if len(inputs) != len(labels):
+            raise ValueError(f'Got {len(inputs)} inputs but {len(labels)} labels')
+
+        epoch_errors = []
+        for _ in range(epochs):
+            errors = np.zeros(self.num_of_models)
+            for indexes in batch_indexes(len(inputs), batch_size, shuffle):
+                batch_errors, gradients = self.compute_gradients(np.asarray(inputs[indexes], dtype=self.dtype),
+                                                                 np.asarray(labels[indexes], dtype=self.dtype))
+                self.apply_gradients(gradients)
+                errors += batch_errors
+            epoch_errors.append(errors / len(inputs))
+        return epoch_errors
+
+    def to_networks(self) -> list:
+        """
+        Unstacks the models into new networks, each with an SGD optimizer at its learning rate
+
+        Returns
+        -------
+        networks : list
+        """
+        networks = []
+        for model in range(self.num_of_models):
+            network = Network(self.input_array_length, {}, self.dtype)
+            for weights, biases, mask, activation_function in zip(
+                    self.weights, self.biases, self.masks, self.activation_functions):
+                layer = Layer.from_arrays(weights[model].copy(), biases[model].copy(), activation_function.__name__)
+                if mask is not None:
+                    layer.mask = mask[model].copy()
+                network.layers.append(layer)
+            network.learning_rate = float(self.learning_rates[model])
+            networks.append(network)
+        return networks
+
+
+def group_by_layout(networks) -> list:
+    """
+    Stacks a mixed list of networks into one ensemble per layout
+
+    Parameters
+    ----------
+    networks : list
+        Networks of any layouts. Ones with image layers or an optimizer
+        other than SGD can't be stacked and are left out of every group
+
+    Returns
+    -------
+    groups : list
+        An (indexes, ensemble) pair for each layout, where `indexes` are the
+        positions in `networks` of the models in the ensemble
+    """
+    groups = {}
+    for index, network in enumerate(networks):
+        if network.is_fully_connected and network.optimizer.name == 'sgd':
+            groups.setdefault(_layout(network), []).append(index)
+    return [(indexes, Ensemble([networks[index] for index in indexes])) for indexes in groups.values()]
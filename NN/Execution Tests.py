@@ -0,0 +1,105 @@
+import copy
+import unittest
+import warnings
+
+import numpy as np
+
+from Execution import ExecutionConfig, available_cpus
+from Network import Network
+
+np.random.seed(0)
+
+
+class ExecutionTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.random_state = np.random.get_state()
+        self.layers = {
+            'layer1': {
+                'activation': 'relu',
+                'neurons': 48,
+            },
+            'layer2': {
+                'activation': 'sigmoid',
+                'neurons': 40,
+            },
+            'layer3': {
+                'activation': 'softmax',
+                'neurons': 5,
+            }
+        }
+        self.network = Network(30, self.layers)
+        self.inputs = np.random.random_sample((200, 30))
+        self.labels = np.eye(5)[np.argmax(self.inputs[:, :5], axis=1)]
+
+        # Oversubscribing the single core some test machines have is fine here
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            self.execution = ExecutionConfig(num_of_threads=3, min_rows_per_thread=16)
+
+    def tearDown(self) -> None:
+        self.execution.close()
+        np.random.set_state(self.random_state)
+
+    def test_run_covers_every_row(self):
+        print("\nSplit Rows Test:")
+        counts = np.zeros(100, np.int64)
+
+        def count_rows(rows):
+            counts[rows] += 1
+
+        self.execution.run(count_rows, 100)
+        np.testing.assert_array_equal(counts, 1)
+        self.execution.run(count_rows, 20)
+        np.testing.assert_array_equal(counts, 2)
+
+        report = self.execution.report()
+        self.assertEqual(report['split_calls'], 1)
+        self.assertEqual(report['serial_calls'], 1)
+        self.assertGreater(report['effective_parallelism'], 0)
+        self.assertLessEqual(report['effective_parallelism'], 3.5)
+
+    def test_threaded_gradients_match(self):
+        print("\nThreaded Gradients Test:")
+        threaded_network = copy.deepcopy(self.network)
+        threaded_network.execution = self.execution
+
+        errors = [network.compute_gradients(self.inputs, self.labels)
+                  for network in (self.network, threaded_network)]
+        self.assertAlmostEqual(errors[0], errors[1])
+        for layer, threaded_layer in zip(self.network.layers, threaded_network.layers):
+            np.testing.assert_allclose(threaded_layer.weight_gradients, layer.weight_gradients)
+            np.testing.assert_allclose(threaded_layer.bias_gradients, layer.bias_gradients)
+        self.assertGreater(self.execution.report()['split_calls'], 0)
+
+    def test_threaded_training_matches(self):
+        print("\nThreaded Training Test:")
+        threaded_network = copy.deepcopy(self.network)
+        threaded_network.execution = self.execution
+
+        for network in (self.network, threaded_network):
+            np.random.seed(1)
+            network.train(self.inputs, self.labels, batch_size=100, epochs=3)
+        for layer, threaded_layer in zip(self.network.layers, threaded_network.layers):
+            np.testing.assert_allclose(threaded_layer.weights, layer.weights)
+        np.testing.assert_allclose(threaded_network.predict(self.inputs), self.network.predict(self.inputs))
+
+    def test_oversubscription(self):
+        print("\nOversubscription Test:")
+        with warnings.catch_warnings(record=True) as caught_warnings:
+            warnings.simplefilter('always')
+            execution = ExecutionConfig(num_of_threads=2, num_of_processes=available_cpus())
+        execution.close()
+
+        self.assertTrue(execution.report()['oversubscribed'])
+        self.assertTrue(any(issubclass(warning.category, RuntimeWarning) for warning in caught_warnings))
+
+        execution = ExecutionConfig(num_of_threads=1, blas_threads=1)
+        execution.close()
+        self.assertFalse(execution.report()['oversubscribed'])
+
+        with self.assertRaises(ValueError):
+            ExecutionConfig(num_of_threads=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,219 @@
+"""
+Controls how many threads a network's layer kernels use
+
+NumPy's matrix multiplies run on a BLAS library that starts its own
+threads, which fight with any threads or worker processes of ours for the
+same cores. `ExecutionConfig` sets the BLAS thread count explicitly and can
+split large batches and wide layers over a pool of threads instead, numpy
+releases the GIL inside its kernels so the pieces run at the same time.
+
+The BLAS thread count is set with threadpoolctl when it's installed
+(`pip install threadpoolctl`). Without it BLAS can only be limited by setting
+`OMP_NUM_THREADS`, `OPENBLAS_NUM_THREADS` or `MKL_NUM_THREADS` before numpy
+is imported, and the config only reads them.
+
+Examples
+--------
+>>> network.execution = ExecutionConfig(num_of_threads=4, blas_threads=1)
+>>> network.train(inputs, labels, batch_size=512)
+>>> network.execution.report()['effective_parallelism']
+"""
+import os
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import threadpoolctl
+except ImportError:
+    threadpoolctl = None
+
+BLAS_THREAD_VARIABLES = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS')
+
+
+def available_cpus() -> int:
+    """The number of cores this process may run on, which can be fewer than the machine has"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def get_blas_threads():
+    """
+    How many threads the BLAS library uses for each matrix multiply
+
+    Returns
+    -------
+    num_of_threads : int
+        From threadpoolctl, or the thread environment variables without it,
+        None if neither says
+    """
+    if threadpoolctl is not None:
+        thread_counts = [info['num_threads'] for info in threadpoolctl.threadpool_info()
+                         if info.get('user_api') == 'blas']
+        if thread_counts:
+            return max(thread_counts)
+    for name in BLAS_THREAD_VARIABLES:
+        value = os.environ.get(name, '')
+        if value.isdigit():
+            return int(value)
+    return None
+
+
+def limit_blas_threads(num_of_threads: int):
+    """
+    Limits the BLAS library to `num_of_threads` threads for the whole process
+
+    Returns
+    -------
+    limiter : threadpoolctl.ThreadpoolLimiter
+        Call `restore_original_limits()` on it to undo the limit, None if
+        threadpoolctl isn't installed so nothing could be changed
+    """
+    if threadpoolctl is None:
+        return None
+    return threadpoolctl.threadpool_limits(limits=num_of_threads, user_api='blas')
+
+
+class ExecutionConfig:
+    def __init__(self, num_of_threads=1, blas_threads=None, min_rows_per_thread=64, num_of_processes=1):
+        """
+        How a network's layer kernels use the cores
+
+        Batches with at least `2 * min_rows_per_thread` samples are split
+        over the threads by rows, and a layer's weight gradients are split
+        by neurons. Smaller batches run on the calling thread as usual.
+
+        Parameters
+        ----------
+        num_of_threads : int
+            The threads kernels are split over, 1 runs everything on the calling thread
+
+        blas_threads : int, optional
+            The threads BLAS may use for each multiply. Defaults to sharing
+            the cores out between our threads, `available_cpus() // num_of_threads`,
+            when there's more than one of them, otherwise BLAS is left alone.
+            The limit is for the whole process until `close`
+
+        min_rows_per_thread : int
+            The fewest rows each thread is given, below this threading costs more than it saves
+
+        num_of_processes : int
+            How many processes are running kernels like this one, such as the
+            workers of a `ParallelTrainer`, for the oversubscription check
+
+        Attributes
+        ----------
+        oversubscribed : bool
+            Whether there are more threads than cores, a `RuntimeWarning` is
+            raised when the config is made if so
+
+        Methods
+        ------
+        run(function, num_of_rows)
+            Calls `function` with a slice of the rows from each thread
+
+        report
+            The threads asked for and the parallelism actually achieved
+
+        close
+            Stops the threads and puts the BLAS thread count back
+        """
+        if num_of_threads < 1 or min_rows_per_thread < 1 or num_of_processes < 1:
+            raise ValueError('num_of_threads, min_rows_per_thread and num_of_processes must be at least 1')
+        self.num_of_threads = num_of_threads
+        self.min_rows_per_thread = min_rows_per_thread
+        self.num_of_processes = num_of_processes
+        self.cpus = available_cpus()
+
+        if blas_threads is None and num_of_threads > 1:
+            blas_threads = max(self.cpus // (num_of_threads * num_of_processes), 1)
+        self._limiter = limit_blas_threads(blas_threads) if blas_threads is not None else None
+        # An unknown BLAS is assumed to use every core, as OpenBLAS and MKL do by default
+        self.blas_threads = get_blas_threads() or self.cpus
+        self.blas_controlled = self._limiter is not None
+
+        # The calling thread runs the first slice itself so the pool only needs the rest
+        self._pool = ThreadPoolExecutor(num_of_threads - 1, 'kernel') if num_of_threads > 1 else None
+        self._lock = threading.Lock()
+        self.num_of_split_calls = 0
+        self.num_of_serial_calls = 0
+        self.busy_time = 0.0
+        self.split_time = 0.0
+
+        self.oversubscribed = self.num_of_processes * self.num_of_threads * self.blas_threads > self.cpus
+        if self.oversubscribed:
+            warnings.warn(f'{self.num_of_processes} processes x {self.num_of_threads} threads x '
+                          f'{self.blas_threads} BLAS threads is more than the {self.cpus} cores available'
+                          + ('' if self.blas_controlled else ', install threadpoolctl to limit the BLAS threads'),
+                          RuntimeWarning, stacklevel=2)
+
+    def _num_of_chunks(self, num_of_rows) -> int:
+        return max(min(self.num_of_threads, num_of_rows // self.min_rows_per_thread), 1)
+
+    def run(self, function, num_of_rows: int):
+        """
+        Splits `num_of_rows` rows into contiguous slices and calls `function(rows)`
+        with each one on the threads, returning once they have all finished
+
+        `function` has to write each slice's results into its own part of
+        preallocated arrays, the slices never overlap
+        """
+        num_of_chunks = self._num_of_chunks(num_of_rows) if self._pool is not None else 1
+        if num_of_chunks == 1:
+            with self._lock:
+                self.num_of_serial_calls += 1
+            function(slice(None))
+            return
+
+        # CPU time rather than wall time, so threads waiting for a core don't count as busy
+        def timed(rows):
+            start_time = time.thread_time()
+            function(rows)
+            return time.thread_time() - start_time
+
+        boundaries = [num_of_rows * chunk // num_of_chunks for chunk in range(num_of_chunks + 1)]
+        start_time = time.perf_counter()
+        futures = [self._pool.submit(timed, slice(start, end)) for start, end in zip(boundaries[1:], boundaries[2:])]
+        busy_time = timed(slice(0, boundaries[1]))
+        busy_time += sum(future.result() for future in futures)
+        with self._lock:
+            self.split_time += time.perf_counter() - start_time
+            self.busy_time += busy_time
+            self.num_of_split_calls += 1
+
+    def report(self) -> dict:
+        """
+        What was asked for and what was achieved
+
+        Returns
+        -------
+        report : dict
+            threads, blas_threads, processes and cpus, blas_controlled, whether
+            threadpoolctl set the BLAS thread count, oversubscribed,
+            split_calls and serial_calls, how many kernels were and weren't
+            split, and effective_parallelism, the CPU time our threads used
+            running split kernels over how long they took, at most `threads`
+            and lower when cores are shared or the slices are uneven
+        """
+        return {
+            'threads': self.num_of_threads,
+            'blas_threads': self.blas_threads,
+            'processes': self.num_of_processes,
+            'cpus': self.cpus,
+            'blas_controlled': self.blas_controlled,
+            'oversubscribed': self.oversubscribed,
+            'split_calls': self.num_of_split_calls,
+            'serial_calls': self.num_of_serial_calls,
+            'effective_parallelism': self.busy_time / self.split_time if self.split_time else 1.0,
+        }
+
+    def close(self):
+        """Stops the threads and puts the BLAS thread count back to what it was"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._limiter is not None:
+            self._limiter.restore_original_limits()
+            self._limiter = None
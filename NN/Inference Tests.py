@@ -0,0 +1,124 @@
+import threading
+import tracemalloc
+import unittest
+
+import numpy as np
+
+from Inference import InferencePlan
+from Network import Network
+
+np.random.seed(0)
+
+
+class InferencePlanTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.layers = {
+            'layer1': {
+                'activation': 'relu',
+                'neurons': 64,
+            },
+            'layer2': {
+                'activation': 'sigmoid',
+                'neurons': 4,
+            }
+        }
+        self.network = Network(8, self.layers)
+        self.plan = InferencePlan(self.network, max_batch_size=32)
+        self.inputs = np.random.random_sample((20, 8))
+
+    def test_run_matches_predict(self):
+        print("\nPlan Run Test:")
+        np.testing.assert_allclose(self.plan.run(self.inputs), self.network.predict(self.inputs))
+        np.testing.assert_allclose(self.plan.run(self.inputs[:3]), self.network.predict(self.inputs[:3]))
+
+    def test_softmax_output(self):
+        print("\nPlan Softmax Test:")
+        self.network.add_layer(3, 'softmax')
+        plan = InferencePlan(self.network, max_batch_size=32)
+        np.testing.assert_allclose(plan.run(self.inputs), self.network.predict(self.inputs))
+
+    def test_float32_plan(self):
+        print("\nPlan Float32 Test:")
+        network = Network(8, self.layers, np.float32)
+        plan = InferencePlan(network, max_batch_size=32)
+        outputs = plan.run(self.inputs)
+        self.assertEqual(outputs.dtype, np.float32)
+        np.testing.assert_allclose(outputs, network.predict(self.inputs), rtol=1e-5)
+
+    def test_plan_is_frozen(self):
+        print("\nPlan Frozen Test:")
+        expected_outputs = self.plan.run(self.inputs).copy()
+        self.network.layers[0].weights += 1
+
+        np.testing.assert_allclose(self.plan.run(self.inputs), expected_outputs)
+        with self.assertRaises(ValueError):
+            self.plan.weights[0][0, 0] = 1
+
+    def test_run_reuses_buffers(self):
+        print("\nPlan Allocation Test:")
+        self.plan.run(self.inputs)
+
+        tracemalloc.start()
+        for _ in range(10):
+            outputs = self.plan.run(self.inputs)
+        _, peak_allocated = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"\tPeak allocated: {peak_allocated} bytes")
+        self.assertTrue(np.shares_memory(outputs, self.plan.output_buffers[-1]))
+        self.assertLess(peak_allocated, self.plan.output_buffers[0].nbytes)
+
+        # Softmax's row maximums and sums go in the plan's scratch column. The batch
+        # is big enough that a (samples, 1) temporary would be larger than numpy's
+        # fixed-size ufunc buffer, which the broadcast subtract and divide still use
+        self.network.add_layer(3, 'softmax')
+        plan = InferencePlan(self.network, max_batch_size=10000)
+        inputs = np.random.random_sample((10000, 8))
+        plan.run(inputs)
+
+        tracemalloc.start()
+        plan.run(inputs)
+        _, peak_allocated = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"\tSoftmax peak allocated: {peak_allocated} bytes")
+        self.assertLess(peak_allocated, plan.scratch_buffers[-1].nbytes)
+
+    def test_rejects_large_batches(self):
+        print("\nPlan Batch Size Test:")
+        with self.assertRaises(ValueError):
+            self.plan.run(np.zeros((33, 8)))
+
+    def test_latency_percentiles(self):
+        print("\nPlan Latency Test:")
+        with self.assertRaises(ValueError):
+            self.plan.latency_percentiles()
+
+        for _ in range(5):
+            self.plan.run(self.inputs)
+        median, slowest = self.plan.latency_percentiles((50, 100))
+        print(f"\tMedian: {median * 1e6:.1f}us   Slowest: {slowest * 1e6:.1f}us")
+        self.assertGreater(self.plan.last_call_time, 0)
+        self.assertLessEqual(median, slowest)
+
+    def test_clones_run_in_parallel(self):
+        print("\nPlan Clone Test:")
+        expected_outputs = self.network.predict(self.inputs)
+        results = {}
+
+        def run_plan(thread_index, plan):
+            for _ in range(50):
+                results[thread_index] = plan.run(self.inputs).copy()
+
+        threads = [threading.Thread(target=run_plan, args=(index, self.plan.clone())) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for outputs in results.values():
+            np.testing.assert_allclose(outputs, expected_outputs)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import time
+
+import numpy as np
+
+from Network import IN_PLACE_ACTIVATION_FUNCTIONS
+
+
+class InferencePlan:
+    def __init__(self, network, max_batch_size=256, timing_window=1024):
+        """
+        A frozen, inference only copy of a trained `Network`
+
+        The weights are copied once into read-only, transposed matrices, the
+        biases are tiled out to `max_batch_size` rows and every intermediate
+        buffer is allocated up front. Calls then only do a matmul, an in-place
+        bias add and an in-place activation per layer so steady state calls
+        allocate nothing.
+
+        A plan's buffers are reused between calls so use one plan per thread,
+        `clone` makes another plan that shares the same weights.
+
+        Parameters
+        ----------
+        network : Network
+            The trained network, later changes to it do not affect the plan.
+            The plan runs in the network's dtype
+
+        max_batch_size : int
+            The most samples that can be passed in one call
+
+        timing_window : int
+            How many of the most recent call times are kept for `latency_percentiles`
+
+        Methods
+        ------
+        run(inputs)
+            Runs a batch through the plan
+
+        clone
+            Makes a plan with its own buffers that shares these weights
+
+        latency_percentiles(percentiles=(50, 99))
+            Gives percentiles of the recent call times
+
+        Examples
+        --------
+        >>> plan = InferencePlan(network, max_batch_size=64)
+        >>> outputs = plan.run(batch)
+        >>> plan.last_call_time
+        """
+        if not network.is_fully_connected:
+            raise ValueError('Only fully connected networks can be compiled into an inference plan')
+        self.max_batch_size = max_batch_size
+        self.dtype = network.dtype
+        self.weights = []
+        self.biases = []
+        self.activations = []
+        self._softmax_layers = []
+
+        for layer in network.layers:
+            activation = layer.activation_function.__name__
+            if activation not in IN_PLACE_ACTIVATION_FUNCTIONS:
+                raise ValueError(f'{activation} layers can not be compiled into an inference plan')
+
+            weights = np.array(layer.weights.T, dtype=self.dtype, order='C')
+            # Broadcasting a bias vector in place makes a temporary copy, a full block does not
+            biases = np.tile(np.asarray(layer.biases, dtype=self.dtype), (max_batch_size, 1))
+            weights.flags.writeable = False
+            biases.flags.writeable = False
+
+            self.weights.append(weights)
+            self.biases.append(biases)
+            self.activations.append(IN_PLACE_ACTIVATION_FUNCTIONS[activation])
+            self._softmax_layers.append(activation == 'softmax')
+
+        self._timing_window = timing_window
+        self._allocate_buffers()
+
+    def _allocate_buffers(self):
+        """Allocates the input, layer output, softmax scratch and timing buffers"""
+        self.input_buffer = np.empty((self.max_batch_size, self.weights[0].shape[0]), self.dtype)
+        self.output_buffers = [np.empty((self.max_batch_size, weights.shape[1]), self.dtype) for weights in self.weights]
+        # Softmax's row maximums and sums go in a column of their own rather than two new temporaries
+        self.scratch_buffers = [np.empty((self.max_batch_size, 1), self.dtype) if is_softmax else None
+                                for is_softmax in self._softmax_layers]
+
+        self.call_times = np.zeros(self._timing_window)
+        self.num_of_calls = 0
+        self.last_call_time = None
+
+    def clone(self) -> 'InferencePlan':
+        """
+        Makes a plan with its own buffers that shares this plan's weights
+
+        Returns
+        -------
+        plan : InferencePlan
+        """
+        plan = object.__new__(InferencePlan)
+        plan.max_batch_size = self.max_batch_size
+        plan.dtype = self.dtype
+        plan.weights = self.weights
+        plan.biases = self.biases
+        plan.activations = self.activations
+        plan._softmax_layers = self._softmax_layers
+        plan._timing_window = self._timing_window
+        plan._allocate_buffers()
+        return plan
+
+    def run(self, inputs: np.ndarray) -> np.ndarray:
+        """
+        Runs a batch through the plan
+
+        Parameters
+        ----------
+        inputs : np.ndarray
+            A (samples, features) array with at most `max_batch_size` samples
+
+        Returns
+        -------
+        outputs : np.ndarray
+            A (samples, outputs) view of the plan's output buffer, it is
+            overwritten by the next call so copy it if it needs to be kept
+        """
+        start_time = time.perf_counter()
+
+        num_of_samples = len(inputs)
+        if num_of_samples > self.max_batch_size:
+            raise ValueError(f'Got {num_of_samples} samples but the plan was built for at most {self.max_batch_size}')
+
+        layer_outputs = self.input_buffer[:num_of_samples]
+        np.copyto(layer_outputs, inputs)
+
+        for weights, biases, activation, buffer, scratch in zip(self.weights, self.biases, self.activations,
+                                                                self.output_buffers, self.scratch_buffers):
+            layer_inputs, layer_outputs = layer_outputs, buffer[:num_of_samples]
+            np.dot(layer_inputs, weights, out=layer_outputs)
+            layer_outputs += biases[:num_of_samples]
+            if scratch is None:
+                activation(layer_outputs)
+            else:
+                activation(layer_outputs, scratch=scratch[:num_of_samples])
+
+        self.last_call_time = time.perf_counter() - start_time
+        self.call_times[self.num_of_calls % self._timing_window] = self.last_call_time
+        self.num_of_calls += 1
+        return layer_outputs
+
+    def latency_percentiles(self, percentiles=(50, 99)) -> np.ndarray:
+        """
+        Gives percentiles of the most recent call times
+
+        Parameters
+        ----------
+        percentiles : sequence of float
+            Which percentiles to work out, from 0 to 100
+
+        Returns
+        -------
+        latencies : np.ndarray
+            The call time in seconds for each percentile
+        """
+        if self.num_of_calls == 0:
+            raise ValueError('The plan has not been run yet')
+        recent_call_times = self.call_times[:min(self.num_of_calls, self._timing_window)]
+        return np.percentile(recent_call_times, percentiles)
@@ -1,5 +1,8 @@
+import os
+import tempfile
 import unittest
-from Network import Neuron, sigmoid, relu, Network
+from Network import Neuron, Layer, sigmoid, relu, softmax, cross_entropy, Network
+from Optimizers import Adam
 import numpy as np
 
 np.random.seed(0)
@@ -72,8 +75,10 @@ class NeuronTesting(unittest.TestCase):
     def test_output_backprop(self):
         print("\nOutput Backprop Test:")
         output_layer = self.network.layers[-1]
+        self.network.forward_prop(self.data_set[0])
         self.network._gen_output_errors([1, 0])
-        self.assertEqual(output_layer[0].error_gradient, 1)
+        output = output_layer[0].output
+        self.assertAlmostEqual(output_layer[0].error_gradient, (1 - output) * output * (1 - output))
 
     def test_hidden_backprop(self):
         print("\nHidden Backprop Test:")
@@ -89,6 +94,7 @@ class NeuronTesting(unittest.TestCase):
 
     def test_hidden_backprop_changes(self):
         print("\nHidden Backprop Changes Test:")
+        self.network.forward_prop(self.data_set[0])
         self.network._gen_output_errors(self.labels[0])
         self.network._gen_hidden_errors()
 
@@ -110,6 +116,7 @@ class NeuronTesting(unittest.TestCase):
     def test_update_input_weights(self):
         input_layer = self.network.layers[0]
 
+        self.network.forward_prop(self.data_set[0])
         self.network._gen_output_errors([1, 0])
         self.network._gen_hidden_errors()
 
@@ -148,6 +155,646 @@ class NeuronTesting(unittest.TestCase):
         self.assertNotEqual(previous_weights, current_weights)
 
 
+class LayerTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        # The other tests rely on the seeded random stream so leave it untouched
+        self.random_state = np.random.get_state()
+        self.layer = Layer(4, 3, 'relu')
+
+    def tearDown(self) -> None:
+        np.random.set_state(self.random_state)
+
+    def test_layer_shape(self):
+        print("\nLayer Shape Test:")
+        self.assertEqual(self.layer.weights.shape, (3, 4))
+        self.assertEqual(self.layer.biases.shape, (3,))
+        self.assertEqual(len(self.layer), 3)
+        self.assertEqual(len(list(self.layer)), 3)
+
+    def test_neuron_view_writes_through(self):
+        print("\nNeuron View Test:")
+        neuron = self.layer[-1]
+        neuron.weights[0] = 5.0
+        neuron.bias = 2.0
+        self.assertEqual(self.layer.weights[2, 0], 5.0)
+        self.assertEqual(self.layer.biases[2], 2.0)
+        self.assertEqual(neuron.activation_function.__name__, 'relu')
+
+        with self.assertRaises(IndexError):
+            self.layer[3]
+
+    def test_layer_run_matches_neurons(self):
+        print("\nLayer Run Test:")
+        inputs = [0.3, -0.2, 0.9, 0.1]
+        outputs = self.layer.run(inputs).copy()
+        for neuron, output in zip(self.layer, outputs):
+            self.assertAlmostEqual(neuron.run(inputs), output)
+
+
+class TrainingTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.random_state = np.random.get_state()
+        np.random.seed(1)
+
+        self.layers = {
+            'layer 1': {
+                'activation': 'relu',
+                'neurons': 6,
+            },
+            'layer 2': {
+                'activation': 'sigmoid',
+                'neurons': 2,
+            }
+        }
+        self.network = Network(3, self.layers)
+
+        self.inputs = np.random.random_sample((40, 3))
+        self.labels = np.stack([self.inputs[:, 0] > 0.5, self.inputs[:, 1] > 0.5], axis=1).astype(float)
+
+    def tearDown(self) -> None:
+        np.random.set_state(self.random_state)
+
+    def test_gradients_match_numerical(self):
+        print("\nGradient Check Test:")
+        inputs, labels = self.inputs[:5], self.labels[:5]
+        self.network.compute_gradients(inputs, labels)
+        layer = self.network.layers[0]
+        gradient = layer.weight_gradients[1, 2]
+
+        step = 1e-6
+        layer.weights[1, 2] += step
+        error_plus = self.network.compute_gradients(inputs, labels)
+        layer.weights[1, 2] -= 2 * step
+        error_minus = self.network.compute_gradients(inputs, labels)
+
+        numerical_gradient = -(error_plus - error_minus) / (2 * step) / len(inputs)
+        self.assertAlmostEqual(gradient, numerical_gradient, 6)
+
+    def test_back_prop_matches_batch_gradients(self):
+        print("\nPer-sample Backprop Test:")
+        self.network.forward_prop(self.inputs[0])
+        self.network.back_prop(self.labels[0])
+        per_sample_errors = [layer.error_gradients.copy() for layer in self.network.layers]
+
+        self.network.compute_gradients(self.inputs[:1], self.labels[:1])
+        for layer, errors in zip(self.network.layers, per_sample_errors):
+            np.testing.assert_allclose(layer.bias_gradients, errors)
+
+    def test_train_reduces_error(self):
+        print("\nTrain Test:")
+        self.network.learning_rate = 1.0
+        errors = self.network.train(self.inputs, self.labels, batch_size=8, epochs=50)
+        print(f"\tFirst epoch error: {errors[0]:.4f}   Last epoch error: {errors[-1]:.4f}")
+        self.assertEqual(len(errors), 50)
+        self.assertLess(errors[-1], errors[0])
+
+    def test_train_rejects_mismatched_data(self):
+        print("\nTrain Mismatch Test:")
+        with self.assertRaises(ValueError):
+            self.network.train(self.inputs, self.labels[:-1])
+
+
+class CheckpointTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.random_state = np.random.get_state()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'network.pnn')
+
+        self.layers = {
+            'layer1': {
+                'activation': 'relu',
+                'neurons': 7,
+            },
+            'layer2': {
+                'activation': 'sigmoid',
+                'neurons': 3,
+            }
+        }
+        self.network = Network(5, self.layers)
+        self.network.learning_rate = 0.25
+        for layer in self.network.layers:
+            layer.biases += np.random.random_sample(len(layer))
+
+        self.inputs = np.random.random_sample((4, 5))
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+        np.random.set_state(self.random_state)
+
+    def assertNetworksEqual(self, network, other_network):
+        self.assertEqual(network.get_layers_json(), other_network.get_layers_json())
+        for layer, other_layer in zip(network.layers, other_network.layers):
+            np.testing.assert_array_equal(layer.weights, other_layer.weights)
+            np.testing.assert_array_equal(layer.biases, other_layer.biases)
+
+    def test_save_load(self):
+        print("\nSave Load Test:")
+        self.network.save(self.path)
+        loaded_network = Network.load(self.path)
+
+        self.assertNetworksEqual(self.network, loaded_network)
+        self.assertEqual(loaded_network.learning_rate, 0.25)
+
+        loaded_network.train(self.inputs, np.ones((4, 3)), epochs=1)
+        self.assertFalse(np.array_equal(self.network.layers[0].weights, loaded_network.layers[0].weights))
+
+    def test_save_load_optimizer_state(self):
+        print("\nSave Load Optimizer Test:")
+        labels = np.ones((4, 3))
+        self.network.optimizer = Adam(learning_rate=0.01)
+        self.network.train(self.inputs, labels, batch_size=2, epochs=2)
+        self.network.save(self.path)
+        loaded_network = Network.load(self.path)
+
+        self.assertIsInstance(loaded_network.optimizer, Adam)
+        self.assertEqual(loaded_network.optimizer.num_of_steps, 4)
+
+        for network in (self.network, loaded_network):
+            network.train(self.inputs, labels, batch_size=2, epochs=1, shuffle=False)
+        self.assertNetworksEqual(self.network, loaded_network)
+
+    def test_load_memory_mapped(self):
+        print("\nMemory Mapped Load Test:")
+        self.network.save(self.path)
+        loaded_network = Network.load(self.path, mmap_mode='r')
+
+        self.assertNetworksEqual(self.network, loaded_network)
+        self.assertIsInstance(loaded_network.layers[0].weights, np.memmap)
+        with self.assertRaises(ValueError):
+            loaded_network.layers[0].weights += 1
+
+    def test_load_rejects_other_files(self):
+        print("\nBad Checkpoint Test:")
+        with open(self.path, 'w') as other_file:
+            other_file.write('Layer 0:')
+        with self.assertRaises(ValueError):
+            Network.load(self.path)
+
+
+class PredictTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.random_state = np.random.get_state()
+        self.layers = {
+            'layer1': {
+                'activation': 'relu',
+                'neurons': 8,
+            },
+            'layer2': {
+                'activation': 'sigmoid',
+                'neurons': 4,
+            }
+        }
+        self.network = Network(6, self.layers)
+        self.inputs = np.random.random_sample((10, 6))
+
+    def tearDown(self) -> None:
+        np.random.set_state(self.random_state)
+
+    def test_predict_matches_forward_prop(self):
+        print("\nPredict Test:")
+        outputs, classes = self.network.predict(self.inputs, return_classes=True)
+        self.assertEqual(outputs.shape, (10, 4))
+
+        for sample, sample_outputs, sample_class in zip(self.inputs, outputs, classes):
+            self.network.forward_prop(sample)
+            np.testing.assert_allclose(self.network.get_outputs(), sample_outputs)
+            self.assertEqual(sample_class, np.argmax(sample_outputs))
+
+    def test_predict_leaves_network_untouched(self):
+        print("\nPredict State Test:")
+        self.network.predict(self.inputs)
+        for layer in self.network.layers:
+            self.assertFalse(layer.outputs.any())
+            self.assertEqual(layer.batch_buffers, {})
+
+    def test_predict_single_sample(self):
+        print("\nPredict Single Sample Test:")
+        np.testing.assert_allclose(self.network.predict(self.inputs[3]), self.network.predict(self.inputs)[3:4])
+
+
+class SoftmaxTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.random_state = np.random.get_state()
+        np.random.seed(3)
+
+        self.layers = {
+            'layer1': {
+                'activation': 'relu',
+                'neurons': 6,
+            },
+            'layer2': {
+                'activation': 'softmax',
+                'neurons': 3,
+            }
+        }
+        self.network = Network(4, self.layers)
+        self.inputs = np.random.random_sample((8, 4))
+        self.labels = np.eye(3)[np.random.randint(0, 3, 8)]
+
+    def tearDown(self) -> None:
+        np.random.set_state(self.random_state)
+
+    def test_softmax_is_stable(self):
+        print("\nSoftmax Stability Test:")
+        outputs = softmax(np.array([[1000.0, 0.0, -1000.0], [1.0, 2.0, 3.0]]))
+        np.testing.assert_allclose(outputs.sum(axis=1), 1)
+        np.testing.assert_allclose(outputs[0], [1, 0, 0])
+        self.assertAlmostEqual(cross_entropy(np.array([[0.0, 1000.0]]), np.array([[1.0, 0.0]])), 1000)
+
+    def test_uses_cross_entropy(self):
+        print("\nCross-entropy Loss Test:")
+        self.assertEqual(self.network.loss, 'cross_entropy')
+        outputs = self.network.predict(self.inputs)
+        error = self.network.compute_gradients(self.inputs, self.labels)
+        self.assertAlmostEqual(error, -np.sum(self.labels * np.log(outputs)))
+
+    def test_gradients_match_numerical(self):
+        print("\nSoftmax Gradient Check Test:")
+        self.network.compute_gradients(self.inputs, self.labels)
+        layer = self.network.layers[-1]
+        gradient = layer.weight_gradients[2, 1]
+
+        step = 1e-6
+        layer.weights[2, 1] += step
+        error_plus = self.network.compute_gradients(self.inputs, self.labels)
+        layer.weights[2, 1] -= 2 * step
+        error_minus = self.network.compute_gradients(self.inputs, self.labels)
+
+        numerical_gradient = -(error_plus - error_minus) / (2 * step) / len(self.inputs)
+        self.assertAlmostEqual(gradient, numerical_gradient, 6)
+
+    def test_back_prop_matches_batch_gradients(self):
+        print("\nSoftmax Per-sample Backprop Test:")
+        self.network.forward_prop(self.inputs[0])
+        self.network.back_prop(self.labels[0])
+        self.assertAlmostEqual(self.network.calculate_error(self.labels[0]),
+                               self.network.compute_gradients(self.inputs[:1], self.labels[:1]))
+        np.testing.assert_allclose(self.network.layers[0].bias_gradients, self.network.layers[0].error_gradients)
+
+    def test_hidden_softmax_is_rejected(self):
+        print("\nHidden Softmax Test:")
+        self.network.add_layer(2)
+        with self.assertRaises(ValueError):
+            self.network.compute_gradients(self.inputs, self.labels[:, :2])
+
+
+class EvaluateTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.random_state = np.random.get_state()
+        np.random.seed(4)
+
+        self.layers = {
+            'layer1': {
+                'activation': 'relu',
+                'neurons': 8,
+            },
+            'layer2': {
+                'activation': 'sigmoid',
+                'neurons': 3,
+            }
+        }
+        self.network = Network(5, self.layers)
+        self.inputs = np.random.random_sample((23, 5))
+        self.class_ids = np.random.randint(0, 3, 23)
+        self.labels = np.eye(3)[self.class_ids]
+
+    def tearDown(self) -> None:
+        np.random.set_state(self.random_state)
+
+    def test_evaluate_matches_per_sample(self):
+        print("\nEvaluate Test:")
+        results = self.network.evaluate(self.inputs, self.labels, chunk_size=4)
+
+        errors, correct = [], 0
+        for sample, label in zip(self.inputs, self.labels):
+            self.network.forward_prop(sample)
+            errors.append(self.network.calculate_error(label))
+            correct += np.argmax(self.network.get_outputs()) == np.argmax(label)
+
+        self.assertAlmostEqual(results['loss'], np.mean(errors))
+        self.assertAlmostEqual(results['accuracy'], correct / len(self.inputs))
+        self.assertEqual(results['confusion_matrix'].sum(), len(self.inputs))
+        np.testing.assert_array_equal(results['confusion_matrix'].sum(axis=1), np.bincount(self.class_ids, minlength=3))
+
+    def test_evaluate_class_ids_and_softmax(self):
+        print("\nEvaluate Class Ids Test:")
+        self.network.add_layer(3, 'softmax')
+        results = self.network.evaluate(self.inputs, self.labels)
+        id_results = self.network.evaluate(self.inputs, self.class_ids, chunk_size=5)
+
+        self.assertAlmostEqual(results['loss'], self.network.compute_gradients(self.inputs, self.labels) / 23)
+        self.assertAlmostEqual(id_results['loss'], results['loss'])
+        np.testing.assert_array_equal(id_results['confusion_matrix'], results['confusion_matrix'])
+
+    def test_evaluate_leaves_network_untouched(self):
+        print("\nEvaluate State Test:")
+        self.network.forward_prop(self.inputs[0])
+        self.network.back_prop(self.labels[0])
+        state = [(layer.outputs.copy(), layer.error_gradients.copy()) for layer in self.network.layers]
+
+        self.network.evaluate(self.inputs, self.labels)
+        for layer, (outputs, error_gradients) in zip(self.network.layers, state):
+            np.testing.assert_array_equal(layer.outputs, outputs)
+            np.testing.assert_array_equal(layer.error_gradients, error_gradients)
+            self.assertEqual(layer.batch_buffers, {})
+        self.assertIsNone(self.network.error)
+
+    def test_empty_data_set(self):
+        print("\nEmpty Data Set Test:")
+        with self.assertRaises(ValueError):
+            self.network.evaluate(self.inputs[:0], self.labels[:0])
+        with self.assertRaises(ValueError):
+            self.network.train(self.inputs[:0], self.labels[:0], epochs=1)
+
+
+class TopologyTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.random_state = np.random.get_state()
+        np.random.seed(5)
+
+        self.layers = {
+            'layer1': {
+                'activation': 'relu',
+                'neurons': 6,
+            },
+            'layer2': {
+                'activation': 'sigmoid',
+                'neurons': 4,
+            },
+            'layer3': {
+                'activation': 'softmax',
+                'neurons': 3,
+            }
+        }
+        self.network = Network(5, self.layers)
+        self.inputs = np.random.random_sample((12, 5))
+        self.labels = np.eye(3)[np.random.randint(0, 3, 12)]
+        self.network.train(self.inputs, self.labels, batch_size=4, epochs=2)
+        self.outputs = self.network.predict(self.inputs)
+
+    def tearDown(self) -> None:
+        np.random.set_state(self.random_state)
+
+    def assertLayerSizesMatch(self):
+        for layer, next_layer in zip(self.network.layers, self.network.layers[1:]):
+            self.assertEqual(next_layer.num_of_inputs, len(layer))
+        self.network.compute_gradients(self.inputs, self.labels)
+
+    def test_widen_preserves_outputs(self):
+        print("\nWiden Layer Test:")
+        self.network.resize_layer(0, 11)
+        self.assertEqual(len(self.network.layers[0]), 11)
+        self.assertLayerSizesMatch()
+        np.testing.assert_allclose(self.network.predict(self.inputs), self.outputs)
+
+    def test_narrow_layer(self):
+        print("\nNarrow Layer Test:")
+        kept_weights = self.network.layers[1].weights[[0, 2]]
+        self.network.layers[2].weights[:, [1, 3]] = 0
+        self.network.resize_layer(1, 2)
+        self.assertLayerSizesMatch()
+        np.testing.assert_array_equal(self.network.layers[1].weights, kept_weights)
+
+    def test_resize_output_layer(self):
+        print("\nResize Output Layer Test:")
+        self.network.resize_layer(-1, 5)
+        self.assertEqual(self.network.predict(self.inputs).shape, (12, 5))
+        self.network.resize_layer(-1, 3)
+        np.testing.assert_allclose(self.network.predict(self.inputs), self.outputs)
+
+    def test_insert_and_remove_relu_layer(self):
+        print("\nInsert Layer Test:")
+        weights = [layer.weights.copy() for layer in self.network.layers]
+        self.network.insert_layer(1, 8)
+        self.assertEqual(len(self.network.layers), 4)
+        self.assertLayerSizesMatch()
+        np.testing.assert_allclose(self.network.predict(self.inputs), self.outputs)
+
+        self.network.remove_layer(1)
+        self.assertLayerSizesMatch()
+        for layer, layer_weights in zip(self.network.layers, weights):
+            np.testing.assert_allclose(layer.weights, layer_weights)
+
+    def test_remove_layer_fixes_sizes(self):
+        print("\nRemove Layer Test:")
+        self.network.remove_layer(0)
+        self.assertEqual(self.network.layers[0].num_of_inputs, 5)
+        self.assertLayerSizesMatch()
+
+    def test_change_activation(self):
+        print("\nChange Activation Test:")
+        weights = self.network.layers[1].weights.copy()
+        self.network.change_activation(1, 'relu')
+        self.assertIs(self.network.layers[1].activation_function, relu)
+        np.testing.assert_array_equal(self.network.layers[1].weights, weights)
+        with self.assertRaises(ValueError):
+            self.network.change_activation(1, 'other')
+
+    def test_update_layers_keeps_unchanged_layers(self):
+        print("\nUpdate Layers Test:")
+        first_weights = self.network.layers[0].weights.copy()
+        new_layers = dict(self.layers, layer2={'activation': 'sigmoid', 'neurons': 7})
+        self.network.update_layers(5, new_layers)
+
+        self.assertEqual(self.network.get_layers_json(), Network(5, new_layers).get_layers_json())
+        np.testing.assert_array_equal(self.network.layers[0].weights, first_weights)
+        np.testing.assert_allclose(self.network.predict(self.inputs), self.outputs)
+        self.assertLayerSizesMatch()
+
+        self.network.update_layers(4, {'layer1': {'activation': 'relu', 'neurons': 6}})
+        self.assertEqual(len(self.network.layers), 1)
+        self.assertEqual(self.network.layers[0].num_of_inputs, 4)
+
+    def test_optimizer_state_follows_layers(self):
+        print("\nTopology Optimizer State Test:")
+        self.network.optimizer = Adam()
+        self.network.compute_gradients(self.inputs, self.labels)
+        self.network.apply_gradients()
+        output_state = self.network.optimizer.state['layer3.biases']['mean']
+
+        self.network.insert_layer(0)
+        self.assertIs(self.network.optimizer.state['layer4.biases']['mean'], output_state)
+        self.network.remove_layer(0)
+        self.assertIs(self.network.optimizer.state['layer3.biases']['mean'], output_state)
+        self.assertNotIn('layer4.biases', self.network.optimizer.state)
+
+
+class ConvolutionTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.random_state = np.random.get_state()
+        np.random.seed(0)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'network.pnn')
+
+        self.layers = {
+            'conv': {'type': 'conv2d', 'input_shape': (1, 8, 8), 'filters': 4, 'kernel_size': 3, 'padding': 1},
+            'pool': {'type': 'maxpool', 'pool_size': 2},
+            'flatten': {'type': 'flatten'},
+            'output': {'activation': 'softmax', 'neurons': 2},
+        }
+        self.network = Network(64, self.layers)
+
+        # Vertical bars are class 0 and horizontal bars class 1, anywhere in the image
+        self.inputs = np.random.random_sample((200, 1, 8, 8)) * 0.2
+        self.labels = np.zeros((200, 2))
+        for index, image in enumerate(self.inputs):
+            position = np.random.randint(8)
+            if index % 2:
+                image[0, position, :] += 1
+            else:
+                image[0, :, position] += 1
+            self.labels[index, index % 2] = 1
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+        np.random.set_state(self.random_state)
+
+    def assertGradientsMatch(self, network, inputs, labels):
+        """Compares the first layer's weight gradients to ones worked out by nudging each weight"""
+        network.compute_gradients(inputs, labels)
+        weights = network.layers[0].weights
+        gradients = network.layers[0].weight_gradients.copy()
+
+        numerical_gradients = np.zeros_like(weights)
+        for index in np.ndindex(weights.shape):
+            weights[index] += 1e-6
+            loss_up = network.evaluate(inputs, labels)['loss']
+            weights[index] -= 2e-6
+            loss_down = network.evaluate(inputs, labels)['loss']
+            weights[index] += 1e-6
+            numerical_gradients[index] = (loss_down - loss_up) / 2e-6
+        np.testing.assert_allclose(gradients, numerical_gradients, atol=1e-7)
+
+    def test_shapes(self):
+        print("\nConvolution Shapes Test:")
+        self.assertEqual([layer.output_shape for layer in self.network.layers], [(4, 8, 8), (4, 4, 4), (64,), (2,)])
+        self.assertEqual(self.network.predict(self.inputs[:3]).shape, (3, 2))
+        np.testing.assert_allclose(self.network.predict(self.inputs[:3].reshape(3, 64)),
+                                   self.network.predict(self.inputs[:3]))
+
+        # The same 64 inputs fully connected to 4 * 8 * 8 neurons needs 110 times as many weights
+        num_of_weights = sum(layer.weights.size for layer in self.network.layers if layer.weights is not None)
+        self.assertEqual(self.network.layers[0].weights.size, 36)
+        self.assertEqual(num_of_weights, 36 + 128)
+
+    def test_gradients(self):
+        print("\nConvolution Gradients Test:")
+        self.assertGradientsMatch(self.network, self.inputs[:4], self.labels[:4])
+
+        strided_network = Network(64, {
+            'conv': {'type': 'conv2d', 'input_shape': (1, 8, 8), 'filters': 3, 'kernel_size': 3, 'stride': 2,
+                     'activation': 'sigmoid'},
+            'pool': {'type': 'maxpool', 'pool_size': 2, 'stride': 1},
+            'flatten': {'type': 'flatten'},
+            'output': {'activation': 'softmax', 'neurons': 2},
+        })
+        self.assertGradientsMatch(strided_network, self.inputs[:4], self.labels[:4])
+
+    def test_train(self):
+        print("\nConvolution Train Test:")
+        self.network.learning_rate = 0.5
+        errors = self.network.train(self.inputs[:160], self.labels[:160], batch_size=16, epochs=10)
+        self.assertLess(errors[-1], errors[0])
+        self.assertGreater(self.network.evaluate(self.inputs[160:], self.labels[160:])['accuracy'], 0.9)
+
+    def test_save_load(self):
+        print("\nConvolution Save Load Test:")
+        self.network.train(self.inputs, self.labels, batch_size=20, epochs=1)
+        self.network.prune(0.5, per_layer=True)
+        self.network.save(self.path)
+        loaded_network = Network.load(self.path)
+
+        self.assertEqual(loaded_network.get_layers_json(), self.network.get_layers_json())
+        np.testing.assert_array_equal(loaded_network.predict(self.inputs), self.network.predict(self.inputs))
+
+        # The filters' pruning mask comes back with them and keeps them pruned
+        np.testing.assert_array_equal(loaded_network.layers[0].mask, self.network.layers[0].mask)
+        loaded_network.train(self.inputs, self.labels, batch_size=20, epochs=1)
+        self.assertEqual(np.count_nonzero(loaded_network.layers[0].weights), 18)
+
+    def test_layout_errors(self):
+        print("\nConvolution Layout Errors Test:")
+        with self.assertRaises(ValueError):
+            Network(64, {'conv': {'type': 'conv2d', 'filters': 4}})
+        with self.assertRaises(ValueError):
+            Network(64, {'conv': dict(self.layers['conv']), 'output': {'activation': 'softmax', 'neurons': 2}})
+        with self.assertRaises(ValueError):
+            Network(50, self.layers)
+        with self.assertRaises(ValueError):
+            self.network.resize_layer(0, 8)
+        with self.assertRaises(ValueError):
+            self.network.insert_layer(1)
+
+    def test_update_layers(self):
+        print("\nConvolution Update Layers Test:")
+        conv_layer = self.network.layers[0]
+        new_layers = dict(self.layers, output={'activation': 'softmax', 'neurons': 3})
+        self.network.update_layers(64, new_layers)
+
+        self.assertIs(self.network.layers[0], conv_layer)
+        self.assertEqual(self.network.get_layers_json(), Network(64, new_layers).get_layers_json())
+        self.assertEqual(self.network.predict(self.inputs[:2]).shape, (2, 3))
+
+
+class DtypeTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.random_state = np.random.get_state()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'network.pnn')
+
+        self.layers = {
+            'layer1': {
+                'activation': 'relu',
+                'neurons': 10,
+            },
+            'layer2': {
+                'activation': 'softmax',
+                'neurons': 3,
+            }
+        }
+        self.network = Network(6, self.layers, np.float32)
+        self.inputs = np.random.random_sample((40, 6)).astype(np.float32)
+        self.labels = np.eye(3, dtype=np.float32)[np.random.randint(0, 3, 40)]
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+        np.random.set_state(self.random_state)
+
+    def assertFloat32(self, network):
+        self.assertEqual(network.dtype, np.float32)
+        for layer in network.layers:
+            for array in (layer.weights, layer.biases, layer.outputs, layer.weight_gradients, layer.bias_gradients):
+                self.assertEqual(array.dtype, np.float32)
+
+    def test_train_keeps_float32(self):
+        print("\nFloat32 Train Test:")
+        self.network.train(self.inputs, self.labels, batch_size=8, epochs=2)
+        self.assertFloat32(self.network)
+        self.assertEqual(self.network.predict(self.inputs).dtype, np.float32)
+
+        # float64 inputs are converted rather than promoting the network
+        self.network.train(self.inputs.astype(np.float64), self.labels, batch_size=8, epochs=1)
+        self.assertFloat32(self.network)
+
+    def test_prefetch_keeps_float32(self):
+        print("\nFloat32 Prefetch Test:")
+        self.network.train(self.inputs.astype(np.float64), self.labels, batch_size=8, epochs=2, prefetch=2)
+        self.assertFloat32(self.network)
+
+    def test_save_load_keeps_float32(self):
+        print("\nFloat32 Save Load Test:")
+        self.network.train(self.inputs, self.labels, batch_size=8, epochs=1)
+        self.network.save(self.path)
+        loaded_network = Network.load(self.path)
+
+        self.assertEqual(loaded_network.dtype, np.float32)
+        for layer, loaded_layer in zip(self.network.layers, loaded_network.layers):
+            self.assertEqual(loaded_layer.weights.dtype, np.float32)
+            np.testing.assert_array_equal(loaded_layer.weights, layer.weights)
+        loaded_network.train(self.inputs, self.labels, batch_size=8, epochs=1)
+        self.assertFloat32(loaded_network)
+
+
 # TODO add tests for network
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,13 @@
+import time
 from typing import List
 
 import numpy as np
 
+from Checkpoint import save_arrays, load_arrays
+from Optimizers import SGD, get_optimizer
+from Pipeline import BatchPipeline
+from Replay import ReplayBuffer
+
 
 def sigmoid(x, derivative=False) -> float:
     sigm = 1 / (1 + np.exp(-x))
@@ -12,11 +18,152 @@ def sigmoid(x, derivative=False) -> float:
 
 def relu(x, derivative=False) -> float:
     if derivative:
-        x = 0 if x < 0 else 1
-        return x
+        return np.heaviside(x, 1)
     return np.maximum(x, 0)
 
 
+def softmax(x, derivative=False) -> np.ndarray:
+    """
+    Turns the last axis of `x` into probabilities, the largest value is
+    taken off first so the exponentials can't overflow
+
+    Softmax has no elementwise derivative, it is only used for the output
+    layer where it's paired with cross-entropy and the two derivatives cancel
+    down to `labels - outputs`, see `cross_entropy`
+    """
+    if derivative:
+        raise ValueError('softmax has no elementwise derivative, it can only be used for the output layer')
+    exponentials = np.exp(x - np.max(x, axis=-1, keepdims=True))
+    return exponentials / np.sum(exponentials, axis=-1, keepdims=True)
+
+
+def cross_entropy(logits, labels, axis=None) -> float:
+    """
+    The summed cross-entropy between softmax(logits) and the labels
+
+    Worked out from the logits with the log-sum-exp trick rather than from
+    the softmax outputs, so an output that rounds to 0 doesn't give an infinite error.
+    `axis` picks which axes are summed, such as every axis but the models of an `Ensemble`
+    """
+    shifted = logits - np.max(logits, axis=-1, keepdims=True)
+    log_probabilities = shifted - np.log(np.sum(np.exp(shifted), axis=-1, keepdims=True))
+    return -np.sum(labels * log_probabilities, axis=axis)
+
+
+def sigmoid_in_place(x, out=None) -> np.ndarray:
+    """sigmoid(x) written into `out`, which defaults to `x` itself"""
+    out = x if out is None else out
+    np.negative(x, out=out)
+    np.exp(out, out=out)
+    out += 1
+    return np.reciprocal(out, out=out)
+
+
+def relu_in_place(x, out=None) -> np.ndarray:
+    """relu(x) written into `out`, which defaults to `x` itself"""
+    return np.maximum(x, 0, out=x if out is None else out)
+
+
+def softmax_in_place(x, out=None, scratch=None) -> np.ndarray:
+    """
+    softmax(x) written into `out`, which defaults to `x` itself
+
+    `scratch` is an optional (rows, 1) array the row maximums and sums are
+    written into, without it each call allocates two temporary columns
+    """
+    out = x if out is None else out
+    np.subtract(x, np.maximum.reduce(x, axis=-1, keepdims=True, out=scratch), out=out)
+    np.exp(out, out=out)
+    out /= np.add.reduce(out, axis=-1, keepdims=True, out=scratch)
+    return out
+
+
+def sigmoid_derivative(pre_activations, outputs, out=None) -> np.ndarray:
+    """sigmoid'(x) from the sigmoid's outputs, s * (1 - s), without another exponential"""
+    out = np.subtract(1, outputs, out=out)
+    out *= outputs
+    return out
+
+
+def relu_derivative(pre_activations, outputs, out=None) -> np.ndarray:
+    """relu'(x), 1 where x >= 0 to match `relu(x, derivative=True)`"""
+    return np.heaviside(pre_activations, 1, out=out)
+
+
+ACTIVATION_FUNCTIONS = {
+    'sigmoid': sigmoid,
+    'relu': relu,
+    'softmax': softmax,
+}
+
+IN_PLACE_ACTIVATION_FUNCTIONS = {
+    'sigmoid': sigmoid_in_place,
+    'relu': relu_in_place,
+    'softmax': softmax_in_place,
+}
+
+ACTIVATION_DERIVATIVES = {
+    'sigmoid': sigmoid_derivative,
+    'relu': relu_derivative,
+}
+
+
+def get_activation_function(activation_function: str):
+    """
+    Looks up an activation function by name
+
+    Parameters
+    ----------
+    activation_function : str
+        The name of the activation function, case insensitive
+
+    Returns
+    -------
+    activation_function : function
+    """
+    try:
+        return ACTIVATION_FUNCTIONS[activation_function.lower()]
+    except KeyError:
+        supported = ''.join(f'\n\t-{name}' for name in ACTIVATION_FUNCTIONS)
+        raise ValueError(f'\n{activation_function} is not supported.'
+                         f'\nHere are a list of supported functions:'
+                         f'{supported}') from None
+
+
+def batch_indexes(num_of_samples: int, batch_size: int, shuffle=True):
+    """
+    Splits a data set into batches of sample indexes
+
+    Parameters
+    ----------
+    num_of_samples : int
+        How many samples are in the data set
+
+    batch_size : int
+        How many samples are in each batch, the last batch may be smaller
+
+    shuffle : bool
+        Uses a random order drawn from `np.random`
+
+    Yields
+    ------
+    indexes : np.ndarray
+        The indexes of the samples in the next batch
+    """
+    order = np.random.permutation(num_of_samples) if shuffle else np.arange(num_of_samples)
+    for start in range(0, num_of_samples, batch_size):
+        yield order[start:start + batch_size]
+
+
+def _keep_largest(magnitudes: np.ndarray, sparsity: float) -> np.ndarray:
+    """A mask that is False for the `sparsity` fraction of smallest magnitudes"""
+    mask = np.ones(magnitudes.shape, bool)
+    num_of_pruned = int(round(sparsity * magnitudes.size))
+    if num_of_pruned:
+        mask[np.argpartition(magnitudes, num_of_pruned - 1)[:num_of_pruned]] = False
+    return mask
+
+
 class Neuron:
     def __init__(self, num_of_inputs: int, activation_function='sigmoid'):
         """
@@ -56,16 +203,7 @@ class Neuron:
         self.bias = 0.0
         self.output = 0.0
         self.error_gradient = None
-
-        if activation_function.lower() == 'sigmoid':
-            self.activation_function = sigmoid
-        elif activation_function.lower() == 'relu':
-            self.activation_function = relu
-        else:
-            raise ValueError(f'\n{activation_function} is not supported.'
-                             f'\nHere are a list of supported functions:'
-                             f'\n\t-sigmoid'
-                             f'\n\t-relu')
+        self.activation_function = get_activation_function(activation_function)
 
     def run(self, inputs: list) -> float:
         """
@@ -89,6 +227,796 @@ class Neuron:
         return self.output
 
 
+class NeuronView:
+    def __init__(self, layer: 'Layer', index: int):
+        """
+        A lightweight view of a single neuron inside a `Layer`
+
+        Reads and writes go straight through to the layer's arrays, so
+        `view.weights` is a row of `layer.weights` rather than a copy.
+
+        Parameters
+        ----------
+        layer : Layer
+            The layer the neuron belongs to
+
+        index : int
+            The position of the neuron in the layer
+        """
+        self.layer = layer
+        self.index = index
+
+    @property
+    def weights(self) -> np.ndarray:
+        return self.layer.weights[self.index]
+
+    @weights.setter
+    def weights(self, weights):
+        self.layer.weights[self.index] = weights
+
+    @property
+    def bias(self) -> float:
+        return self.layer.biases[self.index]
+
+    @bias.setter
+    def bias(self, bias):
+        self.layer.biases[self.index] = bias
+
+    @property
+    def output(self) -> float:
+        return self.layer.outputs[self.index]
+
+    @output.setter
+    def output(self, output):
+        self.layer.outputs[self.index] = output
+
+    @property
+    def error_gradient(self) -> float:
+        return self.layer.error_gradients[self.index]
+
+    @error_gradient.setter
+    def error_gradient(self, error_gradient):
+        self.layer.error_gradients[self.index] = error_gradient
+
+    @property
+    def activation_function(self):
+        return self.layer.activation_function
+
+    def run(self, inputs: list) -> float:
+        """
+        Runs just this neuron, see `Neuron.run`
+        """
+        output_no_activation = np.dot(inputs, self.weights) + self.bias
+        self.output = self.activation_function(output_no_activation)
+        return self.output
+
+
+class Layer:
+    type = 'dense'
+
+    def __init__(self, num_of_inputs: int, num_of_neurons: int, activation_function='sigmoid', dtype=np.float64):
+        """
+        A fully connected layer of neurons
+
+        The whole layer is stored as one weight matrix and one bias vector
+        so running it is a single matrix multiply plus the activation.
+        Indexing the layer gives a `NeuronView` of one of its neurons.
+
+        Both `run` and `forward(..., training=True)` keep the pre-activations
+        and outputs so backprop can work out the activation derivatives from
+        them instead of recomputing the activation. Training batches are
+        written into buffers that are reused from batch to batch.
+
+        Parameters
+        ----------
+        num_of_inputs : int
+            Inputs from either the source image or a previous layer
+
+        num_of_neurons : int
+            How many neurons are in the layer
+
+        activation_function : str
+            The activation used by every neuron in the layer, see `Neuron`
+
+        dtype : np.dtype
+            The float type of the weights, biases and outputs
+
+        Methods
+        ------
+        run(inputs=[0.12, 0.24])
+            Executes every neuron in the layer
+
+        forward(inputs, training=False)
+            Runs a whole batch through the layer
+
+        backward(error_gradients)
+            Works out the weight and bias gradients of the last training batch
+
+        Examples
+        --------
+        >>> layer = Layer(4, 10, 'relu')
+        >>> layer.weights.shape
+        (10, 4)
+        >>> layer[0].weights.shape
+        (4,)
+        """
+        self.weights = (0.1 * np.random.standard_normal((num_of_neurons, num_of_inputs))).astype(dtype, copy=False)
+        self.biases = np.zeros(num_of_neurons, dtype)
+        self.pre_activations = np.zeros(num_of_neurons, dtype)
+        self.outputs = np.zeros(num_of_neurons, dtype)
+        self.error_gradients = np.zeros(num_of_neurons, dtype)
+        self.activation_function = get_activation_function(activation_function)
+
+        self.batch_inputs = None
+        self.batch_pre_activations = None
+        self.batch_outputs = None
+        self.batch_buffers = {}
+        self.weight_gradients = None
+        self.bias_gradients = None
+        self.mask = None
+
+    @classmethod
+    def from_arrays(cls, weights: np.ndarray, biases: np.ndarray, activation_function='sigmoid') -> 'Layer':
+        """
+        Makes a layer around existing weight and bias arrays without copying them
+
+        Parameters
+        ----------
+        weights : np.ndarray
+            A (neurons, inputs) weight matrix
+
+        biases : np.ndarray
+            A (neurons,) bias vector
+
+        activation_function : str
+            The activation used by every neuron in the layer
+
+        Returns
+        -------
+        layer : Layer
+        """
+        layer = cls(0, 0, activation_function, weights.dtype)
+        layer.replace_parameters(weights, biases)
+        return layer
+
+    @property
+    def num_of_inputs(self) -> int:
+        return self.weights.shape[1]
+
+    @property
+    def output_shape(self) -> tuple:
+        return len(self),
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.weights.dtype
+
+    def replace_parameters(self, weights: np.ndarray, biases: np.ndarray):
+        """
+        Swaps in new weight and bias arrays, which may be a different shape,
+        and clears everything worked out for the old ones, including the pruning mask
+
+        Parameters
+        ----------
+        weights : np.ndarray
+            A (neurons, inputs) weight matrix
+
+        biases : np.ndarray
+            A (neurons,) bias vector
+        """
+        if weights.ndim != 2 or biases.shape != weights.shape[:1]:
+            raise ValueError(f'Weights of shape {weights.shape} do not match biases of shape {biases.shape}')
+
+        self.weights = weights
+        self.biases = biases
+        self.pre_activations = np.zeros(len(biases), weights.dtype)
+        self.outputs = np.zeros(len(biases), weights.dtype)
+        self.error_gradients = np.zeros(len(biases), weights.dtype)
+
+        self.batch_inputs = None
+        self.batch_pre_activations = None
+        self.batch_outputs = None
+        self.batch_buffers = {}
+        self.weight_gradients = None
+        self.bias_gradients = None
+        self.mask = None
+
+    def activation_derivative(self, pre_activations, outputs, out=None) -> np.ndarray:
+        """
+        The activation's derivative worked out from cached pre-activations and outputs
+
+        Parameters
+        ----------
+        pre_activations : np.ndarray
+            What went into the activation
+
+        outputs : np.ndarray
+            What came out of it
+
+        out : np.ndarray, optional
+            Where to write the derivative
+
+        Returns
+        -------
+        derivative : np.ndarray
+        """
+        try:
+            derivative = ACTIVATION_DERIVATIVES[self.activation_function.__name__]
+        except KeyError:
+            raise ValueError(f'{self.activation_function.__name__} layers can only be the output layer') from None
+        return derivative(pre_activations, outputs, out)
+
+    def _buffer(self, name, shape) -> np.ndarray:
+        """
+        Gets a reusable buffer, only allocating when a bigger one is needed
+
+        Buffers shaped (batch, ...) grow to the biggest batch seen and a
+        view of their first rows is returned for smaller batches
+        """
+        buffer = self.batch_buffers.get(name)
+        if buffer is None or buffer.dtype != self.dtype or buffer.shape[1:] != shape[1:] or len(buffer) < shape[0]:
+            buffer = np.empty(shape, self.dtype)
+            self.batch_buffers[name] = buffer
+        return buffer[:shape[0]]
+
+    def run(self, inputs) -> np.ndarray:
+        """
+        Takes the outputs of the previous layer and produces
+        this layer's outputs
+
+        Parameters
+        ----------
+        inputs : array_like
+            Inputs from either the source image or a previous layer
+
+        Returns
+        -------
+        outputs : np.ndarray
+            The output of each neuron in the layer
+        """
+        self.pre_activations = self.weights @ inputs + self.biases
+        self.outputs = self.activation_function(self.pre_activations)
+        return self.outputs
+
+    def forward(self, inputs: np.ndarray, training=False, executor=None) -> np.ndarray:
+        """
+        Runs a whole batch through the layer
+
+        Parameters
+        ----------
+        inputs : np.ndarray
+            A (batch, inputs) array from either the source data or a previous layer
+
+        training : bool
+            Keeps the inputs, pre-activations and outputs for a following
+            `backward` call. The outputs are then a buffer that the next
+            training batch overwrites
+
+        executor : Execution.ExecutionConfig, optional
+            Splits the batch's rows over its threads
+
+        Returns
+        -------
+        outputs : np.ndarray
+            A (batch, neurons) array of outputs
+        """
+        if not training and executor is None:
+            return self.activation_function(inputs @ self.weights.T + self.biases)
+
+        shape = (len(inputs), len(self))
+        if training:
+            pre_activations = self._buffer('pre_activations', shape)
+            outputs = self._buffer('outputs', shape)
+        else:
+            pre_activations = np.empty(shape, np.result_type(inputs, self.weights))
+            outputs = pre_activations
+        in_place_activation_function = IN_PLACE_ACTIVATION_FUNCTIONS[self.activation_function.__name__]
+
+        def forward_rows(rows):
+            np.matmul(inputs[rows], self.weights.T, out=pre_activations[rows])
+            pre_activations[rows] += self.biases
+            in_place_activation_function(pre_activations[rows], outputs[rows])
+
+        if executor is None:
+            forward_rows(slice(None))
+        else:
+            executor.run(forward_rows, len(inputs))
+        if not training:
+            return outputs
+
+        self.batch_inputs = inputs
+        self.batch_pre_activations = pre_activations
+        self.batch_outputs = outputs
+        return outputs
+
+    def backward(self, error_gradients: np.ndarray, input_errors=True, apply_derivative=True,
+                 executor=None) -> np.ndarray:
+        """
+        Works out the layer's weight and bias gradients for the batch
+        from the last `forward(..., training=True)` call
+
+        The gradients use the same sign as `error_gradient`, they point
+        in the direction that reduces the error, and are averaged over the batch.
+
+        Parameters
+        ----------
+        error_gradients : np.ndarray
+            A (batch, neurons) array of errors for the layer's outputs
+
+        input_errors : bool
+            Works out the errors for the layer's inputs, the first layer
+            doesn't need them
+
+        apply_derivative : bool
+            Multiplies the errors by the activation's derivative. Turned off
+            when the loss's derivative already includes it, as with a softmax
+            output and cross-entropy
+
+        executor : Execution.ExecutionConfig, optional
+            Splits the batch's rows, and the weight gradients' neurons, over its threads
+
+        Returns
+        -------
+        error_gradients : np.ndarray
+            A (batch, inputs) array of errors for the previous layer's outputs,
+            None if `input_errors` isn't set
+        """
+        batch_size = len(error_gradients)
+        shape = (batch_size, len(self))
+        deltas = self._buffer('deltas', shape)
+        self.weight_gradients = self._buffer('weight_gradients', self.weights.shape)
+        self.bias_gradients = self._buffer('bias_gradients', self.biases.shape)
+        input_error_gradients = (self._buffer('input_error_gradients', (batch_size, self.num_of_inputs))
+                                 if input_errors else None)
+
+        def deltas_rows(rows):
+            if apply_derivative:
+                self.activation_derivative(self.batch_pre_activations[rows], self.batch_outputs[rows], out=deltas[rows])
+                deltas[rows] *= error_gradients[rows]
+            else:
+                np.copyto(deltas[rows], error_gradients[rows])
+
+        # The weight gradients sum over the batch, so they are split by neurons instead of samples
+        def gradient_rows(neurons):
+            np.matmul(deltas[:, neurons].T, self.batch_inputs, out=self.weight_gradients[neurons])
+            self.weight_gradients[neurons] /= batch_size
+            np.mean(deltas[:, neurons], axis=0, out=self.bias_gradients[neurons])
+
+        def input_error_rows(rows):
+            np.matmul(deltas[rows], self.weights, out=input_error_gradients[rows])
+
+        if executor is None:
+            deltas_rows(slice(None))
+            gradient_rows(slice(None))
+            if input_errors:
+                input_error_rows(slice(None))
+        else:
+            executor.run(deltas_rows, batch_size)
+            executor.run(gradient_rows, len(self))
+            if input_errors:
+                executor.run(input_error_rows, batch_size)
+        return input_error_gradients
+
+    def __len__(self):
+        return self.weights.shape[0]
+
+    def __getitem__(self, index: int) -> NeuronView:
+        return NeuronView(self, range(len(self))[index])
+
+    def __iter__(self):
+        return (NeuronView(self, index) for index in range(len(self)))
+
+
+def _output_size(size, window_size, stride, padding=0):
+    return (size + 2 * padding - window_size) // stride + 1
+
+
+class Conv2D:
+    type = 'conv2d'
+
+    def __init__(self, input_shape, num_of_filters: int, kernel_size=3, stride=1, padding=0,
+                 activation_function='relu', dtype=np.float64):
+        """
+        A 2D convolutional layer over (channels, height, width) images
+
+        Every window of the images is unrolled into a column (im2col) so each
+        image is one matrix multiply with the (filters, channels * kernel_size ** 2)
+        weight matrix, and the outputs come out already in (filters, height, width) order.
+
+        Parameters
+        ----------
+        input_shape : tuple
+            The (channels, height, width) of the images. Flat inputs are reshaped to it
+
+        num_of_filters : int
+            How many output channels there are
+
+        kernel_size : int
+            The height and width of the filters
+
+        stride : int
+            How far the filters move between windows
+
+        padding : int
+            How many rows and columns of zeros go around the images
+
+        activation_function : str
+            The activation of every output, see `get_activation_function`
+
+        dtype : np.dtype
+            The float type of the weights, biases and outputs
+
+        Examples
+        --------
+        >>> layer = Conv2D((1, 28, 28), 8, kernel_size=3)
+        >>> layer.output_shape
+        (8, 26, 26)
+        """
+        channels, height, width = input_shape
+        self.input_shape = tuple(int(size) for size in input_shape)
+        self.kernel_size = kernel_size
+        self.stride = stride
+        self.padding = padding
+        self.output_shape = (num_of_filters, _output_size(height, kernel_size, stride, padding),
+                             _output_size(width, kernel_size, stride, padding))
+        if min(self.output_shape[1:]) < 1:
+            raise ValueError(f'A {kernel_size}x{kernel_size} kernel does not fit {height}x{width} images')
+
+        fan_in = channels * kernel_size ** 2
+        self.weights = (0.1 * np.random.standard_normal((num_of_filters, fan_in))).astype(dtype, copy=False)
+        self.biases = np.zeros(num_of_filters, dtype)
+        self.activation_function = get_activation_function(activation_function)
+        self.mask = None
+        self.outputs = None
+        self._clear_batch()
+
+    def _clear_batch(self):
+        self.batch_columns = None
+        self.batch_input_shape = None
+        self.batch_pre_activations = None
+        self.batch_outputs = None
+        self.batch_buffers = {}
+        self.weight_gradients = None
+        self.bias_gradients = None
+
+    @property
+    def num_of_inputs(self) -> int:
+        return int(np.prod(self.input_shape))
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.weights.dtype
+
+    def get_config(self) -> dict:
+        return {
+            'type': self.type,
+            'activation': self.activation_function.__name__,
+            'filters': len(self.weights),
+            'kernel_size': self.kernel_size,
+            'stride': self.stride,
+            'padding': self.padding,
+            'input_shape': list(self.input_shape),
+        }
+
+    def replace_parameters(self, weights: np.ndarray, biases: np.ndarray):
+        """See `Layer.replace_parameters`, the shapes can't change"""
+        if weights.shape != self.weights.shape or biases.shape != self.biases.shape:
+            raise ValueError(f'Expected weights of shape {self.weights.shape} and biases of shape '
+                             f'{self.biases.shape}, got {weights.shape} and {biases.shape}')
+        self.weights = weights
+        self.biases = biases
+        self.mask = None
+        self._clear_batch()
+
+    def activation_derivative(self, pre_activations, outputs, out=None) -> np.ndarray:
+        return Layer.activation_derivative(self, pre_activations, outputs, out)
+
+    def _columns(self, inputs):
+        """
+        Unrolls every window of a batch into a (batch, channels * kernel_size ** 2, out_height * out_width) array
+
+        Each kernel offset is one strided slice of the images, so the
+        columns are filled with kernel_size ** 2 block copies instead of
+        gathering every window separately
+        """
+        images = inputs.reshape((len(inputs),) + self.input_shape)
+        if self.padding:
+            padding = self.padding
+            images = np.pad(images, ((0, 0), (0, 0), (padding, padding), (padding, padding)))
+        _, out_height, out_width = self.output_shape
+        kernel_size, stride = self.kernel_size, self.stride
+
+        columns = np.empty((len(inputs), self.input_shape[0], kernel_size, kernel_size, out_height, out_width),
+                           images.dtype)
+        for row in range(kernel_size):
+            for column in range(kernel_size):
+                columns[:, :, row, column] = images[:, :, row:row + stride * out_height:stride,
+                                                    column:column + stride * out_width:stride]
+        return columns.reshape(len(inputs), self.weights.shape[1], out_height * out_width)
+
+    def forward(self, inputs: np.ndarray, training=False) -> np.ndarray:
+        """
+        Runs a batch through the layer, see `Layer.forward`
+
+        Parameters
+        ----------
+        inputs : np.ndarray
+            A (batch, channels, height, width) array, or (batch, channels * height * width)
+
+        Returns
+        -------
+        outputs : np.ndarray
+            A (batch, filters, out_height, out_width) array
+        """
+        columns = self._columns(inputs)
+        pre_activations = np.matmul(self.weights, columns)
+        pre_activations += self.biases[:, None]
+        pre_activations = pre_activations.reshape((len(inputs),) + self.output_shape)
+
+        if not training:
+            return IN_PLACE_ACTIVATION_FUNCTIONS[self.activation_function.__name__](pre_activations, pre_activations)
+
+        outputs = IN_PLACE_ACTIVATION_FUNCTIONS[self.activation_function.__name__](
+            pre_activations, np.empty_like(pre_activations))
+        self.batch_columns = columns
+        self.batch_input_shape = inputs.shape
+        self.batch_pre_activations = pre_activations
+        self.batch_outputs = outputs
+        return outputs
+
+    def backward(self, error_gradients: np.ndarray, input_errors=True, apply_derivative=True) -> np.ndarray:
+        """
+        Works out the filters' gradients for the last training batch, see `Layer.backward`
+
+        Each filter's gradients are summed over every window and averaged over the batch
+
+        Returns
+        -------
+        error_gradients : np.ndarray
+            The errors for the layer's inputs, shaped like the inputs were
+        """
+        batch_size = len(error_gradients)
+        error_gradients = error_gradients.reshape(self.batch_outputs.shape)
+        if apply_derivative:
+            deltas = self.activation_derivative(self.batch_pre_activations, self.batch_outputs)
+            deltas *= error_gradients
+        else:
+            deltas = error_gradients
+        deltas = deltas.reshape(batch_size, len(self.weights), -1)
+
+        self.weight_gradients = np.matmul(deltas, self.batch_columns.transpose(0, 2, 1)).sum(axis=0)
+        self.weight_gradients /= batch_size
+        self.bias_gradients = deltas.sum(axis=(0, 2)) / batch_size
+
+        if not input_errors:
+            return None
+        return self._col2im(np.matmul(self.weights.T, deltas)).reshape(self.batch_input_shape)
+
+    def _col2im(self, column_errors):
+        """Adds the errors of every unrolled window back onto the pixels it came from"""
+        channels, height, width = self.input_shape
+        _, out_height, out_width = self.output_shape
+        kernel_size, stride, padding = self.kernel_size, self.stride, self.padding
+        batch_size = len(column_errors)
+
+        column_errors = column_errors.reshape(batch_size, channels, kernel_size, kernel_size, out_height, out_width)
+        image_errors = np.zeros((batch_size, channels, height + 2 * padding, width + 2 * padding), column_errors.dtype)
+        for row in range(kernel_size):
+            for column in range(kernel_size):
+                image_errors[:, :, row:row + stride * out_height:stride, column:column + stride * out_width:stride] += \
+                    column_errors[:, :, row, column]
+        return image_errors[:, :, padding:padding + height, padding:padding + width]
+
+    def run(self, inputs) -> np.ndarray:
+        """Runs a single image through the layer, see `Layer.run`"""
+        self.outputs = self.forward(np.asarray(inputs)[None])[0]
+        return self.outputs
+
+    def __len__(self):
+        return int(np.prod(self.output_shape))
+
+
+class MaxPool2D:
+    type = 'maxpool'
+
+    def __init__(self, input_shape, pool_size=2, stride=None, dtype=np.float64):
+        """
+        Keeps the largest value of each window of every channel
+
+        Parameters
+        ----------
+        input_shape : tuple
+            The (channels, height, width) of the images. Flat inputs are reshaped to it
+
+        pool_size : int
+            The height and width of the windows
+
+        stride : int, optional
+            How far the windows move, defaults to `pool_size` so they don't overlap.
+            Rows and columns past the last whole window are dropped
+
+        dtype : np.dtype
+            The float type of the outputs
+        """
+        channels, height, width = input_shape
+        self.input_shape = tuple(int(size) for size in input_shape)
+        self.pool_size = pool_size
+        self.stride = stride or pool_size
+        self.output_shape = (channels, _output_size(height, pool_size, self.stride),
+                             _output_size(width, pool_size, self.stride))
+        if min(self.output_shape[1:]) < 1:
+            raise ValueError(f'A {pool_size}x{pool_size} pool does not fit {height}x{width} images')
+
+        self.weights = None
+        self.biases = None
+        self.activation_function = None
+        self.mask = None
+        self.outputs = None
+        self._dtype = np.dtype(dtype)
+        self._clear_batch()
+
+    def _clear_batch(self):
+        self.batch_input_shape = None
+        self.batch_max_indexes = None
+        self.batch_outputs = None
+        self.batch_buffers = {}
+
+    @property
+    def num_of_inputs(self) -> int:
+        return int(np.prod(self.input_shape))
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._dtype
+
+    def get_config(self) -> dict:
+        return {'type': self.type, 'pool_size': self.pool_size, 'stride': self.stride,
+                'input_shape': list(self.input_shape)}
+
+    def forward(self, inputs: np.ndarray, training=False) -> np.ndarray:
+        """
+        Runs a batch through the layer
+
+        Parameters
+        ----------
+        inputs : np.ndarray
+            A (batch, channels, height, width) array, or (batch, channels * height * width)
+
+        Returns
+        -------
+        outputs : np.ndarray
+            A (batch, channels, out_height, out_width) array
+        """
+        images = inputs.reshape((len(inputs),) + self.input_shape)
+        _, out_height, out_width = self.output_shape
+        stride = self.stride
+
+        # Compares one offset of every window at a time, which reads the images
+        # in place instead of copying the overlapping windows out of them
+        outputs = images[:, :, :stride * out_height:stride, :stride * out_width:stride].copy()
+        max_indexes = np.zeros(outputs.shape, np.int16) if training else None
+        is_larger = np.empty(outputs.shape, bool)
+        for offset in range(1, self.pool_size ** 2):
+            row, column = divmod(offset, self.pool_size)
+            values = images[:, :, row:row + stride * out_height:stride, column:column + stride * out_width:stride]
+            np.greater(values, outputs, out=is_larger)
+            np.copyto(outputs, values, where=is_larger)
+            if training:
+                np.copyto(max_indexes, offset, where=is_larger)
+        if not training:
+            return outputs
+
+        self.batch_input_shape = inputs.shape
+        self.batch_max_indexes = max_indexes
+        self.batch_outputs = outputs
+        return outputs
+
+    def backward(self, error_gradients: np.ndarray, input_errors=True, apply_derivative=True) -> np.ndarray:
+        """
+        Passes each output's error back to the input it was taken from
+
+        Returns
+        -------
+        error_gradients : np.ndarray
+            The errors for the layer's inputs, shaped like the inputs were
+        """
+        if not input_errors:
+            return None
+        batch_size = len(error_gradients)
+        error_gradients = error_gradients.reshape(self.batch_outputs.shape)
+        channels, out_height, out_width = self.output_shape
+
+        rows = np.arange(out_height)[:, None] * self.stride + self.batch_max_indexes // self.pool_size
+        columns = np.arange(out_width) * self.stride + self.batch_max_indexes % self.pool_size
+        samples = np.arange(batch_size)[:, None, None, None]
+        channel_indexes = np.arange(channels)[:, None, None]
+
+        input_errors = np.zeros((batch_size,) + self.input_shape, error_gradients.dtype)
+        if self.stride >= self.pool_size:
+            # Windows don't overlap so every input gets at most one error
+            input_errors[samples, channel_indexes, rows, columns] = error_gradients
+        else:
+            np.add.at(input_errors, (samples, channel_indexes, rows, columns), error_gradients)
+        return input_errors.reshape(self.batch_input_shape)
+
+    def run(self, inputs) -> np.ndarray:
+        """Runs a single image through the layer, see `Layer.run`"""
+        self.outputs = self.forward(np.asarray(inputs)[None])[0]
+        return self.outputs
+
+    def __len__(self):
+        return int(np.prod(self.output_shape))
+
+
+class Flatten:
+    type = 'flatten'
+
+    def __init__(self, input_shape, dtype=np.float64):
+        """
+        Flattens images into vectors for the fully connected layers after it
+
+        Parameters
+        ----------
+        input_shape : tuple
+            The shape of each sample
+
+        dtype : np.dtype
+            The float type of the outputs
+        """
+        self.input_shape = tuple(int(size) for size in input_shape)
+        self.output_shape = (int(np.prod(self.input_shape)),)
+        self.weights = None
+        self.biases = None
+        self.activation_function = None
+        self.mask = None
+        self.outputs = None
+        self.batch_buffers = {}
+        self._dtype = np.dtype(dtype)
+
+    @property
+    def num_of_inputs(self) -> int:
+        return self.output_shape[0]
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._dtype
+
+    def get_config(self) -> dict:
+        return {'type': self.type, 'input_shape': list(self.input_shape)}
+
+    def forward(self, inputs: np.ndarray, training=False) -> np.ndarray:
+        return inputs.reshape(len(inputs), -1)
+
+    def backward(self, error_gradients: np.ndarray, input_errors=True, apply_derivative=True) -> np.ndarray:
+        if not input_errors:
+            return None
+        return error_gradients.reshape((len(error_gradients),) + self.input_shape)
+
+    def run(self, inputs) -> np.ndarray:
+        self.outputs = np.asarray(inputs).ravel()
+        return self.outputs
+
+    def __len__(self):
+        return self.output_shape[0]
+
+
+SPATIAL_LAYER_TYPES = {
+    'conv2d': lambda config, input_shape, dtype: Conv2D(
+        input_shape, config['filters'], config.get('kernel_size', 3), config.get('stride', 1),
+        config.get('padding', 0), config.get('activation', 'relu'), dtype),
+    'maxpool': lambda config, input_shape, dtype: MaxPool2D(
+        input_shape, config.get('pool_size', 2), config.get('stride'), dtype),
+    'flatten': lambda config, input_shape, dtype: Flatten(input_shape, dtype),
+}
+
+
+def _layer_config(layer) -> dict:
+    """A layer's entry in a layers dict"""
+    if layer.type != 'dense':
+        return layer.get_config()
+    return {'activation': layer.activation_function.__name__, 'neurons': len(layer)}
+
+
 class Network:
     """
     A basic neural network
@@ -107,6 +1035,44 @@ class Network:
             },
             ...
         }
+        'softmax' can only be the output layer's activation, it makes
+        the network use cross-entropy instead of squared error
+
+        Layers with a 'type' of 'conv2d', 'maxpool' or 'flatten' work on
+        images, the first of them needs the 'input_shape' of the images as
+        (channels, height, width) and a 'flatten' layer goes before the
+        fully connected layers after them:
+        layers = {
+            'conv': {'type': 'conv2d', 'input_shape': (1, 28, 28), 'filters': 8,
+                     'kernel_size': 3, 'stride': 1, 'padding': 0, 'activation': 'relu'},
+            'pool': {'type': 'maxpool', 'pool_size': 2},
+            'flatten': {'type': 'flatten'},
+            'output': {'activation': 'softmax', 'neurons': 10},
+        }
+        See `Conv2D`, `MaxPool2D` and `Flatten`
+
+    dtype : np.dtype
+        The float type used for the weights, activations and gradients.
+        np.float32 halves the memory used and speeds up the matrix multiplies
+
+    Attributes
+    ----------
+    optimizer : Optimizer
+        How `apply_gradients` updates the weights, see `Optimizers.py`.
+        Defaults to SGD, `learning_rate` is the optimizer's learning rate
+
+    loss : str
+        'cross_entropy' if the output layer is softmax, otherwise 'squared_error'
+
+    version : int
+        Goes up every time the weights, biases or layout change, see `Snapshots.py`
+
+    execution : Execution.ExecutionConfig
+        How many threads the fully connected layers split large batches and
+        wide layers over, see `Execution.py`. None runs them on the calling thread
+
+    replay_buffer : Replay.ReplayBuffer
+        The recent samples `partial_fit` replays, made by its first call
 
     Methods
     ------
@@ -114,7 +1080,22 @@ class Network:
         passes the inputs through the network
 
     update_layers
-        resets then remakes the network
+        changes the network to a new layout, keeping the weights of layers that stay
+
+    resize_layer
+        widens or narrows a layer while keeping what it has learnt
+
+    insert_layer
+        adds a layer anywhere, as an identity for relu layers
+
+    change_activation
+        changes a layer's activation function
+
+    save
+        saves the network to a binary checkpoint
+
+    load
+        loads a network from a binary checkpoint
 
      get_layers_json
         returns a json with the layers
@@ -132,7 +1113,7 @@ class Network:
         adds a layer to the network
 
     remove_layer
-        removes a layer
+        removes a layer, folding it into the next one
 
     calculate_error
         calculates the error for the output layer
@@ -140,59 +1121,310 @@ class Network:
     get_outputs
         returns a list of outputs
 
+    predict
+        returns the outputs for a batch without changing the network
+
+    evaluate
+        measures the loss and accuracy over a data set without changing the network
+
+    compute_gradients
+        generates the gradients for a batch of data
+
+    apply_gradients
+        updates the weights and biases from the gradients
+
+    prune
+        zeroes the smallest weights and keeps them at zero
+
     train
-        trains the network
+        trains the network in mini-batches
+
+    partial_fit
+        trains on samples as they arrive, replaying earlier ones alongside them
     """
 
-    def __init__(self, input_array_length: int, layers: dict):
-        self.layers: List[List[Neuron]] = []
+    def __init__(self, input_array_length: int, layers: dict, dtype=np.float64):
+        self.input_array_length = input_array_length
+        self.layers: List[Layer] = []
         self.error = None
+        self.dtype = np.dtype(dtype)
 
         self.num_of_epochs = 1
-        self.learning_rate = 0.1
+        self.optimizer = SGD(learning_rate=0.1)
+        self.stop_training = False
+        self.version = 0
+        self.execution = None
+        self.replay_buffer = None
 
         self._initialise_layers(input_array_length, layers)
 
+    @property
+    def loss(self) -> str:
+        if self.layers and self.layers[-1].activation_function is softmax:
+            return 'cross_entropy'
+        return 'squared_error'
+
+    @property
+    def learning_rate(self) -> float:
+        return self.optimizer.learning_rate
+
+    @learning_rate.setter
+    def learning_rate(self, learning_rate):
+        self.optimizer.learning_rate = learning_rate
+
     def _initialise_layers(self, input_array_length, layers):
         """sets up layers"""
-        prev_num_of_neurons = 0
-        for index, layer in enumerate(layers.values()):
-            activation = layer['activation']
-            num_of_neurons = layer['neurons']
+        for layer in layers.values():
+            self.layers.append(self._build_layer(layer, self._layer_input_shape(len(self.layers))))
+
+    def _layer_input_shape(self, index):
+        """The shape of each sample the layer at `index` takes"""
+        return self.layers[index - 1].output_shape if index > 0 else (self.input_array_length,)
+
+    def _build_layer(self, layer, input_shape):
+        """Makes a new layer from its entry in a layers dict"""
+        layer_type = layer.get('type', 'dense')
+        if layer_type == 'dense':
+            if len(input_shape) > 1:
+                raise ValueError('Fully connected layers take vectors, add a flatten layer before them')
+            return self._construct_layer(layer['activation'], input_shape[0], layer['neurons'], self.dtype)
+
+        if layer_type not in SPATIAL_LAYER_TYPES:
+            supported = ''.join(f'\n\t-{name}' for name in ('dense',) + tuple(SPATIAL_LAYER_TYPES))
+            raise ValueError(f'\n{layer_type} is not supported.'
+                             f'\nHere are a list of supported layer types:'
+                             f'{supported}')
+        if 'input_shape' in layer:
+            if np.prod(layer['input_shape']) != np.prod(input_shape):
+                raise ValueError(f"A {layer_type} layer with an input_shape of {tuple(layer['input_shape'])} "
+                                 f"can't take {int(np.prod(input_shape))} inputs")
+            input_shape = tuple(layer['input_shape'])
+        elif len(input_shape) == 1 and layer_type != 'flatten':
+            raise ValueError(f'The first {layer_type} layer needs an input_shape of (channels, height, width)')
+        return SPATIAL_LAYER_TYPES[layer_type](layer, input_shape, self.dtype)
+
+    @staticmethod
+    def _construct_layer(activation, prev_layer_size, num_of_neurons, dtype=np.float64):
+        """Makes a new layer"""
+        return Layer(prev_layer_size, num_of_neurons, activation, dtype)
+
+    def update_layers(self, input_array_length: int, new_layers: dict, dtype=None):
+        """
+        Changes the network to a new layout while keeping as much as it has learnt
+
+        Layers are matched up by position. Layers past the end of the new
+        layout are removed, matching layers have their activation changed and
+        are resized with `resize_layer`, and extra layers are added with fresh weights
+
+        Parameters
+        ----------
+        input_array_length : int
+
+        new_layers : dict
+            a json in the form of the layers dict from the __init__ function
+
+        dtype : np.dtype, optional
+            a new float type for the network, defaults to the current one
+        """
+        self.version += 1
+        if dtype is not None and np.dtype(dtype) != self.dtype:
+            self.dtype = np.dtype(dtype)
+            for layer in self.layers:
+                if layer.weights is not None:
+                    layer.replace_parameters(layer.weights.astype(self.dtype), layer.biases.astype(self.dtype))
+                else:
+                    layer._dtype = self.dtype
+            self.optimizer.state = {}
+
+        if self._has_spatial_layers(new_layers):
+            self._rebuild_changed_layers(input_array_length, new_layers)
+            return
+
+        if input_array_length != self.input_array_length and self.layers:
+            input_layer = self.layers[0]
+            weights = np.zeros((len(input_layer), input_array_length), self.dtype)
+            num_of_kept_inputs = min(input_array_length, input_layer.num_of_inputs)
+            weights[:, :num_of_kept_inputs] = input_layer.weights[:, :num_of_kept_inputs]
+            input_layer.replace_parameters(weights, input_layer.biases)
+        self.input_array_length = input_array_length
+
+        new_layers = list(new_layers.values())
+        while len(self.layers) > len(new_layers):
+            self.remove_layer(-1)
+
+        for index, layer in enumerate(new_layers):
+            if index == len(self.layers):
+                self.add_layer(layer['neurons'], layer['activation'])
+                continue
+            if self.layers[index].activation_function is not get_activation_function(layer['activation']):
+                self.change_activation(index, layer['activation'])
+            self.resize_layer(index, layer['neurons'])
+
+    @property
+    def is_fully_connected(self) -> bool:
+        """Whether every layer is a fully connected one, which the inference and parallel copies need"""
+        return all(layer.type == 'dense' for layer in self.layers)
+
+    def _has_spatial_layers(self, new_layers=None) -> bool:
+        """Whether the network, or a new layout for it, has any layers other than fully connected ones"""
+        return (not self.is_fully_connected
+                or any(layer.get('type', 'dense') != 'dense' for layer in (new_layers or {}).values()))
+
+    def _rebuild_changed_layers(self, input_array_length, new_layers):
+        """
+        Keeps the layers up to the first one that differs from the new layout
+        and builds the rest fresh, image layers can't be resized in place
+        """
+        num_of_kept_layers = 0
+        if input_array_length == self.input_array_length:
+            for layer, new_layer in zip(self.layers, new_layers.values()):
+                built_layer = self._build_layer(new_layer, self._layer_input_shape(num_of_kept_layers))
+                if layer.type != built_layer.type or _layer_config(layer) != _layer_config(built_layer):
+                    break
+                num_of_kept_layers += 1
+
+        self.input_array_length = input_array_length
+        del self.layers[num_of_kept_layers:]
+        for new_layer in list(new_layers.values())[num_of_kept_layers:]:
+            self.layers.append(self._build_layer(new_layer, self._layer_input_shape(len(self.layers))))
+        self.optimizer.move_layers({index: index for index in range(num_of_kept_layers)})
+
+    def _check_fully_connected(self, *indexes):
+        """Raises a ValueError if any of the layers at `indexes` isn't fully connected"""
+        for index in indexes:
+            if 0 <= index < len(self.layers) and self.layers[index].type != 'dense':
+                raise ValueError(f'Layer {index} is a {self.layers[index].type} layer, '
+                                 f'only fully connected layers can be changed this way')
+
+    def _layer_input_size(self, index):
+        """The number of inputs the layer at `index` takes"""
+        return len(self.layers[index - 1]) if index > 0 else self.input_array_length
+
+    def resize_layer(self, index: int, num_of_neurons: int, noise=0.0):
+        """
+        Widens or narrows a layer, keeping the weights it has learnt
+
+        Widening copies randomly picked neurons and splits their outgoing
+        weights between the copies, so the network gives exactly the same
+        outputs (Net2WiderNet). Copies stay identical while training unless
+        `noise` is added to their incoming weights. Narrowing removes the neurons
+        with the smallest outgoing weights, which changes the outputs the least.
+
+        The output layer has no outgoing weights, widening it adds neurons with
+        fresh weights and narrowing it removes its last neurons.
+
+        Parameters
+        ----------
+        index : int
+            The index of the layer
+
+        num_of_neurons : int
+            The layer's new size
 
-            if index == 0:
-                layer_to_be_added = self._construct_layer(activation, input_array_length, num_of_neurons)
+        noise : float
+            The standard deviation of noise added to the incoming weights of the copies
+
+        References
+        ----------
+            See : https://arxiv.org/abs/1511.05641
+                  Net2Net, for function preserving widening and deepening
+        """
+        if num_of_neurons < 1:
+            raise ValueError(f'A layer needs at least one neuron, got {num_of_neurons}')
+        index = range(len(self.layers))[index]
+        self._check_fully_connected(index, index + 1)
+        layer = self.layers[index]
+        next_layer = self.layers[index + 1] if index + 1 < len(self.layers) else None
+        old_num_of_neurons = len(layer)
+        if num_of_neurons == old_num_of_neurons:
+            return
+        self.version += 1
+
+        if next_layer is None:
+            if num_of_neurons > old_num_of_neurons:
+                new_weights = 0.1 * np.random.standard_normal((num_of_neurons - old_num_of_neurons, layer.num_of_inputs))
+                weights = np.concatenate([layer.weights, new_weights.astype(self.dtype)])
+                biases = np.concatenate([layer.biases, np.zeros(num_of_neurons - old_num_of_neurons, self.dtype)])
             else:
-                layer_to_be_added = self._construct_layer(activation, prev_num_of_neurons, num_of_neurons)
+                weights, biases = layer.weights[:num_of_neurons].copy(), layer.biases[:num_of_neurons].copy()
+            layer.replace_parameters(weights, biases)
+            return
+
+        if num_of_neurons > old_num_of_neurons:
+            sources = np.concatenate([np.arange(old_num_of_neurons),
+                                      np.random.randint(0, old_num_of_neurons, num_of_neurons - old_num_of_neurons)])
+            copies = np.bincount(sources, minlength=old_num_of_neurons)
+            weights, biases = layer.weights[sources], layer.biases[sources]
+            if noise:
+                weights[old_num_of_neurons:] += (noise * np.random.standard_normal(weights[old_num_of_neurons:].shape)
+                                                 ).astype(self.dtype)
+            next_weights = (next_layer.weights[:, sources] / copies[sources]).astype(self.dtype)
+        else:
+            importance = np.linalg.norm(next_layer.weights, axis=0)
+            kept = np.sort(np.argsort(-importance, kind='stable')[:num_of_neurons])
+            weights, biases = layer.weights[kept], layer.biases[kept]
+            next_weights = np.ascontiguousarray(next_layer.weights[:, kept])
 
-            self.layers.append(layer_to_be_added)
-            prev_num_of_neurons = num_of_neurons
+        layer.replace_parameters(weights, biases)
+        next_layer.replace_parameters(next_weights, next_layer.biases)
 
-    @staticmethod
-    def _construct_layer(activation, prev_layer_size, num_of_neurons):
-        """Makes a new layer"""
+    def insert_layer(self, index: int, num_of_neurons=None, activation_type='relu'):
+        """
+        Adds a new layer before the layer at `index`
 
-        layer_to_be_added = []
+        A relu layer at least as wide as its inputs starts out as the identity,
+        its extra neurons get fresh incoming weights but no outgoing weights,
+        so as long as its inputs aren't negative the network's outputs don't
+        change (Net2DeeperNet). Other layers start with fresh weights.
 
-        for i in range(num_of_neurons):
-            neuron_to_be_added = Neuron(prev_layer_size, activation)
-            layer_to_be_added.append(neuron_to_be_added)
+        Parameters
+        ----------
+        index : int
+            Where the layer goes, `len(network.layers)` adds it at the end like `add_layer`
 
-        return layer_to_be_added
+        num_of_neurons : int, optional
+            The size of the layer, defaults to the number of inputs it takes
 
-    def update_layers(self, input_array_length: int, new_layers: dict):
+        activation_type : str
+            the activation type of the neurons in the layer
         """
-        Wipes the current layers and replaces it with a new layout
+        index = range(len(self.layers) + 1)[index]
+        self._check_fully_connected(index - 1, index)
+        num_of_inputs = self._layer_input_size(index)
+        num_of_neurons = num_of_neurons or num_of_inputs
+        new_layer = self._construct_layer(activation_type, num_of_inputs, num_of_neurons, self.dtype)
+
+        if index < len(self.layers):
+            next_layer = self.layers[index]
+            num_of_kept = min(num_of_inputs, num_of_neurons)
+            if new_layer.activation_function is relu:
+                new_layer.weights[:num_of_kept] = np.eye(num_of_kept, num_of_inputs, dtype=self.dtype)
+
+            next_weights = np.zeros((len(next_layer), num_of_neurons), self.dtype)
+            next_weights[:, :num_of_kept] = next_layer.weights[:, :num_of_kept]
+            next_layer.replace_parameters(next_weights, next_layer.biases)
+
+        self.layers.insert(index, new_layer)
+        self.version += 1
+        self.optimizer.move_layers({old: old if old < index else old + 1 for old in range(len(self.layers) - 1)})
+
+    def change_activation(self, index: int, activation_type: str):
+        """
+        Changes a layer's activation function, keeping its weights
 
         Parameters
         ----------
-        input_array_length : int
+        index : int
+            The index of the layer
 
-        new_layers : dict
-            a json in the form of the layers dict from the __init__ function
+        activation_type : str
+            the new activation type of the neurons in the layer
         """
-        self.layers = []
-        self._initialise_layers(input_array_length, new_layers)
+        self._check_fully_connected(range(len(self.layers))[index])
+        layer = self.layers[index]
+        layer.activation_function = get_activation_function(activation_type)
+        layer.replace_parameters(layer.weights, layer.biases)
+        self.version += 1
 
     def get_layers_json(self):
         """
@@ -204,11 +1436,89 @@ class Network:
         """
         layers_json = {}
         for index, layer in enumerate(self.layers):
-            activation = layer[0].activation_function.__name__
-            num_of_neurons = len(layer)
-            layers_json[f'layer{index + 1}'] = {'activation': activation, 'neurons': num_of_neurons}
+            layers_json[f'layer{index + 1}'] = _layer_config(layer)
         return layers_json
 
+    def save(self, path: str):
+        """
+        Saves the network to a binary checkpoint
+
+        The checkpoint holds the layout from `get_layers_json`, every
+        layer's weights, biases and pruning mask at full precision, the training settings
+        and the optimizer's settings and state so training can carry on where it left off.
+
+        Parameters
+        ----------
+        path : str
+            Where to save the checkpoint
+        """
+        metadata = {
+            'input_array_length': self.input_array_length,
+            'layers': self.get_layers_json(),
+            'num_of_epochs': self.num_of_epochs,
+            'dtype': self.dtype.str,
+            'optimizer': self.optimizer.get_config(),
+        }
+
+        arrays = {}
+        for index, layer in enumerate(self.layers):
+            if layer.weights is None:
+                continue
+            arrays[f'layer{index + 1}.weights'] = layer.weights
+            arrays[f'layer{index + 1}.biases'] = layer.biases
+            if layer.mask is not None:
+                arrays[f'layer{index + 1}.mask'] = layer.mask
+        for name, array in self.optimizer.get_state().items():
+            arrays[f'optimizer.{name}'] = array
+
+        save_arrays(path, metadata, arrays)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode=None) -> 'Network':
+        """
+        Loads a network saved with `save`
+
+        Parameters
+        ----------
+        path : str
+            The location of the checkpoint
+
+        mmap_mode : str, optional
+            None reads the weights into memory. 'r' memory maps them read-only,
+            which opens large networks instantly and shares the weight pages
+            between processes, but the network can then only be used for
+            inference. 'c' maps them copy-on-write.
+
+        Returns
+        -------
+        network : Network
+
+        Examples
+        --------
+        >>> network.save('mnist.pnn')
+        >>> inference_network = Network.load('mnist.pnn', mmap_mode='r')
+        """
+        metadata, arrays = load_arrays(path, mmap_mode)
+
+        network = cls(metadata['input_array_length'], {}, metadata['dtype'])
+        for layer_name, layer in metadata['layers'].items():
+            if layer.get('type', 'dense') != 'dense':
+                network.layers.append(network._build_layer(layer, network._layer_input_shape(len(network.layers))))
+                if f'{layer_name}.weights' in arrays:
+                    network.layers[-1].replace_parameters(arrays[f'{layer_name}.weights'],
+                                                          arrays[f'{layer_name}.biases'])
+            else:
+                weights, biases = arrays[f'{layer_name}.weights'], arrays[f'{layer_name}.biases']
+                network.layers.append(Layer.from_arrays(weights, biases, layer['activation']))
+            if f'{layer_name}.mask' in arrays:
+                network.layers[-1].mask = np.array(arrays[f'{layer_name}.mask'])
+
+        network.num_of_epochs = metadata['num_of_epochs']
+        network.optimizer = get_optimizer(**metadata['optimizer'])
+        network.optimizer.set_state({name[len('optimizer.'):]: array for name, array in arrays.items()
+                                     if name.startswith('optimizer.')})
+        return network
+
     def forward_prop(self, data):
         """
         Passes input data through the network
@@ -218,15 +1528,9 @@ class Network:
         data : list
             Your input data
         """
-        layers = self.layers.copy()
-
-        def feed_forward(input_arr):
-            if len(layers) > 0:
-                neuron_outputs = [neuron.run(input_arr) for neuron in layers[0]]
-                del layers[0]
-                feed_forward(neuron_outputs)
-
-        feed_forward(data)
+        layer_outputs = np.asarray(data, dtype=self.dtype)
+        for layer in self.layers:
+            layer_outputs = layer.run(layer_outputs)
 
     def back_prop(self, labels: list):
         """
@@ -242,29 +1546,25 @@ class Network:
             See : https://machinelearningmastery.com/implement-backpropagation-algorithm-scratch-python/
                   Helped with backprop algorithm
         """
+        if self._has_spatial_layers():
+            raise ValueError('Networks with image layers are trained a batch at a time, use compute_gradients')
         self._gen_output_errors(labels)
         self._gen_hidden_errors()
 
     def _gen_output_errors(self, labels):
         """Generates errors for the output layer neuron and assigns them"""
         output_layer = self.layers[-1]
-        output_layer_outputs = np.asarray([neuron.output for neuron in output_layer])
-        labels = np.asarray(labels)
-
-        output_errors = (labels - output_layer_outputs)
-        for index, neuron in enumerate(output_layer):
-            neuron.error_gradient = output_errors[index]
+        errors = np.asarray(labels, dtype=output_layer.dtype) - output_layer.outputs
+        if self.loss == 'squared_error':
+            errors *= output_layer.activation_derivative(output_layer.pre_activations, output_layer.outputs)
+        output_layer.error_gradients = errors
 
     def _gen_hidden_errors(self):
         """Uses the error calculated from the output layer to calculate the error for the previous layers"""
-        self.layers.reverse()
-        for index, layer in enumerate(self.layers[0:-1]):
-            for neuron in self.layers[index + 1]:
-                error = 0.0
-                for output_neuron in layer:
-                    error += sum(neuron.weights * output_neuron.error_gradient)
-                neuron.error_gradient = error
-        self.layers.reverse()
+        for layer, prev_layer in zip(reversed(self.layers[1:]), reversed(self.layers[:-1])):
+            errors = layer.error_gradients @ layer.weights
+            errors *= prev_layer.activation_derivative(prev_layer.pre_activations, prev_layer.outputs)
+            prev_layer.error_gradients = errors
 
     def update_weights(self, data):
         """
@@ -277,32 +1577,385 @@ class Network:
         """
         self._update_input_weights(data)
         self._update_hidden_weights()
+        self._apply_masks()
+        self.version += 1
 
     def _update_input_weights(self, data: list):
         """Updates the input layer's weights"""
         input_layer = self.layers[0]
-        for neuron in input_layer:
-            for index, network_input in enumerate(data):
-                neuron.weights[index] += self.learning_rate * neuron.error_gradient * network_input
+        input_layer.weights += self.learning_rate * np.outer(input_layer.error_gradients, data)
 
     def _update_hidden_weights(self):
         """Updates the hidden layers weights"""
         hidden_layers = self.layers[1:]
         for index, layer in enumerate(hidden_layers):
-            next_layer_outputs = [neuron.output for neuron in self.layers[index]]
-            for neuron in layer:
-                for neuron_index, next_layer_output in enumerate(next_layer_outputs):
-                    neuron.weights[neuron_index] += self.learning_rate * neuron.error_gradient * next_layer_output
+            next_layer_outputs = self.layers[index].outputs
+            layer.weights += self.learning_rate * np.outer(layer.error_gradients, next_layer_outputs)
 
     def update_biases(self):
         """
         Updates all the biases in the network
         """
         for layer in self.layers:
-            for neuron in layer:
-                neuron.bias += self.learning_rate * neuron.error_gradient
+            layer.biases += self.learning_rate * layer.error_gradients
+        self.version += 1
+
+    def compute_gradients(self, inputs: np.ndarray, labels: np.ndarray, layer_times=None) -> float:
+        """
+        Passes a batch forward then backward through the network, leaving
+        each layer's `weight_gradients` and `bias_gradients` set
+
+        Parameters
+        ----------
+        inputs : np.ndarray
+            A (batch, features) array of input data
+
+        labels : np.ndarray
+            A (batch, outputs) array of what the network should output
+
+        layer_times : dict, optional
+            If given its 'forward' and 'backward' keys are set to lists
+            of how many seconds each layer took, in layer order
+
+        Returns
+        -------
+        error : float
+            The summed error of the batch, see `calculate_error`
+        """
+        if layer_times is not None:
+            return self._compute_gradients_timed(inputs, labels, layer_times)
+
+        layer_outputs = inputs
+        for layer in self.layers:
+            layer_outputs = self._forward_layer(layer, layer_outputs, training=True)
+
+        error, error_gradients = self._batch_loss(labels, layer_outputs)
+
+        for layer in reversed(self.layers):
+            error_gradients = self._backward_layer(layer, error_gradients)
+
+        return error
+
+    def _batch_loss(self, labels, outputs):
+        """
+        Works out the summed loss of the last training batch and the errors of the
+        output layer's outputs, which for cross-entropy are already the deltas
+        """
+        error_gradients = labels - outputs
+        if self.loss == 'cross_entropy':
+            return cross_entropy(self.layers[-1].batch_pre_activations, labels), error_gradients
+        return 0.5 * np.sum(error_gradients ** 2), error_gradients
+
+    def _forward_layer(self, layer, inputs, training=False):
+        """Runs `layer.forward`, on the `execution` threads for fully connected layers"""
+        if self.execution is not None and layer.type == 'dense':
+            return layer.forward(inputs, training, executor=self.execution)
+        return layer.forward(inputs, training)
+
+    def _backward_layer(self, layer, error_gradients):
+        """Runs `layer.backward`, skipping work the loss or the layer's position makes unnecessary"""
+        is_output_layer = layer is self.layers[-1]
+        settings = {'input_errors': layer is not self.layers[0],
+                    'apply_derivative': not (is_output_layer and self.loss == 'cross_entropy')}
+        if self.execution is not None and layer.type == 'dense':
+            settings['executor'] = self.execution
+        return layer.backward(error_gradients, **settings)
+
+    def _compute_gradients_timed(self, inputs, labels, layer_times):
+        """`compute_gradients` with a timer around every layer"""
+        forward_times, backward_times = [], []
+
+        layer_outputs = inputs
+        for layer in self.layers:
+            start_time = time.perf_counter()
+            layer_outputs = self._forward_layer(layer, layer_outputs, training=True)
+            forward_times.append(time.perf_counter() - start_time)
+
+        error, error_gradients = self._batch_loss(labels, layer_outputs)
+
+        for layer in reversed(self.layers):
+            start_time = time.perf_counter()
+            error_gradients = self._backward_layer(layer, error_gradients)
+            backward_times.append(time.perf_counter() - start_time)
+
+        layer_times['forward'] = forward_times
+        layer_times['backward'] = backward_times[::-1]
+        return error
+
+    def apply_gradients(self):
+        """
+        Updates every layer's weights and biases with the `optimizer`
+        using the gradients from the last `compute_gradients` call, then
+        zeroes any weights pruned by `prune`
+        """
+        self.optimizer.update(self.layers)
+        self._apply_masks()
+        self.version += 1
+
+    def _apply_masks(self):
+        """Zeroes the weights `prune` removed again after an update"""
+        for layer in self.layers:
+            if layer.mask is not None:
+                layer.weights *= layer.mask
+
+    def prune(self, sparsity: float, per_layer=False) -> float:
+        """
+        Zeroes the smallest weights and keeps them at zero from then on
+
+        Each pruned layer gets a `mask` of the weights it keeps, `apply_gradients`
+        multiplies the weights by it after every update. Weights that were
+        already pruned stay pruned. Biases are never pruned.
+
+        Parameters
+        ----------
+        sparsity : float
+            The fraction of weights to prune, from 0 to 1
+
+        per_layer : bool
+            Prunes that fraction of every layer, otherwise the smallest weights
+            of the whole network are pruned together so some layers lose more than others
+
+        Returns
+        -------
+        sparsity : float
+            The fraction of the network's weights that are now zero
+
+        Examples
+        --------
+        >>> network.prune(0.9)
+        >>> network.train(inputs, labels, epochs=2)
+        """
+        if not 0 <= sparsity <= 1:
+            raise ValueError(f'sparsity must be between 0 and 1, got {sparsity}')
+
+        weighted_layers = [layer for layer in self.layers if layer.weights is not None]
+        magnitudes = [np.abs(layer.weights).ravel() for layer in weighted_layers]
+        if per_layer:
+            masks = [_keep_largest(layer_magnitudes, sparsity) for layer_magnitudes in magnitudes]
+        else:
+            sizes = np.cumsum([layer_magnitudes.size for layer_magnitudes in magnitudes])[:-1]
+            masks = np.split(_keep_largest(np.concatenate(magnitudes), sparsity), sizes)
+
+        num_of_zeros = 0
+        for layer, mask in zip(weighted_layers, masks):
+            mask = mask.reshape(layer.weights.shape)
+            layer.mask = mask if layer.mask is None else mask & layer.mask
+            layer.weights *= layer.mask
+            num_of_zeros += layer.mask.size - np.count_nonzero(layer.mask)
+        self.version += 1
+        return num_of_zeros / sum(layer.weights.size for layer in weighted_layers)
+
+    def train(self, inputs, labels, batch_size=32, epochs=None, shuffle=True, callbacks=None,
+              prefetch=0, augment=None) -> List[float]:
+        """
+        Trains the network on a data set in mini-batches
+
+        Parameters
+        ----------
+        inputs : array_like
+            A (samples, features) array of input data
+
+        labels : array_like
+            A (samples, outputs) array of what the network should output
+
+        batch_size : int
+            How many samples are used for each weight update
+
+        epochs : int, optional
+            How many passes to make over the data, defaults to `num_of_epochs`
+
+        shuffle : bool
+            Shuffles the order of the samples at the start of each epoch
+
+        callbacks : list, optional
+            `Callback`s whose hooks are called during training, see `Callbacks.py`.
+            Any of them can stop training early by setting `network.stop_training`.
+            Nothing is timed when there are no callbacks
+
+        prefetch : int
+            Makes batches on a background thread with room for this many on
+            its queue, see `Pipeline.BatchPipeline`. 0 makes them inline
+
+        augment : callable, optional
+            Changes each batch in place, such as `Pipeline.RandomShift`.
+            Batches are prefetched when it is given
+
+        Returns
+        -------
+        errors : list
+            The mean error per sample for each epoch
+
+        Examples
+        --------
+        >>> network = Network(784, layers)
+        >>> network.add_layer(10)
+        >>> errors = network.train(images / 255, one_hot_labels, batch_size=64, epochs=5)
+        >>> errors = network.train(images, one_hot_labels, batch_size=64, prefetch=8, augment=RandomShift())
+        """
+        if epochs is None:
+            epochs = self.num_of_epochs
+        inputs, labels = np.asarray(inputs), np.asarray(labels)
+        if len(inputs) != len(labels):
+            raise ValueError(f'Got {len(inputs)} inputs but {len(labels)} labels')
+        if len(inputs) == 0:
+            raise ValueError('There are no samples to train on')
+
+        pipeline = None
+        if prefetch or augment is not None:
+            pipeline = BatchPipeline(inputs, labels, batch_size, shuffle, augment, max(prefetch, 1), self.dtype)
+
+        callbacks = callbacks or []
+        self.stop_training = False
+        for callback in callbacks:
+            callback.on_train_start(self, {'epochs': epochs, 'batch_size': batch_size, 'num_of_samples': len(inputs)})
+
+        epoch_errors = []
+        for epoch in range(epochs):
+            if callbacks:
+                epoch_start_time = time.perf_counter()
+                for callback in callbacks:
+                    callback.on_epoch_start(self, {'epoch': epoch})
+
+            epoch_error = 0.0
+            num_of_samples_seen = 0
+            if pipeline is not None:
+                starved_batches, wait_time = pipeline.num_of_starved_batches, pipeline.wait_time
+            batches = self._epoch_batches(inputs, labels, batch_size, shuffle, pipeline)
+            try:
+                for batch, start in enumerate(range(0, len(inputs), batch_size)):
+                    if callbacks:
+                        num_of_samples = min(batch_size, len(inputs) - start)
+                        epoch_error += self._train_batch_with_callbacks(batches, num_of_samples, epoch, batch, callbacks)
+                    else:
+                        batch_inputs, batch_labels = next(batches)
+                        epoch_error += self.compute_gradients(batch_inputs, batch_labels)
+                        self.apply_gradients()
+
+                    num_of_samples_seen += min(batch_size, len(inputs) - start)
+                    if self.stop_training:
+                        break
+            finally:
+                batches.close()
+
+            self.error = epoch_error / num_of_samples_seen
+            epoch_errors.append(self.error)
+
+            if callbacks:
+                epoch_time = time.perf_counter() - epoch_start_time
+                logs = {'epoch': epoch, 'error': float(self.error), 'num_of_samples': num_of_samples_seen,
+                        'epoch_time': epoch_time, 'samples_per_second': num_of_samples_seen / epoch_time}
+                if pipeline is not None:
+                    logs['starved_batches'] = pipeline.num_of_starved_batches - starved_batches
+                    logs['data_wait_time'] = pipeline.wait_time - wait_time
+                for callback in callbacks:
+                    callback.on_epoch_end(self, logs)
+
+            if self.stop_training:
+                break
+
+        for callback in callbacks:
+            callback.on_train_end(self, {'errors': epoch_errors})
+        return epoch_errors
+
+    def partial_fit(self, inputs, labels, num_of_replayed=None, buffer_size=10000) -> float:
+        """
+        Makes one update from newly arrived samples and samples replayed from earlier in the stream
+
+        The update's batch is the new samples plus `num_of_replayed` drawn
+        from `replay_buffer`, which then takes in the new samples. The buffer
+        is a fixed-size ring, so memory stays the same however long the
+        stream runs. It isn't saved with the network, and is started again
+        if the network's input or output size changes.
+
+        Parameters
+        ----------
+        inputs : array_like
+            A (samples, features) array of new input data, a single sample is
+            treated as a batch of one
+
+        labels : array_like
+            A (samples, outputs) array of what the network should output
+
+        num_of_replayed : int, optional
+            How many buffered samples go in the batch, defaults to as many as there are new samples
+
+        buffer_size : int
+            The most samples the replay buffer keeps, used when it's made
+
+        Returns
+        -------
+        error : float
+            The mean error per sample of the batch, new and replayed samples together
+
+        Examples
+        --------
+        >>> for inputs, labels in stream:
+        ...     network.partial_fit(inputs, labels)
+        """
+        inputs = np.atleast_2d(np.asarray(inputs, dtype=self.dtype))
+        labels = np.atleast_2d(np.asarray(labels, dtype=self.dtype))
+        if len(inputs) != len(labels):
+            raise ValueError(f'Got {len(inputs)} inputs but {len(labels)} labels')
+
+        buffer = self.replay_buffer
+        if (buffer is None or buffer.inputs.shape[1] != inputs.shape[1]
+                or buffer.labels.shape[1] != labels.shape[1] or buffer.inputs.dtype != self.dtype):
+            buffer = self.replay_buffer = ReplayBuffer(buffer_size, inputs.shape[1], labels.shape[1], self.dtype)
+
+        batch_inputs, batch_labels = buffer.batch(inputs, labels,
+                                                  len(inputs) if num_of_replayed is None else num_of_replayed)
+        error = self.compute_gradients(batch_inputs, batch_labels)
+        self.apply_gradients()
+        buffer.add(inputs, labels)
+
+        self.error = error / len(batch_inputs)
+        return self.error
+
+    def _epoch_batches(self, inputs, labels, batch_size, shuffle, pipeline=None):
+        """Yields the (inputs, labels) batches of one epoch, from the pipeline if there is one"""
+        if pipeline is not None:
+            yield from pipeline
+            return
+        for indexes in batch_indexes(len(inputs), batch_size, shuffle):
+            yield np.asarray(inputs[indexes], dtype=self.dtype), np.asarray(labels[indexes], dtype=self.dtype)
+
+    def _train_batch_with_callbacks(self, batches, batch_size, epoch, batch, callbacks):
+        """Trains on the next batch, timing each phase and layer for the callbacks"""
+        for callback in callbacks:
+            callback.on_batch_start(self, {'epoch': epoch, 'batch': batch, 'batch_size': batch_size})
+
+        start_time = time.perf_counter()
+        batch_inputs, batch_labels = next(batches)
+        data_time = time.perf_counter()
+
+        layer_times = {}
+        batch_error = self.compute_gradients(batch_inputs, batch_labels, layer_times)
+        gradients_time = time.perf_counter()
+
+        self.apply_gradients()
+        end_time = time.perf_counter()
+
+        batch_time = end_time - start_time
+        logs = {
+            'epoch': epoch,
+            'batch': batch,
+            'batch_size': len(batch_inputs),
+            'error': float(batch_error) / len(batch_inputs),
+            'batch_time': batch_time,
+            'data_time': data_time - start_time,
+            'forward_time': sum(layer_times['forward']),
+            'backward_time': sum(layer_times['backward']),
+            'gradients_time': gradients_time - data_time,
+            'update_time': end_time - gradients_time,
+            'layer_forward_times': layer_times['forward'],
+            'layer_backward_times': layer_times['backward'],
+            'samples_per_second': len(batch_inputs) / batch_time,
+        }
+        for callback in callbacks:
+            callback.on_batch_end(self, logs)
+        return batch_error
 
-    def add_layer(self, num_of_neurons, activation_type='sigmoid'):
+    def add_layer(self, num_of_neurons, activation_type='sigmoid', dtype=None):
         """
         Adds a layer at the end of the layers array
 
@@ -313,25 +1966,49 @@ class Network:
 
         activation_type :
             the activation type of the neurons in the layer
+
+        dtype : np.dtype, optional
+            the float type of the layer, defaults to the network's
         """
-        previous_layer_size = len(self.layers[-1])
-        new_layer = self._construct_layer(activation_type, previous_layer_size, num_of_neurons)
+        if len(self._layer_input_shape(len(self.layers))) > 1:
+            raise ValueError('Fully connected layers take vectors, add a flatten layer before them')
+        previous_layer_size = self._layer_input_size(len(self.layers))
+        new_layer = self._construct_layer(activation_type, previous_layer_size, num_of_neurons, dtype or self.dtype)
         self.layers.append(new_layer)
+        self.version += 1
 
     def remove_layer(self, index):
         """
         Removes a layer from a given index
 
+        The layer after it is given the removed layer's inputs. Its weights
+        become the product of both layers' weights, which gives the same
+        outputs wherever the removed layer's activation was linear, such as
+        a relu layer added by `insert_layer`
+
         Parameters
         ----------
         index : int
             The index of the layer to be removed
         """
-        del self.layers[index]
+        index = range(len(self.layers))[index]
+        self._check_fully_connected(index, index + 1)
+        removed_layer = self.layers.pop(index)
+
+        if index < len(self.layers):
+            next_layer = self.layers[index]
+            weights = next_layer.weights @ removed_layer.weights
+            biases = next_layer.weights @ removed_layer.biases + next_layer.biases
+            next_layer.replace_parameters(weights, biases)
+
+        mapping = {old: old if old < index else old - 1 for old in range(len(self.layers) + 1) if old != index}
+        self.optimizer.move_layers(mapping)
+        self.version += 1
 
     def calculate_error(self, labels):
         """
-        Calculate the sum error for the output layer
+        Calculate the sum error for the output layer, half the squared
+        error or the cross-entropy for a softmax output layer
 
         Parameters
         ----------
@@ -343,8 +2020,11 @@ class Network:
         error : float
             The error of the output layer
         """
-        outputs = np.array([neuron.output for neuron in self.layers[-1]])
-        self.error = 0.5 * np.sum((labels - outputs) ** 2)
+        output_layer = self.layers[-1]
+        if self.loss == 'cross_entropy':
+            self.error = cross_entropy(output_layer.pre_activations, labels)
+        else:
+            self.error = 0.5 * np.sum((labels - output_layer.outputs) ** 2)
         return self.error
 
     def get_outputs(self):
@@ -356,9 +2036,126 @@ class Network:
             outputs : list
                 The outputs of the output layer
         """
-        outputs = [neuron.output for neuron in self.layers[-1]]
+        outputs = self.layers[-1].outputs.tolist()
         return outputs
 
+    def predict(self, inputs, return_classes=False):
+        """
+        Runs a batch through the network without storing anything on it
+
+        Unlike `forward_prop` nothing is written to the layers, so one
+        network can be shared by many threads as long as none of them are training it.
+
+        Parameters
+        ----------
+        inputs : array_like
+            A (samples, features) array of input data, a single
+            sample of shape (features,) is treated as a batch of one
+
+        return_classes : bool
+            Also returns the index of the largest output for each sample
+
+        Returns
+        -------
+        outputs : np.ndarray
+            A (samples, outputs) array of outputs
+
+        classes : np.ndarray
+            A (samples,) array of class ids, only returned if `return_classes` is set
+
+        Examples
+        --------
+        >>> outputs, classes = network.predict(test_inputs, return_classes=True)
+        """
+        layer_outputs = np.atleast_2d(np.asarray(inputs, dtype=self.dtype))
+        for layer in self.layers:
+            layer_outputs = self._forward_layer(layer, layer_outputs)
+
+        if return_classes:
+            return layer_outputs, layer_outputs.argmax(axis=1)
+        return layer_outputs
+
+    def evaluate(self, inputs, labels, chunk_size=1024) -> dict:
+        """
+        Measures the network on a whole data set without changing the network
+
+        The data is run through in chunks of `chunk_size` samples, so only one
+        chunk is ever converted and held in memory. Like `predict`, nothing is
+        written to the layers, so it can be called between epochs.
+
+        Parameters
+        ----------
+        inputs : array_like
+            A (samples, features) array of input data, it can be a memory map
+
+        labels : array_like
+            A (samples, outputs) array of one-hot labels or a (samples,) array of class ids
+
+        chunk_size : int
+            How many samples are run at once
+
+        Returns
+        -------
+        results : dict
+            loss
+                The mean error per sample, see `calculate_error`
+            accuracy
+                The fraction of samples whose largest output is their class
+            confusion_matrix
+                A (classes, classes) array counting the samples of each class
+                (rows) by the class they were given (columns)
+            num_of_samples, time, samples_per_second
+                How many samples were run, the seconds taken and the throughput
+
+        Examples
+        --------
+        >>> network.evaluate(test_inputs, test_labels)['accuracy']
+        """
+        start_time = time.perf_counter()
+        labels = np.asarray(labels)
+        if len(inputs) != len(labels):
+            raise ValueError(f'Got {len(inputs)} inputs but {len(labels)} labels')
+        if len(inputs) == 0:
+            raise ValueError('There are no samples to evaluate on')
+
+        output_layer = self.layers[-1]
+        num_of_classes = len(output_layer)
+        confusion_matrix = np.zeros((num_of_classes, num_of_classes), np.int64)
+        total_error = 0.0
+
+        for start in range(0, len(inputs), chunk_size):
+            layer_outputs = np.asarray(inputs[start:start + chunk_size], dtype=self.dtype)
+            for layer in self.layers[:-1]:
+                layer_outputs = self._forward_layer(layer, layer_outputs)
+            pre_activations = layer_outputs @ output_layer.weights.T + output_layer.biases
+            outputs = output_layer.activation_function(pre_activations)
+
+            chunk_labels = labels[start:start + chunk_size]
+            if chunk_labels.ndim == 1:
+                classes = chunk_labels.astype(np.intp)
+                chunk_labels = np.eye(num_of_classes, dtype=self.dtype)[classes]
+            else:
+                classes = chunk_labels.argmax(axis=1)
+
+            if self.loss == 'cross_entropy':
+                total_error += cross_entropy(pre_activations, chunk_labels)
+            else:
+                total_error += 0.5 * np.sum((chunk_labels - outputs) ** 2)
+
+            confusion_matrix += np.bincount(classes * num_of_classes + outputs.argmax(axis=1),
+                                            minlength=num_of_classes ** 2).reshape(num_of_classes, num_of_classes)
+
+        num_of_samples = len(labels)
+        evaluate_time = time.perf_counter() - start_time
+        return {
+            'loss': float(total_error) / num_of_samples,
+            'accuracy': float(np.trace(confusion_matrix)) / num_of_samples,
+            'confusion_matrix': confusion_matrix,
+            'num_of_samples': num_of_samples,
+            'time': evaluate_time,
+            'samples_per_second': num_of_samples / evaluate_time,
+        }
+
 
 layers = {
     'layer 1': {
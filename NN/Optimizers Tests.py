@@ -0,0 +1,85 @@
+import unittest
+
+import numpy as np
+
+from Network import Layer
+from Optimizers import SGD, Momentum, Adam, get_optimizer
+
+np.random.seed(0)
+
+
+class OptimizerTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.layers = [Layer(3, 4), Layer(4, 2)]
+        self.gradients = [[(np.random.standard_normal(layer.weights.shape), np.random.standard_normal(len(layer)))
+                           for layer in self.layers] for _ in range(3)]
+        self.start_weights = [layer.weights.copy() for layer in self.layers]
+
+    def run_steps(self, optimizer):
+        for step_gradients in self.gradients:
+            for layer, (weight_gradients, bias_gradients) in zip(self.layers, step_gradients):
+                layer.weight_gradients, layer.bias_gradients = weight_gradients, bias_gradients
+            optimizer.update(self.layers)
+
+    def test_sgd(self):
+        print("\nSGD Test:")
+        self.run_steps(SGD(learning_rate=0.5))
+        expected_weights = self.start_weights[0] + 0.5 * sum(step[0][0] for step in self.gradients)
+        np.testing.assert_allclose(self.layers[0].weights, expected_weights)
+
+    def test_momentum(self):
+        print("\nMomentum Test:")
+        for nesterov in (False, True):
+            self.setUp()
+            self.run_steps(Momentum(learning_rate=0.1, momentum=0.8, nesterov=nesterov))
+
+            weights, velocity = self.start_weights[1].copy(), 0
+            for step in self.gradients:
+                velocity = 0.8 * velocity + step[1][0]
+                weights += 0.1 * (step[1][0] + 0.8 * velocity if nesterov else velocity)
+            np.testing.assert_allclose(self.layers[1].weights, weights)
+
+    def test_adam(self):
+        print("\nAdam Test:")
+        self.run_steps(Adam(learning_rate=0.01))
+
+        weights, mean, variance = self.start_weights[0].copy(), 0, 0
+        for step_number, step in enumerate(self.gradients, 1):
+            mean = 0.9 * mean + 0.1 * step[0][0]
+            variance = 0.999 * variance + 0.001 * step[0][0] ** 2
+            corrected_mean = mean / (1 - 0.9 ** step_number)
+            corrected_variance = variance / (1 - 0.999 ** step_number)
+            weights += 0.01 * corrected_mean / (np.sqrt(corrected_variance) + 1e-8)
+        np.testing.assert_allclose(self.layers[0].weights, weights)
+
+    def test_float32_updates_stay_float32(self):
+        print("\nOptimizer dtype Test:")
+        self.layers = [Layer(3, 4, dtype=np.float32)]
+        self.gradients = [[(np.ones((4, 3), np.float32), np.ones(4, np.float32))]]
+        for optimizer in (SGD(), Momentum(nesterov=True), Adam()):
+            self.run_steps(optimizer)
+            self.assertEqual(self.layers[0].weights.dtype, np.float32)
+            self.assertTrue(all(array.dtype == np.float32 for array in optimizer.get_state().values()))
+
+    def test_state_round_trip(self):
+        print("\nOptimizer State Test:")
+        optimizer = Adam()
+        self.run_steps(optimizer)
+
+        restored_optimizer = get_optimizer(**optimizer.get_config())
+        restored_optimizer.set_state(optimizer.get_state())
+        self.assertEqual(restored_optimizer.num_of_steps, 3)
+        for name, array in optimizer.get_state().items():
+            np.testing.assert_array_equal(restored_optimizer.get_state()[name], array)
+
+    def test_get_optimizer(self):
+        print("\nGet Optimizer Test:")
+        optimizer = get_optimizer('Momentum', learning_rate=0.2, nesterov=True)
+        self.assertIsInstance(optimizer, Momentum)
+        self.assertTrue(optimizer.nesterov)
+        with self.assertRaises(ValueError):
+            get_optimizer('rmsprop')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,286 @@
+import numpy as np
+
+
+class Optimizer:
+    name = None
+
+    def __init__(self, learning_rate=0.1):
+        """
+        Updates a network's weights and biases from their gradients
+
+        Every update is done in place with a handful of whole-array numpy
+        operations. State and scratch buffers are allocated the first time a
+        parameter is seen and reused after that.
+
+        Gradients follow the network's sign convention, they point in the
+        direction that reduces the error, so they are added to the parameters.
+
+        Parameters
+        ----------
+        learning_rate : float
+            How big a step each update takes
+
+        Methods
+        ------
+        update(layers)
+            Updates every layer's parameters from its gradients
+
+        get_config
+            Returns the optimizer's settings
+
+        get_state
+            Returns the optimizer's state buffers
+
+        set_state(arrays)
+            Restores state buffers from `get_state`
+
+        move_layers(mapping)
+            Moves state to follow layers being inserted or removed
+        """
+        self.learning_rate = learning_rate
+        self.num_of_steps = 0
+        self.state = {}
+
+    def get_config(self) -> dict:
+        """
+        Gets the optimizer's name and settings, `get_optimizer(**config)` rebuilds it
+
+        Returns
+        -------
+        config : dict
+        """
+        return {'name': self.name, 'learning_rate': self.learning_rate, 'num_of_steps': self.num_of_steps}
+
+    def _parameters(self, layers):
+        """Yields a key, the parameter array and its gradients for every parameter"""
+        for index, layer in enumerate(layers):
+            if layer.weights is None:
+                continue
+            yield f'layer{index + 1}.weights', layer.weights, layer.weight_gradients
+            yield f'layer{index + 1}.biases', layer.biases, layer.bias_gradients
+
+    def _buffers(self, key, parameter, buffer_names):
+        """Gets the named buffers for a parameter, making new zeroed ones if its shape has changed"""
+        buffers = self.state.get(key)
+        if buffers is None or buffers['scratch'].shape != parameter.shape or buffers['scratch'].dtype != parameter.dtype:
+            buffers = {name: np.zeros_like(parameter) for name in buffer_names + ('scratch',)}
+            self.state[key] = buffers
+        return buffers
+
+    def update(self, layers):
+        """
+        Updates every layer's weights and biases in place using their gradients
+
+        Parameters
+        ----------
+        layers : list
+            The network's layers
+        """
+        self.num_of_steps += 1
+        for key, parameter, gradients in self._parameters(layers):
+            self._update_parameter(key, parameter, gradients)
+
+    def _update_parameter(self, key, parameter, gradients):
+        raise NotImplementedError
+
+    def move_layers(self, mapping: dict):
+        """
+        Moves the state of each layer to follow the layers being inserted or removed
+
+        Parameters
+        ----------
+        mapping : dict
+            Maps each kept layer's old index to its new one, the state of
+            layers that aren't in it is dropped
+        """
+        state = {}
+        for key, buffers in self.state.items():
+            layer_name, parameter = key.split('.')
+            old_index = int(layer_name[len('layer'):]) - 1
+            if old_index in mapping:
+                state[f'layer{mapping[old_index] + 1}.{parameter}'] = buffers
+        self.state = state
+
+    def get_state(self) -> dict:
+        """
+        Gets the optimizer's state buffers, scratch space is left out
+
+        Returns
+        -------
+        arrays : dict
+            Maps `<parameter>.<buffer>` names to arrays
+        """
+        return {f'{key}.{name}': array
+                for key, buffers in self.state.items()
+                for name, array in buffers.items() if name != 'scratch'}
+
+    def set_state(self, arrays: dict):
+        """
+        Restores state buffers saved with `get_state`
+
+        Parameters
+        ----------
+        arrays : dict
+            Maps `<parameter>.<buffer>` names to arrays
+        """
+        self.state = {}
+        for name, array in arrays.items():
+            key, buffer_name = name.rsplit('.', 1)
+            buffers = self.state.setdefault(key, {'scratch': np.zeros_like(array)})
+            buffers[buffer_name] = np.array(array)
+
+
+class SGD(Optimizer):
+    """
+    Plain stochastic gradient descent, see `Optimizer`
+
+    References
+    ----------
+        See : https://cs231n.github.io/neural-networks-3/#sgd
+    """
+    name = 'sgd'
+
+    def _update_parameter(self, key, parameter, gradients):
+        scratch = self._buffers(key, parameter, ())['scratch']
+        np.multiply(gradients, self.learning_rate, out=scratch)
+        parameter += scratch
+
+
+class Momentum(Optimizer):
+    name = 'momentum'
+
+    def __init__(self, learning_rate=0.1, momentum=0.9, nesterov=False):
+        """
+        Gradient descent with momentum, see `Optimizer`
+
+        Parameters
+        ----------
+        learning_rate : float
+            How big a step each update takes
+
+        momentum : float
+            How much of the previous velocity is kept each step
+
+        nesterov : bool
+            Uses Nesterov's accelerated gradient, which looks ahead along the velocity
+
+        References
+        ----------
+            See : https://cs231n.github.io/neural-networks-3/#sgd
+                  for both momentum and the Nesterov update
+        """
+        super().__init__(learning_rate)
+        self.momentum = momentum
+        self.nesterov = nesterov
+
+    def get_config(self) -> dict:
+        return dict(super().get_config(), momentum=self.momentum, nesterov=self.nesterov)
+
+    def _update_parameter(self, key, parameter, gradients):
+        buffers = self._buffers(key, parameter, ('velocity',))
+        velocity, scratch = buffers['velocity'], buffers['scratch']
+
+        velocity *= self.momentum
+        velocity += gradients
+
+        if self.nesterov:
+            np.multiply(velocity, self.momentum, out=scratch)
+            scratch += gradients
+        else:
+            np.copyto(scratch, velocity)
+        scratch *= self.learning_rate
+        parameter += scratch
+
+
+class Adam(Optimizer):
+    name = 'adam'
+
+    def __init__(self, learning_rate=0.001, beta1=0.9, beta2=0.999, epsilon=1e-8):
+        """
+        The Adam optimizer, see `Optimizer`
+
+        Parameters
+        ----------
+        learning_rate : float
+            How big a step each update takes
+
+        beta1 : float
+            The decay rate of the running mean of the gradients
+
+        beta2 : float
+            The decay rate of the running mean of the squared gradients
+
+        epsilon : float
+            Stops division by zero
+
+        References
+        ----------
+            See : https://arxiv.org/abs/1412.6980
+        """
+        super().__init__(learning_rate)
+        self.beta1 = beta1
+        self.beta2 = beta2
+        self.epsilon = epsilon
+
+    def get_config(self) -> dict:
+        return dict(super().get_config(), beta1=self.beta1, beta2=self.beta2, epsilon=self.epsilon)
+
+    def _update_parameter(self, key, parameter, gradients):
+        buffers = self._buffers(key, parameter, ('mean', 'variance'))
+        mean, variance, scratch = buffers['mean'], buffers['variance'], buffers['scratch']
+
+        mean *= self.beta1
+        np.multiply(gradients, 1 - self.beta1, out=scratch)
+        mean += scratch
+
+        variance *= self.beta2
+        np.square(gradients, out=scratch)
+        scratch *= 1 - self.beta2
+        variance += scratch
+
+        mean_correction = 1 - self.beta1 ** self.num_of_steps
+        variance_correction = 1 - self.beta2 ** self.num_of_steps
+
+        np.sqrt(variance, out=scratch)
+        scratch *= 1 / variance_correction ** 0.5
+        scratch += self.epsilon
+        np.divide(mean, scratch, out=scratch)
+        scratch *= self.learning_rate / mean_correction
+        parameter += scratch
+
+
+OPTIMIZERS = {optimizer.name: optimizer for optimizer in (SGD, Momentum, Adam)}
+
+
+def get_optimizer(name: str, num_of_steps=0, **settings) -> Optimizer:
+    """
+    Makes an optimizer by name
+
+    Parameters
+    ----------
+    name : str
+        One of 'sgd', 'momentum' or 'adam'
+
+    num_of_steps : int
+        How many updates it has already made
+
+    settings
+        Passed to the optimizer's constructor
+
+    Returns
+    -------
+    optimizer : Optimizer
+
+    Examples
+    --------
+    >>> network.optimizer = get_optimizer('momentum', learning_rate=0.05, nesterov=True)
+    """
+    try:
+        optimizer = OPTIMIZERS[name.lower()](**settings)
+    except KeyError:
+        supported = ''.join(f'\n\t-{optimizer_name}' for optimizer_name in OPTIMIZERS)
+        raise ValueError(f'\n{name} is not supported.'
+                         f'\nHere are a list of supported optimizers:'
+                         f'{supported}') from None
+    optimizer.num_of_steps = num_of_steps
+    return optimizer
@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+
+from Network import Network
+from Parallel import ParallelTrainer
+
+
+class ParallelTrainerTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.layers = {
+            'layer1': {
+                'activation': 'relu',
+                'neurons': 12,
+            },
+            'layer2': {
+                'activation': 'sigmoid',
+                'neurons': 3,
+            }
+        }
+        np.random.seed(0)
+        self.inputs = np.random.random_sample((200, 6))
+        self.labels = np.eye(3)[np.random.randint(0, 3, 200)]
+
+    def train(self, num_of_workers=None, dtype=np.float64):
+        np.random.seed(1)
+        network = Network(6, self.layers, dtype)
+        if num_of_workers is None:
+            errors = network.train(self.inputs, self.labels, batch_size=32, epochs=3)
+        else:
+            errors = ParallelTrainer(network, num_of_workers).train(self.inputs, self.labels, batch_size=32, epochs=3)
+        return network, errors
+
+    def test_matches_single_process(self):
+        print("\nParallel Matches Single Process Test:")
+        network, errors = self.train()
+        parallel_network, parallel_errors = self.train(num_of_workers=3)
+
+        np.testing.assert_allclose(parallel_errors, errors)
+        for layer, parallel_layer in zip(network.layers, parallel_network.layers):
+            np.testing.assert_allclose(parallel_layer.weights, layer.weights, atol=1e-12)
+            np.testing.assert_allclose(parallel_layer.biases, layer.biases, atol=1e-12)
+
+    def test_deterministic(self):
+        print("\nParallel Deterministic Test:")
+        network, errors = self.train(num_of_workers=2)
+        other_network, other_errors = self.train(num_of_workers=2)
+
+        self.assertEqual(errors, other_errors)
+        for layer, other_layer in zip(network.layers, other_network.layers):
+            np.testing.assert_array_equal(layer.weights, other_layer.weights)
+
+    def test_float32(self):
+        print("\nParallel Float32 Test:")
+        network, errors = self.train(dtype=np.float32)
+        parallel_network, parallel_errors = self.train(num_of_workers=2, dtype=np.float32)
+
+        np.testing.assert_allclose(parallel_errors, errors, rtol=1e-4)
+        for layer, parallel_layer in zip(network.layers, parallel_network.layers):
+            self.assertEqual(parallel_layer.weights.dtype, np.float32)
+            self.assertEqual(parallel_layer.biases.dtype, np.float32)
+            np.testing.assert_allclose(parallel_layer.weights, layer.weights, atol=1e-5)
+
+
+if __name__ == '__main__':
+    unittest.main()
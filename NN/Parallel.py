@@ -0,0 +1,184 @@
+import multiprocessing
+import os
+from typing import List
+
+import numpy as np
+
+from Execution import available_cpus, limit_blas_threads
+from Network import Layer, Network, batch_indexes
+
+_worker = {}
+
+
+def _as_array(raw_array, shape, dtype):
+    """Views a shared `RawArray` as a numpy array"""
+    return np.frombuffer(raw_array, dtype=dtype)[:int(np.prod(shape))].reshape(shape)
+
+
+def _shared_array(shape, dtype=np.float64):
+    """
+    Makes a numpy array backed by shared memory, the returned spec
+    can be passed to worker processes and turned back into the array with `_as_array`
+    """
+    dtype = np.dtype(dtype)
+    raw_array = multiprocessing.RawArray(np.ctypeslib.as_ctypes_type(dtype), max(int(np.prod(shape)), 1))
+    spec = (raw_array, tuple(shape), dtype)
+    return spec, _as_array(*spec)
+
+
+def _shared_layer_arrays(layer):
+    """Makes a shared weight and bias array shaped like a layer's"""
+    weights_spec, weights = _shared_array(layer.weights.shape, layer.weights.dtype)
+    biases_spec, biases = _shared_array(layer.biases.shape, layer.biases.dtype)
+    return (weights_spec, biases_spec), (weights, biases)
+
+
+def _initialise_worker(input_array_length, layers_json, dtype, parameter_specs, gradient_specs, inputs, labels,
+                       blas_threads):
+    """Rebuilds the network in a worker around the shared weights"""
+    # Forked workers inherit a BLAS sized for the whole machine, so every worker would use every core
+    _worker['blas_limiter'] = limit_blas_threads(blas_threads)
+    network = Network(input_array_length, {}, dtype)
+    for layer_json, (weights_spec, biases_spec) in zip(layers_json.values(), parameter_specs):
+        network.layers.append(Layer.from_arrays(_as_array(*weights_spec), _as_array(*biases_spec),
+                                                layer_json['activation']))
+
+    _worker['network'] = network
+    _worker['gradients'] = [[(_as_array(*weights_spec), _as_array(*biases_spec))
+                             for weights_spec, biases_spec in shard_specs]
+                            for shard_specs in gradient_specs]
+    _worker['inputs'] = inputs
+    _worker['labels'] = labels
+
+
+def _compute_shard_gradients(shard_index, indexes):
+    """Works out one shard's gradients and writes them, scaled by the shard size, to its shared buffers"""
+    network = _worker['network']
+    inputs = np.asarray(_worker['inputs'][indexes], dtype=network.dtype)
+    labels = np.asarray(_worker['labels'][indexes], dtype=network.dtype)
+
+    error = network.compute_gradients(inputs, labels)
+    for layer, (weight_gradients, bias_gradients) in zip(network.layers, _worker['gradients'][shard_index]):
+        np.multiply(layer.weight_gradients, len(indexes), out=weight_gradients)
+        np.multiply(layer.bias_gradients, len(indexes), out=bias_gradients)
+    return error
+
+
+class ParallelTrainer:
+    def __init__(self, network: Network, num_of_workers=None, blas_threads=None):
+        """
+        Trains a network with data parallelism over a pool of processes
+
+        The network's weights and biases are moved into shared memory so
+        every worker sees each update without copying. Each mini-batch is split
+        into one shard per worker, the workers write their shard's gradients
+        to shared buffers and the main process adds them up in shard order then
+        makes a single update. The result only depends on the seed of
+        `np.random`, and matches `Network.train` up to float rounding.
+
+        Parameters
+        ----------
+        network : Network
+            The network to train, its layers are rebound to the shared arrays
+
+        num_of_workers : int, optional
+            How many processes to use, defaults to the number of cores
+
+        blas_threads : int, optional
+            The BLAS threads each worker uses, defaults to sharing the cores
+            out between the workers. Needs threadpoolctl, see `Execution.py`
+
+        Methods
+        ------
+        train(inputs, labels, batch_size=32, epochs=None, shuffle=True)
+            Trains the network, see `Network.train`
+
+        Examples
+        --------
+        >>> trainer = ParallelTrainer(network, num_of_workers=8)
+        >>> errors = trainer.train(inputs, labels, batch_size=256, epochs=5)
+        """
+        if not network.is_fully_connected:
+            raise ValueError('Only fully connected networks can be trained in parallel')
+        self.network = network
+        self.num_of_workers = num_of_workers or os.cpu_count() or 1
+        self.blas_threads = blas_threads or max(available_cpus() // self.num_of_workers, 1)
+
+        self._parameter_specs = []
+        for layer in network.layers:
+            specs, (weights, biases) = _shared_layer_arrays(layer)
+            weights[:] = layer.weights
+            biases[:] = layer.biases
+            layer.weights, layer.biases = weights, biases
+            self._parameter_specs.append(specs)
+
+        self._gradient_specs = []
+        self._gradients = []
+        for _ in range(self.num_of_workers):
+            shard_arrays = [_shared_layer_arrays(layer) for layer in network.layers]
+            self._gradient_specs.append([specs for specs, _ in shard_arrays])
+            self._gradients.append([arrays for _, arrays in shard_arrays])
+
+    def _reduce_gradients(self, num_of_shards, batch_size):
+        """Adds the shard gradients up in a fixed order and stores the batch mean on each layer"""
+        for layer_index, layer in enumerate(self.network.layers):
+            weight_gradients = np.zeros_like(layer.weights)
+            bias_gradients = np.zeros_like(layer.biases)
+            for shard_gradients in self._gradients[:num_of_shards]:
+                weight_gradients += shard_gradients[layer_index][0]
+                bias_gradients += shard_gradients[layer_index][1]
+            layer.weight_gradients = weight_gradients / batch_size
+            layer.bias_gradients = bias_gradients / batch_size
+
+    def train(self, inputs, labels, batch_size=32, epochs=None, shuffle=True) -> List[float]:
+        """
+        Trains the network on a data set in mini-batches split over the workers
+
+        Parameters
+        ----------
+        inputs : array_like
+            A (samples, features) array of input data. Workers inherit it when
+            they start, memory-mapped data sets share their pages between them
+
+        labels : array_like
+            A (samples, outputs) array of what the network should output
+
+        batch_size : int
+            How many samples are used for each weight update
+
+        epochs : int, optional
+            How many passes to make over the data, defaults to `num_of_epochs`
+
+        shuffle : bool
+            Shuffles the order of the samples at the start of each epoch
+
+        Returns
+        -------
+        errors : list
+            The mean error per sample for each epoch
+        """
+        network = self.network
+        if epochs is None:
+            epochs = network.num_of_epochs
+        inputs, labels = np.asarray(inputs), np.asarray(labels)
+        if len(inputs) != len(labels):
+            raise ValueError(f'Got {len(inputs)} inputs but {len(labels)} labels')
+
+        initargs = (network.layers[0].num_of_inputs, network.get_layers_json(), network.dtype,
+                    self._parameter_specs, self._gradient_specs, inputs, labels, self.blas_threads)
+        with multiprocessing.Pool(self.num_of_workers, _initialise_worker, initargs) as pool:
+            epoch_errors = []
+            for epoch in range(epochs):
+                epoch_error = 0.0
+                for indexes in batch_indexes(len(inputs), batch_size, shuffle):
+                    shards = [shard for shard in np.array_split(indexes, self.num_of_workers) if len(shard)]
+                    shard_errors = pool.starmap(_compute_shard_gradients, enumerate(shards))
+
+                    self._reduce_gradients(len(shards), len(indexes))
+                    network.apply_gradients()
+                    epoch_error += sum(shard_errors)
+
+                network.error = epoch_error / len(inputs)
+                epoch_errors.append(network.error)
+
+        return epoch_errors
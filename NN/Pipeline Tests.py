@@ -0,0 +1,94 @@
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from Network import Network
+from Pipeline import BatchPipeline, RandomShift
+
+np.random.seed(0)
+
+
+class BatchPipelineTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.inputs = np.arange(50 * 4, dtype=np.uint8).reshape(50, 4)
+        self.class_ids = np.arange(50) % 3
+        self.labels = np.eye(3)[self.class_ids]
+
+    def test_covers_every_sample(self):
+        print("\nPipeline Epoch Test:")
+        pipeline = BatchPipeline(self.inputs, self.labels, batch_size=8, queue_size=2)
+        for _ in range(2):
+            batches = [(batch_inputs.copy(), batch_labels.copy()) for batch_inputs, batch_labels in pipeline]
+            self.assertEqual(len(batches), len(pipeline))
+            self.assertEqual([len(batch_inputs) for batch_inputs, _ in batches], [8] * 6 + [2])
+
+            seen_inputs = np.concatenate([batch_inputs for batch_inputs, _ in batches])
+            seen_labels = np.concatenate([batch_labels for _, batch_labels in batches])
+            order = np.argsort(seen_inputs[:, 0])
+            np.testing.assert_array_equal(seen_inputs[order], self.inputs)
+            np.testing.assert_array_equal(seen_labels[order], self.labels)
+
+    def test_scales_and_one_hot_encodes(self):
+        print("\nPipeline Encoding Test:")
+        pipeline = BatchPipeline(self.inputs, self.class_ids, batch_size=50, shuffle=False,
+                                 dtype=np.float32, input_scale=1 / 255, num_of_classes=3)
+        batch_inputs, batch_labels = next(iter(pipeline))
+        self.assertEqual(batch_inputs.dtype, np.float32)
+        np.testing.assert_allclose(batch_inputs, self.inputs / 255, rtol=1e-6)
+        np.testing.assert_array_equal(batch_labels, self.labels)
+
+        with self.assertRaises(ValueError):
+            BatchPipeline(self.inputs, self.class_ids)
+
+    def test_random_shift(self):
+        print("\nRandom Shift Test:")
+        images = np.zeros((20, 5 * 5))
+        images[:, 12] = 1
+        RandomShift(max_shift=1, image_shape=(5, 5))(images, np.random.RandomState(0))
+
+        self.assertTrue(np.all(images.sum(axis=1) == 1))
+        rows, columns = np.divmod(images.argmax(axis=1), 5)
+        self.assertTrue(np.all(np.abs(rows - 2) <= 1) and np.all(np.abs(columns - 2) <= 1))
+        self.assertGreater(len(set(zip(rows, columns))), 1)
+
+    def test_counts_starved_batches(self):
+        print("\nPipeline Starvation Test:")
+
+        def slow_augment(batch_inputs, random):
+            time.sleep(0.01)
+
+        pipeline = BatchPipeline(self.inputs, self.labels, batch_size=10, augment=slow_augment)
+        for _ in pipeline:
+            pass
+        stats = pipeline.stats()
+        self.assertEqual(stats['num_of_batches'], 5)
+        self.assertEqual(stats['num_of_starved_batches'], 5)
+        self.assertGreater(stats['wait_time'], 0)
+
+    def test_stopping_early_ends_the_thread(self):
+        print("\nPipeline Stop Test:")
+        pipeline = BatchPipeline(self.inputs, self.labels, batch_size=2, queue_size=1)
+        batches = iter(pipeline)
+        next(batches)
+        batches.close()
+        self.assertEqual(threading.active_count(), 1)
+
+    def test_train_with_prefetch(self):
+        print("\nPrefetch Training Test:")
+        layers = {'layer1': {'activation': 'sigmoid', 'neurons': 3}}
+        inputs = self.inputs / 255
+
+        np.random.seed(1)
+        network = Network(4, layers)
+        prefetch_network = Network(4, layers)
+        prefetch_network.layers[0].weights[...] = network.layers[0].weights
+
+        errors = network.train(inputs, self.labels, batch_size=50, epochs=3)
+        prefetch_errors = prefetch_network.train(inputs, self.labels, batch_size=50, epochs=3, prefetch=2)
+        np.testing.assert_allclose(prefetch_errors, errors)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,251 @@
+import queue
+import threading
+import time
+
+import numpy as np
+
+
+class RandomShift:
+    def __init__(self, max_shift=2, image_shape=(28, 28)):
+        """
+        Moves each image by a random number of pixels, filling the gap with zeros
+
+        Parameters
+        ----------
+        max_shift : int
+            The most pixels an image can move along each axis
+
+        image_shape : tuple
+            The (height, width) of the flattened images
+
+        Examples
+        --------
+        >>> pipeline = BatchPipeline(inputs, labels, augment=RandomShift(max_shift=2))
+        """
+        self.max_shift = max_shift
+        self.image_shape = image_shape
+
+    def __call__(self, batch_inputs: np.ndarray, random: np.random.RandomState):
+        """Shifts every image of a (batch, height * width) array in place"""
+        images = batch_inputs.reshape((len(batch_inputs),) + tuple(self.image_shape))
+        shifts = random.randint(-self.max_shift, self.max_shift + 1, (len(images), 2))
+        shifted = np.zeros_like(images)
+
+        # Images with the same shift are moved together, so there are at most (2 * max_shift + 1) ** 2 copies
+        for row_shift, column_shift in np.unique(shifts, axis=0):
+            indexes = np.flatnonzero((shifts[:, 0] == row_shift) & (shifts[:, 1] == column_shift))
+            source_rows, target_rows = _shift_slices(row_shift)
+            source_columns, target_columns = _shift_slices(column_shift)
+            shifted[indexes, target_rows, target_columns] = images[indexes, source_rows, source_columns]
+
+        images[...] = shifted
+
+
+def _shift_slices(shift):
+    """The source and target slices that move an axis along by `shift`"""
+    if shift >= 0:
+        return slice(0, None if shift == 0 else -shift), slice(shift, None)
+    return slice(-shift, None), slice(0, shift)
+
+
+def _gather(source, indexes, out):
+    """Copies the rows of `source` at `indexes` into `out`"""
+    if source.dtype == out.dtype:
+        np.take(source, indexes, axis=0, out=out)
+    else:
+        out[...] = source[indexes]
+
+
+class BatchPipeline:
+    def __init__(self, inputs, labels, batch_size=32, shuffle=True, augment=None, queue_size=4,
+                 dtype=np.float64, input_scale=1.0, num_of_classes=None, seed=None):
+        """
+        Assembles training batches on a background thread
+
+        Each pass over the pipeline shuffles the sample order, then a thread
+        gathers the batches, scales and one-hot encodes them, runs the
+        augmentation and puts them on a bounded queue. The network trains on
+        one batch while the next ones are being made. numpy releases the GIL
+        for the copies and the network's matrix multiplies so the two overlap.
+
+        Batches are written into a ring of buffers that is reused, so a batch is
+        only valid until the next one is taken from the pipeline.
+
+        Parameters
+        ----------
+        inputs : array_like
+            A (samples, features) array, it can be a memory map such as from `load_mnist`
+
+        labels : array_like
+            A (samples, outputs) array or a (samples,) array of class ids
+
+        batch_size : int
+            How many samples are in each batch
+
+        shuffle : bool
+            Shuffles the order of the samples for every pass
+
+        augment : callable, optional
+            Called as `augment(batch_inputs, random)` to change a batch in place,
+            see `RandomShift`
+
+        queue_size : int
+            How many finished batches can wait on the queue
+
+        dtype : np.dtype
+            The float type of the batches, match it to the `Network`'s
+
+        input_scale : float
+            Multiplies the inputs, 1 / 255 normalises raw pixel values
+
+        num_of_classes : int, optional
+            One-hot encodes labels given as class ids
+
+        seed : int, optional
+            Seeds the pipeline's shuffling and augmentation, defaults to a
+            seed drawn from `np.random` so `np.random.seed` still makes runs repeatable
+
+        Attributes
+        ----------
+        num_of_batches : int
+            How many batches have been taken from the pipeline
+
+        num_of_starved_batches : int
+            How many of those had to be waited for because the queue was empty.
+            The first batch of every pass nearly always waits
+
+        wait_time : float
+            The total seconds spent waiting for batches
+
+        Methods
+        ------
+        stats
+            Gives the starvation statistics
+
+        Examples
+        --------
+        >>> pipeline = BatchPipeline(images, labels, batch_size=64, augment=RandomShift(), queue_size=8)
+        >>> for epoch in range(5):
+        ...     for batch_inputs, batch_labels in pipeline:
+        ...         network.compute_gradients(batch_inputs, batch_labels)
+        ...         network.apply_gradients()
+        >>> pipeline.stats()['starved_fraction']
+        """
+        if queue_size < 1:
+            raise ValueError(f'The queue needs room for at least one batch, got a queue_size of {queue_size}')
+        inputs, labels = np.asarray(inputs), np.asarray(labels)
+        if len(inputs) != len(labels):
+            raise ValueError(f'Got {len(inputs)} inputs but {len(labels)} labels')
+        if labels.ndim == 1 and num_of_classes is None:
+            raise ValueError('Labels given as class ids need num_of_classes to be one-hot encoded')
+
+        self.inputs = inputs
+        self.labels = labels
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.augment = augment
+        self.queue_size = queue_size
+        self.dtype = np.dtype(dtype)
+        self.input_scale = input_scale
+        self.num_of_classes = num_of_classes
+        self.random = np.random.RandomState(np.random.randint(2 ** 31) if seed is None else seed)
+
+        self.num_of_batches = 0
+        self.num_of_starved_batches = 0
+        self.wait_time = 0.0
+
+        # The consumer can hold a batch while `queue_size` wait on the queue and one more is being made
+        num_of_buffers = queue_size + 2
+        label_width = num_of_classes if labels.ndim == 1 else labels.shape[1]
+        self._input_buffers = np.empty((num_of_buffers, batch_size, int(np.prod(inputs.shape[1:]))), self.dtype)
+        self._label_buffers = np.empty((num_of_buffers, batch_size, label_width), self.dtype)
+
+    def __len__(self):
+        return -(-len(self.inputs) // self.batch_size)
+
+    def __iter__(self):
+        batches = queue.Queue(self.queue_size)
+        stop = threading.Event()
+        producer = threading.Thread(target=self._produce, args=(batches, stop), daemon=True)
+        producer.start()
+
+        try:
+            while True:
+                start_time = time.perf_counter()
+                starved = batches.empty()
+                batch = batches.get()
+                if batch is None:
+                    return
+                if isinstance(batch, BaseException):
+                    raise batch
+
+                self.num_of_batches += 1
+                if starved:
+                    self.num_of_starved_batches += 1
+                    self.wait_time += time.perf_counter() - start_time
+                yield batch
+        finally:
+            stop.set()
+            producer.join()
+
+    def _produce(self, batches, stop):
+        """Makes every batch of one pass and puts them on the queue, then None to mark the end"""
+        try:
+            num_of_samples = len(self.inputs)
+            order = self.random.permutation(num_of_samples) if self.shuffle else np.arange(num_of_samples)
+
+            for batch, start in enumerate(range(0, num_of_samples, self.batch_size)):
+                # Sorting keeps reads from a memory map in file order, the order within a batch doesn't matter
+                indexes = np.sort(order[start:start + self.batch_size])
+                batch_inputs, batch_labels = self._make_batch(batch % len(self._input_buffers), indexes)
+                if not self._put(batches, stop, (batch_inputs, batch_labels)):
+                    return
+            self._put(batches, stop, None)
+        except BaseException as error:
+            self._put(batches, stop, error)
+
+    def _make_batch(self, buffer_index, indexes):
+        batch_inputs = self._input_buffers[buffer_index, :len(indexes)]
+        batch_labels = self._label_buffers[buffer_index, :len(indexes)]
+
+        _gather(self.inputs.reshape(len(self.inputs), -1), indexes, batch_inputs)
+        if self.input_scale != 1:
+            batch_inputs *= self.input_scale
+        if self.augment is not None:
+            self.augment(batch_inputs, self.random)
+
+        if self.labels.ndim == 1:
+            batch_labels[...] = 0
+            batch_labels[np.arange(len(indexes)), self.labels[indexes]] = 1
+        else:
+            _gather(self.labels, indexes, batch_labels)
+        return batch_inputs, batch_labels
+
+    @staticmethod
+    def _put(batches, stop, item):
+        """Waits for room on the queue, giving up if the consumer has stopped"""
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.05)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def stats(self) -> dict:
+        """
+        Gives how often training had to wait for data
+
+        Returns
+        -------
+        stats : dict
+            num_of_batches, num_of_starved_batches, starved_fraction,
+            wait_time and mean_wait_time in seconds per batch
+        """
+        return {
+            'num_of_batches': self.num_of_batches,
+            'num_of_starved_batches': self.num_of_starved_batches,
+            'starved_fraction': self.num_of_starved_batches / max(self.num_of_batches, 1),
+            'wait_time': self.wait_time,
+            'mean_wait_time': self.wait_time / max(self.num_of_batches, 1),
+        }
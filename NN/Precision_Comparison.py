@@ -0,0 +1,62 @@
+"""
+Trains the same seeded network in float64 and float32 on MNIST and
+compares their accuracy, training time and weights
+
+Run from the NN folder:
+    python Precision_Comparison.py --epochs 5
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from Dataset import MNIST_DIRECTORY, load_mnist
+from Network import Network
+
+
+def train_and_score(dtype, args):
+    train_inputs, train_labels = load_mnist(args.train_images, args.train_labels, dtype=dtype)
+    test_inputs, test_labels = load_mnist(args.test_images, args.test_labels, dtype=dtype)
+
+    np.random.seed(args.seed)
+    layers = {'layer1': {'activation': 'sigmoid', 'neurons': args.hidden}}
+    network = Network(train_inputs.shape[1], layers, dtype)
+    network.add_layer(train_labels.shape[1])
+    network.learning_rate = args.learning_rate
+
+    np.random.seed(args.seed)
+    start_time = time.perf_counter()
+    errors = network.train(train_inputs, train_labels, batch_size=args.batch_size, epochs=args.epochs)
+    train_time = time.perf_counter() - start_time
+
+    accuracy = network.evaluate(test_inputs, test_labels)['accuracy']
+    return network, errors[-1], accuracy, train_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--train-images', default=os.path.join(MNIST_DIRECTORY, 'train-images.idx3-ubyte'))
+    parser.add_argument('--train-labels', default=os.path.join(MNIST_DIRECTORY, 'train-labels.idx1-ubyte'))
+    parser.add_argument('--test-images', default=os.path.join(MNIST_DIRECTORY, 't10k-images.idx3-ubyte'))
+    parser.add_argument('--test-labels', default=os.path.join(MNIST_DIRECTORY, 't10k-labels.idx1-ubyte'))
+    parser.add_argument('--hidden', type=int, default=64)
+    parser.add_argument('--epochs', type=int, default=5)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--learning-rate', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    results = {dtype: train_and_score(dtype, args) for dtype in (np.float64, np.float32)}
+
+    print(f'{"dtype":<10}{"error":>10}{"accuracy":>10}{"time (s)":>10}')
+    for dtype, (_, error, accuracy, train_time) in results.items():
+        print(f'{np.dtype(dtype).name:<10}{error:>10.5f}{accuracy:>10.4f}{train_time:>10.2f}')
+
+    largest_difference = max(np.max(np.abs(layer64.weights - layer32.weights))
+                             for layer64, layer32 in zip(results[np.float64][0].layers, results[np.float32][0].layers))
+    print(f'\nLargest weight difference: {largest_difference:.2e}')
+
+
+if __name__ == '__main__':
+    main()
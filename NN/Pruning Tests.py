@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from Network import Network
+from Pruning import CSRMatrix, GradualPruning, SparseNetwork, measure_crossover
+
+np.random.seed(0)
+
+
+class PruningTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.layers = {
+            'layer1': {
+                'activation': 'relu',
+                'neurons': 40,
+            },
+            'layer2': {
+                'activation': 'softmax',
+                'neurons': 4,
+            }
+        }
+        self.network = Network(20, self.layers)
+        self.inputs = np.random.random_sample((64, 20))
+        self.labels = np.eye(4)[np.argmax(self.inputs[:, :4], axis=1)]
+
+    def test_global_pruning(self):
+        print("\nGlobal Pruning Test:")
+        magnitudes = np.concatenate([np.abs(layer.weights).ravel() for layer in self.network.layers])
+        sparsity = self.network.prune(0.5)
+
+        self.assertAlmostEqual(sparsity, 0.5, 2)
+        kept = np.concatenate([layer.mask.ravel() for layer in self.network.layers])
+        self.assertEqual(np.count_nonzero(kept), round(kept.size * 0.5))
+        self.assertGreaterEqual(magnitudes[kept].min(), magnitudes[~kept].max())
+
+    def test_per_layer_pruning(self):
+        print("\nPer-layer Pruning Test:")
+        self.network.prune(0.75, per_layer=True)
+        for layer in self.network.layers:
+            self.assertAlmostEqual(1 - np.count_nonzero(layer.weights) / layer.weights.size, 0.75, 2)
+
+        with self.assertRaises(ValueError):
+            self.network.prune(1.5)
+
+    def test_mask_stays_fixed_while_training(self):
+        print("\nPruning Mask Test:")
+        self.network.prune(0.8)
+        masks = [layer.mask.copy() for layer in self.network.layers]
+        self.network.train(self.inputs, self.labels, batch_size=16, epochs=3)
+
+        for layer, mask in zip(self.network.layers, masks):
+            self.assertFalse(layer.weights[~mask].any())
+            np.testing.assert_array_equal(layer.mask, mask)
+
+    def test_mask_stays_fixed_per_sample(self):
+        print("\nPer-sample Pruning Mask Test:")
+        self.network.prune(0.5)
+        masks = [layer.mask.copy() for layer in self.network.layers]
+        for data, label in zip(self.inputs[:8], self.labels[:8]):
+            self.network.forward_prop(data)
+            self.network.back_prop(label)
+            self.network.update_weights(data)
+            self.network.update_biases()
+
+        for layer, mask in zip(self.network.layers, masks):
+            self.assertFalse(layer.weights[~mask].any())
+
+    def test_masks_are_saved(self):
+        print("\nPruning Checkpoint Test:")
+        self.network.prune(0.6)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'pruned.pnn')
+            self.network.save(path)
+            loaded_network = Network.load(path)
+        for layer, loaded_layer in zip(self.network.layers, loaded_network.layers):
+            np.testing.assert_array_equal(loaded_layer.mask, layer.mask)
+
+    def test_gradual_pruning(self):
+        print("\nGradual Pruning Test:")
+        pruning = GradualPruning(0.9, start_epoch=1, end_epoch=3)
+        self.assertEqual(pruning.target_sparsity(0), 0)
+        self.assertLess(pruning.target_sparsity(2), 0.9)
+
+        self.network.train(self.inputs, self.labels, batch_size=16, epochs=5, callbacks=[pruning])
+        self.assertAlmostEqual(pruning.sparsity, 0.9, 2)
+
+    def test_csr_matmul(self):
+        print("\nCSR Matmul Test:")
+        weights = self.network.layers[0].weights.copy()
+        weights[np.abs(weights) < 0.1] = 0
+        weights[3] = 0
+        csr_weights = CSRMatrix(weights)
+
+        np.testing.assert_array_equal(csr_weights.to_dense(), weights)
+        np.testing.assert_allclose(csr_weights.matmul_transposed(self.inputs), self.inputs @ weights.T)
+        self.assertAlmostEqual(csr_weights.density, np.count_nonzero(weights) / weights.size)
+        np.testing.assert_array_equal(CSRMatrix(np.zeros((3, 2))).matmul_transposed(self.inputs[:, :2]), 0)
+
+    def test_sparse_network(self):
+        print("\nSparse Network Test:")
+        self.network.prune(0.95, per_layer=True)
+        sparse_network = SparseNetwork(self.network, crossover=0.1)
+        self.assertEqual(sparse_network.num_of_sparse_layers, 2)
+        np.testing.assert_allclose(sparse_network.predict(self.inputs), self.network.predict(self.inputs))
+
+        self.assertEqual(SparseNetwork(self.network, crossover=0.01).num_of_sparse_layers, 0)
+
+    def test_measure_crossover(self):
+        print("\nSparse Crossover Test:")
+        results = measure_crossover(50, 20, 8, densities=(0.01, 0.5), min_time=0.001, repeats=1)
+        print(f"\tCrossover density: {results['crossover']}")
+        self.assertIn(results['crossover'], (0, 0.01, 0.5))
+        self.assertEqual(len(results['sparse_times']), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,253 @@
+import numpy as np
+
+from Benchmarks import time_call
+from Callbacks import Callback
+
+
+class CSRMatrix:
+    def __init__(self, dense: np.ndarray):
+        """
+        A weight matrix in compressed sparse row form
+
+        Only the non-zero weights are kept, `data` holds them row by row,
+        `indices` holds the column of each and row `i` is
+        `data[indptr[i]:indptr[i + 1]]`.
+
+        Parameters
+        ----------
+        dense : np.ndarray
+            A (neurons, inputs) weight matrix
+
+        Methods
+        ------
+        matmul_transposed(inputs)
+            Gives `inputs @ dense.T`
+
+        to_dense
+            Rebuilds the dense matrix
+        """
+        rows, columns = np.nonzero(dense)
+        self.shape = dense.shape
+        self.data = dense[rows, columns]
+        self.indices = columns.astype(np.int32)
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=dense.shape[0]))]).astype(np.int32)
+
+    @property
+    def density(self) -> float:
+        return len(self.data) / (self.shape[0] * self.shape[1])
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + self.indices.nbytes + self.indptr.nbytes
+
+    def to_dense(self) -> np.ndarray:
+        dense = np.zeros(self.shape, self.data.dtype)
+        rows = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+        dense[rows, self.indices] = self.data
+        return dense
+
+    def matmul_transposed(self, inputs: np.ndarray) -> np.ndarray:
+        """
+        Multiplies a batch by the matrix, as `inputs @ dense.T` does
+
+        Every non-zero weight is multiplied by its input across the whole
+        batch at once, then each row's products are summed with one `reduceat`
+
+        Parameters
+        ----------
+        inputs : np.ndarray
+            A (batch, inputs) array
+
+        Returns
+        -------
+        outputs : np.ndarray
+            A (batch, neurons) array
+        """
+        outputs = np.zeros((len(inputs), self.shape[0]), np.result_type(inputs, self.data))
+        if len(self.data) == 0:
+            return outputs
+
+        products = inputs[:, self.indices]
+        products *= self.data
+        # reduceat can't give empty rows a sum of 0, so only the rows with weights are summed
+        filled_rows = np.flatnonzero(np.diff(self.indptr))
+        outputs[:, filled_rows] = np.add.reduceat(products, self.indptr[filled_rows], axis=1)
+        return outputs
+
+
+def _random_sparse_weights(shape, density, dtype, random):
+    weights = random.standard_normal(shape).astype(dtype)
+    weights[random.random_sample(shape) >= density] = 0
+    return weights
+
+
+def measure_crossover(num_of_inputs=784, num_of_neurons=256, batch_size=64, dtype=np.float64,
+                      densities=(0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5), min_time=0.02, repeats=3) -> dict:
+    """
+    Times the dense and CSR forward pass of one layer over a range of densities
+
+    Parameters
+    ----------
+    num_of_inputs, num_of_neurons : int
+        The shape of the layer
+
+    batch_size : int
+        How many samples go through each call
+
+    dtype : np.dtype
+        The float type of the layer
+
+    densities : sequence of float
+        The fractions of non-zero weights to time, from smallest to largest
+
+    min_time, repeats
+        See `Benchmarks.time_call`
+
+    Returns
+    -------
+    results : dict
+        crossover, the largest density the sparse pass was faster at, 0 if it never was,
+        and densities, dense_times and sparse_times, the seconds per call at each density
+    """
+    random = np.random.RandomState(0)
+    inputs = random.random_sample((batch_size, num_of_inputs)).astype(dtype)
+
+    dense_times, sparse_times = [], []
+    crossover = 0.0
+    for density in densities:
+        weights = _random_sparse_weights((num_of_neurons, num_of_inputs), density, dtype, random)
+        csr_weights = CSRMatrix(weights)
+
+        dense_times.append(float(np.median(time_call(lambda: inputs @ weights.T, min_time, repeats))))
+        sparse_times.append(float(np.median(time_call(lambda: csr_weights.matmul_transposed(inputs),
+                                                      min_time, repeats))))
+        if sparse_times[-1] < dense_times[-1]:
+            crossover = density
+
+    return {
+        'crossover': crossover,
+        'densities': list(densities),
+        'dense_times': dense_times,
+        'sparse_times': sparse_times,
+    }
+
+
+class SparseNetwork:
+    def __init__(self, network, crossover=None, batch_size=64):
+        """
+        An inference only copy of a pruned `Network` that runs sparse layers in CSR form
+
+        Each layer whose density is below the crossover is stored as a
+        `CSRMatrix`, the rest stay dense.
+
+        Parameters
+        ----------
+        network : Network
+            The pruned network, later changes to it do not affect this copy
+
+        crossover : float, optional
+            The density below which a layer is run sparse, measured with
+            `measure_crossover` for the network's first layer when not given
+
+        batch_size : int
+            The batch size the crossover is measured at
+
+        Examples
+        --------
+        >>> network.prune(0.95)
+        >>> sparse_network = SparseNetwork(network)
+        >>> outputs = sparse_network.predict(test_inputs)
+        """
+        if not network.is_fully_connected:
+            raise ValueError('Only fully connected networks can be run sparse')
+        if crossover is None:
+            input_layer = network.layers[0]
+            crossover = measure_crossover(input_layer.num_of_inputs, len(input_layer), batch_size,
+                                          network.dtype)['crossover']
+        self.crossover = crossover
+        self.dtype = network.dtype
+        self.weights = []
+        self.biases = []
+        self.activation_functions = []
+
+        for layer in network.layers:
+            density = np.count_nonzero(layer.weights) / layer.weights.size
+            self.weights.append(CSRMatrix(layer.weights) if density < crossover else np.array(layer.weights))
+            self.biases.append(np.array(layer.biases))
+            self.activation_functions.append(layer.activation_function)
+
+    @property
+    def num_of_sparse_layers(self) -> int:
+        return sum(isinstance(weights, CSRMatrix) for weights in self.weights)
+
+    def predict(self, inputs, return_classes=False):
+        """
+        Runs a batch through the network, see `Network.predict`
+        """
+        layer_outputs = np.atleast_2d(np.asarray(inputs, dtype=self.dtype))
+        for weights, biases, activation_function in zip(self.weights, self.biases, self.activation_functions):
+            if isinstance(weights, CSRMatrix):
+                layer_outputs = weights.matmul_transposed(layer_outputs)
+            else:
+                layer_outputs = layer_outputs @ weights.T
+            layer_outputs += biases
+            layer_outputs = activation_function(layer_outputs)
+
+        if return_classes:
+            return layer_outputs, layer_outputs.argmax(axis=1)
+        return layer_outputs
+
+
+class GradualPruning(Callback):
+    def __init__(self, final_sparsity, start_epoch=0, end_epoch=10, initial_sparsity=0.0, per_layer=False):
+        """
+        Prunes the network a little at the end of each epoch until it reaches `final_sparsity`
+
+        The sparsity follows a cubic schedule, pruning quickly at first
+        while there are plenty of small weights and slowing down towards the
+        end, giving the network time to recover between steps.
+
+        Parameters
+        ----------
+        final_sparsity : float
+            The fraction of weights pruned by the end
+
+        start_epoch : int
+            The first epoch to prune after
+
+        end_epoch : int
+            The epoch the final sparsity is reached at
+
+        initial_sparsity : float
+            The sparsity of the first step
+
+        per_layer : bool
+            See `Network.prune`
+
+        References
+        ----------
+            See : https://arxiv.org/abs/1710.01878
+                  for the cubic sparsity schedule
+
+        Examples
+        --------
+        >>> network.train(inputs, labels, epochs=15, callbacks=[GradualPruning(0.9, end_epoch=10)])
+        """
+        self.final_sparsity = final_sparsity
+        self.start_epoch = start_epoch
+        self.end_epoch = end_epoch
+        self.initial_sparsity = initial_sparsity
+        self.per_layer = per_layer
+        self.sparsity = 0.0
+
+    def target_sparsity(self, epoch) -> float:
+        """The sparsity the schedule wants after `epoch`"""
+        if epoch < self.start_epoch:
+            return 0.0
+        progress = min((epoch - self.start_epoch) / max(self.end_epoch - self.start_epoch, 1), 1)
+        return self.final_sparsity + (self.initial_sparsity - self.final_sparsity) * (1 - progress) ** 3
+
+    def on_epoch_end(self, network, logs):
+        target_sparsity = self.target_sparsity(logs['epoch'])
+        if target_sparsity > 0:
+            self.sparsity = network.prune(target_sparsity, self.per_layer)
@@ -0,0 +1,87 @@
+import unittest
+
+import numpy as np
+
+from Network import Network
+from Quantization import (EXACT_FLOAT32_DEPTH, QuantizedNetwork, _integer_matmul, accuracy_report, quantize_weights,
+                          widen_weights)
+
+np.random.seed(0)
+
+
+class QuantizationTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.layers = {
+            'layer1': {
+                'activation': 'relu',
+                'neurons': 32,
+            },
+            'layer2': {
+                'activation': 'softmax',
+                'neurons': 4,
+            }
+        }
+        self.network = Network(20, self.layers)
+        self.inputs = np.random.random_sample((200, 20))
+        self.labels = np.eye(4)[np.argmax(self.inputs[:, :4], axis=1)]
+        self.network.train(self.inputs, self.labels, batch_size=20, epochs=20)
+
+    def test_quantize_weights(self):
+        print("\nQuantize Weights Test:")
+        weights = self.network.layers[0].weights
+        for per_row in (True, False):
+            quantized_weights, scales = quantize_weights(weights, per_row)
+            self.assertEqual(quantized_weights.dtype, np.int8)
+            self.assertEqual(np.max(np.abs(quantized_weights)), 127)
+            error = np.abs(quantized_weights * scales[:, None] - weights)
+            self.assertTrue(np.all(error <= scales[:, None] / 2 + 1e-7))
+        self.assertEqual(len(np.unique(scales)), 1)
+
+    def test_integer_matmul_is_exact(self):
+        print("\nInteger Matmul Test:")
+        for num_of_inputs in (100, 2 * EXACT_FLOAT32_DEPTH + 7):
+            inputs = np.full((3, num_of_inputs), 127, np.int32)
+            inputs[1] = np.random.randint(-127, 128, num_of_inputs)
+            weights = np.random.randint(-127, 128, (5, num_of_inputs)).astype(np.int8)
+            weights[0] = 127
+
+            expected = inputs.astype(np.int64) @ weights.T.astype(np.int64)
+            outputs = _integer_matmul(inputs.astype(np.float32), widen_weights(weights))
+            np.testing.assert_array_equal(outputs.astype(np.int64), expected)
+
+    def test_predict_close_to_float(self):
+        print("\nQuantized Predict Test:")
+        quantized_network = QuantizedNetwork(self.network, self.inputs[:100])
+        outputs = quantized_network.predict(self.inputs)
+        self.assertEqual(outputs.dtype, np.float32)
+        np.testing.assert_allclose(outputs, self.network.predict(self.inputs), atol=0.02)
+
+        with self.assertRaises(ValueError):
+            QuantizedNetwork(self.network).predict(self.inputs)
+
+    def test_weights_widened_once(self):
+        print("\nWidened Weights Test:")
+        quantized_network = QuantizedNetwork(self.network, self.inputs[:100])
+        for weights, widened_weights in zip(quantized_network.weights, quantized_network.widened_weights):
+            self.assertEqual(widened_weights.dtype, np.float32)
+            np.testing.assert_array_equal(widened_weights, weights)
+        self.assertEqual(quantized_network.runtime_nbytes,
+                         quantized_network.nbytes + sum(weights.size * 4 for weights in quantized_network.weights))
+        with self.assertRaises(ValueError):
+            quantized_network.widened_weights[0][0, 0] = 0
+
+    def test_accuracy_report(self):
+        print("\nQuantization Report Test:")
+        quantized_network = QuantizedNetwork(self.network, self.inputs[:100])
+        report = accuracy_report(self.network, quantized_network, self.inputs, self.labels, chunk_size=64)
+        print(f"\tAccuracy drop: {report['accuracy_drop']}   Compression: {report['compression']:.2f}")
+
+        self.assertAlmostEqual(report['float_accuracy'], self.network.evaluate(self.inputs, self.labels)['accuracy'])
+        self.assertLessEqual(abs(report['accuracy_drop']), 0.05)
+        self.assertGreater(report['agreement'], 0.95)
+        self.assertGreater(report['compression'], 6)
+        self.assertEqual(report['quantized_runtime_bytes'], quantized_network.runtime_nbytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
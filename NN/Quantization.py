@@ -0,0 +1,279 @@
+import time
+
+import numpy as np
+
+# Products of two int8 values summed over this many inputs always fit in
+# float32's 24 bit mantissa, so a float32 matmul of them is exact
+EXACT_FLOAT32_DEPTH = 2 ** 24 // 127 ** 2
+
+
+def quantize_weights(weights: np.ndarray, per_row=True):
+    """
+    Symmetrically quantizes a weight matrix to int8
+
+    Parameters
+    ----------
+    weights : np.ndarray
+        A (neurons, inputs) weight matrix
+
+    per_row : bool
+        Gives every neuron its own scale, otherwise the whole matrix shares one
+
+    Returns
+    -------
+    quantized_weights : np.ndarray
+        A (neurons, inputs) int8 array, `quantized_weights * scales[:, None]` is close to `weights`
+
+    scales : np.ndarray
+        A (neurons,) float32 array of scales
+    """
+    largest = np.max(np.abs(weights), axis=1) if per_row else np.full(len(weights), np.max(np.abs(weights)))
+    scales = np.where(largest > 0, largest / 127, 1).astype(np.float32)
+    quantized_weights = np.clip(np.rint(weights / scales[:, None]), -127, 127).astype(np.int8)
+    return quantized_weights, scales
+
+
+def widen_weights(quantized_weights: np.ndarray) -> np.ndarray:
+    """
+    Widens int8 weights to the float32 matrix `_integer_matmul` multiplies by
+
+    numpy's integer matmul doesn't use BLAS and is many times slower than
+    float32, so the int8 values are multiplied through float32 BLAS instead.
+    Widening is done once, copying the weights on every call would read more
+    memory than the float network does
+    """
+    widened_weights = quantized_weights.astype(np.float32)
+    widened_weights.flags.writeable = False
+    return widened_weights
+
+
+def _integer_matmul(quantized_inputs, widened_weights):
+    """
+    Multiplies integer valued float32 inputs by widened int8 weights exactly
+
+    The matmul is done in blocks short enough for every sum to be exact.
+    Sums of longer rows can be too big for float32 so they are returned as float64
+    """
+    num_of_inputs = widened_weights.shape[1]
+    if num_of_inputs <= EXACT_FLOAT32_DEPTH:
+        return quantized_inputs @ widened_weights.T
+
+    totals = np.zeros((len(quantized_inputs), len(widened_weights)))
+    for start in range(0, num_of_inputs, EXACT_FLOAT32_DEPTH):
+        end = start + EXACT_FLOAT32_DEPTH
+        totals += quantized_inputs[:, start:end] @ widened_weights[:, start:end].T
+    return totals
+
+
+class QuantizedNetwork:
+    def __init__(self, network, calibration_inputs=None, per_row=True, percentile=100.0):
+        """
+        An int8 copy of a trained `Network` for inference
+
+        Weights are stored as int8 with a float scale for every neuron (or one
+        per layer), which is 8 times smaller than float64. Each layer's inputs
+        are quantized to int8 with a scale found by `calibrate`, multiplied
+        by the int8 weight values and rescaled to float32 before the bias
+        and activation.
+
+        numpy has no int8 matmul kernel that is faster than float32 BLAS, so
+        the int8 values are widened once to float32 when the copy is made and
+        the products are summed by a float32 matmul, in blocks short enough
+        that the sums are exact. Running therefore holds the float32 copies as
+        well, see `runtime_nbytes`, and is no faster than a float32 `Network`.
+        The saving is in the size of the stored int8 weights.
+
+        Parameters
+        ----------
+        network : Network
+            The trained network, later changes to it do not affect this copy
+
+        calibration_inputs : array_like, optional
+            A sample of the data set passed to `calibrate`
+
+        per_row : bool
+            Gives every neuron its own weight scale, otherwise each layer has one
+
+        percentile : float
+            See `calibrate`
+
+        Methods
+        ------
+        calibrate(network, inputs, percentile=100.0)
+            Sets the input scales from a sample of the data set
+
+        predict(inputs, return_classes=False)
+            Runs a batch through the quantized network
+
+        Examples
+        --------
+        >>> quantized_network = QuantizedNetwork(network, train_inputs[:1000])
+        >>> accuracy_report(network, quantized_network, test_inputs, test_labels)['accuracy_drop']
+        """
+        if not network.is_fully_connected:
+            raise ValueError('Only fully connected networks can be quantized')
+        self.per_row = per_row
+        self.weights = []
+        self.widened_weights = []
+        self.weight_scales = []
+        self.biases = []
+        self.activation_functions = []
+        self.input_scales = None
+
+        for layer in network.layers:
+            quantized_weights, scales = quantize_weights(layer.weights, per_row)
+            self.weights.append(quantized_weights)
+            self.widened_weights.append(widen_weights(quantized_weights))
+            self.weight_scales.append(scales)
+            self.biases.append(layer.biases.astype(np.float32))
+            self.activation_functions.append(layer.activation_function)
+
+        if calibration_inputs is not None:
+            self.calibrate(network, calibration_inputs, percentile)
+
+    @property
+    def nbytes(self) -> int:
+        """The bytes used by the int8 weights, scales and biases"""
+        return sum(array.nbytes for arrays in (self.weights, self.weight_scales, self.biases) for array in arrays)
+
+    @property
+    def runtime_nbytes(self) -> int:
+        """The bytes held while running, `nbytes` plus the widened float32 weights"""
+        return self.nbytes + sum(weights.nbytes for weights in self.widened_weights)
+
+    def calibrate(self, network, inputs, percentile=100.0, chunk_size=1024):
+        """
+        Sets the scale each layer's inputs are quantized with
+
+        The float network is run over the sample and the scale is picked so the
+        largest input magnitude, or the given percentile of them, maps to 127.
+        Bigger inputs are clipped.
+
+        Parameters
+        ----------
+        network : Network
+            The float network this was made from
+
+        inputs : array_like
+            A (samples, features) sample of the data set
+
+        percentile : float
+            Below 100 ignores rare outliers so the rest of the values get more precision
+
+        chunk_size : int
+            How many samples are run at once
+        """
+        magnitudes = [[] for _ in network.layers]
+        for start in range(0, len(inputs), chunk_size):
+            layer_outputs = np.asarray(inputs[start:start + chunk_size], dtype=network.dtype)
+            for layer, layer_magnitudes in zip(network.layers, magnitudes):
+                layer_magnitudes.append(np.abs(layer_outputs).ravel())
+                layer_outputs = layer.forward(layer_outputs)
+
+        self.input_scales = []
+        for layer_magnitudes in magnitudes:
+            largest = np.percentile(np.concatenate(layer_magnitudes), percentile)
+            self.input_scales.append(np.float32(largest / 127 if largest > 0 else 1))
+
+    def predict(self, inputs, return_classes=False):
+        """
+        Runs a batch through the quantized network, see `Network.predict`
+
+        Returns
+        -------
+        outputs : np.ndarray
+            A (samples, outputs) float32 array of outputs
+
+        classes : np.ndarray
+            A (samples,) array of class ids, only returned if `return_classes` is set
+        """
+        if self.input_scales is None:
+            raise ValueError('The network needs calibrating before it can be run')
+
+        layer_outputs = np.atleast_2d(np.asarray(inputs, dtype=np.float32))
+        for weights, weight_scales, biases, activation_function, input_scale in zip(
+                self.widened_weights, self.weight_scales, self.biases, self.activation_functions, self.input_scales):
+            quantized_inputs = layer_outputs * (1 / input_scale)
+            np.rint(quantized_inputs, out=quantized_inputs)
+            np.clip(quantized_inputs, -127, 127, out=quantized_inputs)
+
+            totals = _integer_matmul(quantized_inputs, weights)
+            totals *= input_scale * weight_scales
+            layer_outputs = totals.astype(np.float32, copy=False)
+            layer_outputs += biases
+            layer_outputs = activation_function(layer_outputs)
+
+        if return_classes:
+            return layer_outputs, layer_outputs.argmax(axis=1)
+        return layer_outputs
+
+
+def accuracy_report(network, quantized_network, inputs, labels, chunk_size=1024) -> dict:
+    """
+    Compares a quantized network against the float network it was made from
+
+    Parameters
+    ----------
+    network : Network
+        The float network
+
+    quantized_network : QuantizedNetwork
+        The quantized copy
+
+    inputs : array_like
+        A (samples, features) array of held out data
+
+    labels : array_like
+        A (samples, outputs) array of one-hot labels or a (samples,) array of class ids
+
+    chunk_size : int
+        How many samples are run at once
+
+    Returns
+    -------
+    report : dict
+        float_accuracy, quantized_accuracy and accuracy_drop,
+        agreement, the fraction of samples given the same class,
+        max_output_difference, the largest difference between the outputs,
+        float_bytes, quantized_bytes and compression for the stored weights,
+        quantized_runtime_bytes, the memory the quantized copy holds while running,
+        and the measured float_samples_per_second and quantized_samples_per_second
+    """
+    labels = np.asarray(labels)
+    classes = labels if labels.ndim == 1 else labels.argmax(axis=1)
+
+    float_correct = quantized_correct = agreements = 0
+    max_output_difference = 0.0
+    float_time = quantized_time = 0.0
+    for start in range(0, len(inputs), chunk_size):
+        chunk = np.asarray(inputs[start:start + chunk_size])
+        chunk_classes = classes[start:start + chunk_size]
+
+        start_time = time.perf_counter()
+        float_outputs, float_classes = network.predict(chunk, return_classes=True)
+        float_time += time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        quantized_outputs, quantized_classes = quantized_network.predict(chunk, return_classes=True)
+        quantized_time += time.perf_counter() - start_time
+
+        float_correct += np.sum(float_classes == chunk_classes)
+        quantized_correct += np.sum(quantized_classes == chunk_classes)
+        agreements += np.sum(float_classes == quantized_classes)
+        max_output_difference = max(max_output_difference, float(np.max(np.abs(float_outputs - quantized_outputs))))
+
+    num_of_samples = len(labels)
+    float_bytes = sum(layer.weights.nbytes + layer.biases.nbytes for layer in network.layers)
+    return {
+        'float_accuracy': float(float_correct) / num_of_samples,
+        'quantized_accuracy': float(quantized_correct) / num_of_samples,
+        'accuracy_drop': float(float_correct - quantized_correct) / num_of_samples,
+        'agreement': float(agreements) / num_of_samples,
+        'max_output_difference': max_output_difference,
+        'float_bytes': float_bytes,
+        'quantized_bytes': quantized_network.nbytes,
+        'compression': float_bytes / quantized_network.nbytes,
+        'quantized_runtime_bytes': quantized_network.runtime_nbytes,
+        'float_samples_per_second': num_of_samples / float_time,
+        'quantized_samples_per_second': num_of_samples / quantized_time,
+    }
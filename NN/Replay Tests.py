@@ -0,0 +1,124 @@
+import unittest
+
+import numpy as np
+
+from Network import Network
+from Replay import ReplayBuffer
+
+np.random.seed(0)
+
+
+class ReplayBufferTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.random_state = np.random.get_state()
+        self.buffer = ReplayBuffer(5, 2, 1)
+
+    def tearDown(self) -> None:
+        np.random.set_state(self.random_state)
+
+    @staticmethod
+    def samples(start, stop):
+        ids = np.arange(start, stop, dtype=np.float64)
+        return np.stack([ids, -ids], axis=1), ids[:, None]
+
+    def test_ring_wraps(self):
+        print("\nReplay Ring Test:")
+        self.buffer.add(*self.samples(0, 3))
+        self.assertEqual(len(self.buffer), 3)
+        self.buffer.add(*self.samples(3, 7))
+
+        self.assertEqual(len(self.buffer), 5)
+        self.assertEqual(self.buffer.num_of_samples_seen, 7)
+        self.assertEqual(sorted(self.buffer.labels[:, 0]), [2, 3, 4, 5, 6])
+        np.testing.assert_array_equal(self.buffer.inputs[:, 1], -self.buffer.labels[:, 0])
+
+        self.buffer.add(*self.samples(7, 20))
+        self.assertEqual(sorted(self.buffer.labels[:, 0]), [15, 16, 17, 18, 19])
+
+    def test_batch_mixes_new_and_buffered(self):
+        print("\nReplay Batch Test:")
+        inputs, labels = self.samples(100, 103)
+        batch_inputs, batch_labels = self.buffer.batch(inputs, labels, 4)
+        self.assertEqual(len(batch_inputs), 3)
+
+        self.buffer.add(*self.samples(0, 5))
+        batch_inputs, batch_labels = self.buffer.batch(inputs, labels, 4)
+        self.assertEqual(len(batch_inputs), 7)
+        np.testing.assert_array_equal(batch_labels[:3, 0], [100, 101, 102])
+        self.assertTrue(np.all(batch_labels[3:, 0] < 5))
+        np.testing.assert_array_equal(batch_inputs[:, 0], batch_labels[:, 0])
+
+        # The batch arrays are reused rather than reallocated
+        smaller_batch_inputs, _ = self.buffer.batch(inputs[:1], labels[:1], 2)
+        self.assertIs(smaller_batch_inputs.base, batch_inputs.base)
+
+
+class PartialFitTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.random_state = np.random.get_state()
+        self.layers = {
+            'layer1': {
+                'activation': 'relu',
+                'neurons': 16,
+            },
+            'layer2': {
+                'activation': 'softmax',
+                'neurons': 3,
+            }
+        }
+        self.network = Network(6, self.layers)
+        self.network.learning_rate = 0.5
+        self.inputs = np.random.random_sample((3000, 6))
+        self.labels = np.eye(3)[np.argmax(self.inputs[:, :3], axis=1)]
+
+    def tearDown(self) -> None:
+        np.random.set_state(self.random_state)
+
+    def test_partial_fit_learns_stream(self):
+        print("\nPartial Fit Test:")
+        accuracy_before = self.network.evaluate(self.inputs, self.labels)['accuracy']
+        for start in range(0, 2000, 8):
+            self.network.partial_fit(self.inputs[start:start + 8], self.labels[start:start + 8], buffer_size=256)
+
+        accuracy_after = self.network.evaluate(self.inputs[2000:], self.labels[2000:])['accuracy']
+        print(f'\tAccuracy before: {accuracy_before:.3f}   after: {accuracy_after:.3f}')
+        self.assertGreater(accuracy_after, 0.8)
+        self.assertEqual(len(self.network.replay_buffer), 256)
+        self.assertEqual(self.network.replay_buffer.num_of_samples_seen, 2000)
+
+    def test_partial_fit_batch(self):
+        print("\nPartial Fit Batch Test:")
+        self.network.partial_fit(self.inputs[:10], self.labels[:10])
+        weights = self.network.layers[0].weights.copy()
+
+        # One update from the 4 new samples and 6 replayed ones
+        error = self.network.partial_fit(self.inputs[10:14], self.labels[10:14], num_of_replayed=6)
+        self.assertEqual(len(self.network.layers[0].batch_inputs), 10)
+        self.assertFalse(np.array_equal(weights, self.network.layers[0].weights))
+        self.assertGreater(error, 0)
+
+        # A single sample is a batch of one
+        self.network.partial_fit(self.inputs[0], self.labels[0], num_of_replayed=0)
+        self.assertEqual(len(self.network.replay_buffer), 15)
+
+        with self.assertRaises(ValueError):
+            self.network.partial_fit(self.inputs[:3], self.labels[:2])
+
+    def test_buffer_memory_is_constant(self):
+        print("\nReplay Memory Test:")
+        # The second call is the first with a full batch of replayed samples
+        for start in range(0, 64, 32):
+            self.network.partial_fit(self.inputs[start:start + 32], self.labels[start:start + 32], buffer_size=100)
+        buffer = self.network.replay_buffer
+        nbytes = buffer.nbytes
+        batch_inputs = buffer.batch_inputs
+
+        for start in range(64, 3000, 32):
+            self.network.partial_fit(self.inputs[start:start + 32], self.labels[start:start + 32])
+        self.assertIs(self.network.replay_buffer, buffer)
+        self.assertEqual(buffer.nbytes, nbytes)
+        self.assertIs(buffer.batch_inputs, batch_inputs)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import numpy as np
+
+
+class ReplayBuffer:
+    def __init__(self, capacity: int, num_of_inputs: int, num_of_outputs: int, dtype=np.float64):
+        """
+        A fixed-size ring of the most recent samples of a stream, for `Network.partial_fit`
+
+        All the memory is allocated up front. Once `capacity` samples have
+        been added each new one overwrites the oldest, so however long the
+        stream runs the buffer never grows.
+
+        Parameters
+        ----------
+        capacity : int
+            The most samples kept
+
+        num_of_inputs, num_of_outputs : int
+            The size of each sample's inputs and one-hot labels
+
+        dtype : np.dtype
+            The float type the samples are stored as
+
+        Methods
+        ------
+        add(inputs, labels)
+            Writes samples in at the head of the ring
+
+        batch(inputs, labels, num_of_replayed)
+            Makes a training batch of new samples and ones drawn from the buffer
+
+        Examples
+        --------
+        >>> buffer = ReplayBuffer(10000, 784, 10, np.float32)
+        >>> buffer.add(inputs, labels)
+        >>> len(buffer)
+        """
+        if capacity < 1:
+            raise ValueError(f'capacity must be at least 1, got {capacity}')
+        self.inputs = np.zeros((capacity, num_of_inputs), dtype)
+        self.labels = np.zeros((capacity, num_of_outputs), dtype)
+        self.head = 0
+        self.num_of_samples = 0
+        self.num_of_samples_seen = 0
+        self.batch_inputs = None
+        self.batch_labels = None
+
+    @property
+    def capacity(self) -> int:
+        return len(self.inputs)
+
+    @property
+    def nbytes(self) -> int:
+        return self.inputs.nbytes + self.labels.nbytes
+
+    def add(self, inputs: np.ndarray, labels: np.ndarray):
+        """
+        Writes samples in at the head of the ring, wrapping round to overwrite the oldest
+
+        Parameters
+        ----------
+        inputs : np.ndarray
+            A (samples, inputs) array
+
+        labels : np.ndarray
+            A (samples, outputs) array
+        """
+        self.num_of_samples_seen += len(inputs)
+        # Only the last `capacity` samples of a batch bigger than the whole buffer would survive
+        inputs, labels = inputs[-self.capacity:], labels[-self.capacity:]
+
+        first_part = min(len(inputs), self.capacity - self.head)
+        self.inputs[self.head:self.head + first_part] = inputs[:first_part]
+        self.labels[self.head:self.head + first_part] = labels[:first_part]
+        rest = len(inputs) - first_part
+        self.inputs[:rest] = inputs[first_part:]
+        self.labels[:rest] = labels[first_part:]
+
+        self.head = (self.head + len(inputs)) % self.capacity
+        self.num_of_samples = min(self.num_of_samples + len(inputs), self.capacity)
+
+    def batch(self, inputs: np.ndarray, labels: np.ndarray, num_of_replayed: int):
+        """
+        Makes a training batch of new samples followed by samples drawn
+        uniformly from the buffer with `np.random`
+
+        The batch is written into arrays that are reused by the next call,
+        which only grow when a bigger batch is asked for
+
+        Parameters
+        ----------
+        inputs, labels : np.ndarray
+            The new samples, which haven't been added yet
+
+        num_of_replayed : int
+            How many buffered samples to draw, fewer if the buffer holds fewer
+
+        Returns
+        -------
+        batch_inputs, batch_labels : np.ndarray
+        """
+        num_of_replayed = min(num_of_replayed, self.num_of_samples)
+        batch_size = len(inputs) + num_of_replayed
+        if self.batch_inputs is None or len(self.batch_inputs) < batch_size:
+            self.batch_inputs = np.empty((batch_size, self.inputs.shape[1]), self.inputs.dtype)
+            self.batch_labels = np.empty((batch_size, self.labels.shape[1]), self.labels.dtype)
+        batch_inputs, batch_labels = self.batch_inputs[:batch_size], self.batch_labels[:batch_size]
+
+        batch_inputs[:len(inputs)] = inputs
+        batch_labels[:len(inputs)] = labels
+        if num_of_replayed:
+            indexes = np.random.randint(self.num_of_samples, size=num_of_replayed)
+            np.take(self.inputs, indexes, axis=0, out=batch_inputs[len(inputs):])
+            np.take(self.labels, indexes, axis=0, out=batch_labels[len(inputs):])
+        return batch_inputs, batch_labels
+
+    def __len__(self):
+        return self.num_of_samples
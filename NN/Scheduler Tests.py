@@ -0,0 +1,158 @@
+import threading
+import unittest
+
+import numpy as np
+
+from Callbacks import Callback
+from Network import Network
+from Scheduler import TrainingScheduler
+
+
+class BlockingCallback(Callback):
+    def __init__(self):
+        """Holds training at the end of the first batch until released"""
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def on_batch_end(self, network, logs):
+        self.started.set()
+        self.release.wait(5)
+
+
+class BlockingStopCallback(Callback):
+    def __init__(self):
+        """Holds training at the end of the epoch it was told to stop in until released"""
+        self.stopped = threading.Event()
+        self.release = threading.Event()
+
+    def on_epoch_end(self, network, logs):
+        if network.stop_training:
+            self.stopped.set()
+            self.release.wait(5)
+
+
+class TrainingSchedulerTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.random_state = np.random.get_state()
+        np.random.seed(0)
+        self.layers = {
+            'layer1': {
+                'activation': 'relu',
+                'neurons': 6,
+            },
+            'layer2': {
+                'activation': 'softmax',
+                'neurons': 2,
+            }
+        }
+        self.inputs = np.random.random_sample((64, 3))
+        self.labels = np.eye(2)[(self.inputs[:, 0] > 0.5).astype(int)]
+        self.scheduler = TrainingScheduler(max_concurrent_jobs=2, cpu_budget=2, progress_interval=0)
+
+    def tearDown(self) -> None:
+        self.scheduler.shutdown()
+        np.random.set_state(self.random_state)
+
+    def test_jobs_finish(self):
+        print("\nJobs Finish Test:")
+        networks = [Network(3, self.layers) for _ in range(3)]
+        job_ids = [self.scheduler.submit(network, self.inputs, self.labels, epochs=3, batch_size=16)
+                   for network in networks]
+
+        for job_id in job_ids:
+            self.assertTrue(self.scheduler.wait(job_id, timeout=10))
+            status = self.scheduler.status(job_id)
+            self.assertEqual(status['state'], 'finished')
+            self.assertEqual(status['epochs_finished'], 3)
+
+        events = list(self.scheduler.jobs[job_ids[0]].events())
+        self.assertEqual([event['state'] for event in events if event['type'] == 'state'],
+                         ['queued', 'running', 'finished'])
+        self.assertEqual([event['epoch'] for event in events if event['type'] == 'epoch'], [0, 1, 2])
+        self.assertEqual([event['sequence'] for event in events], list(range(len(events))))
+
+    def test_pause_resume_and_cancel(self):
+        print("\nPause, Resume and Cancel Test:")
+        blocker = BlockingCallback()
+        job_id = self.scheduler.submit(Network(3, self.layers), self.inputs, self.labels, epochs=5, batch_size=16,
+                                       callbacks=[blocker])
+        self.assertTrue(blocker.started.wait(5))
+
+        self.scheduler.pause(job_id)
+        blocker.release.set()
+        job = self.scheduler.jobs[job_id]
+        with job._condition:
+            job._condition.wait_for(lambda: job.state == 'paused', 5)
+        self.assertEqual(self.scheduler.status(job_id)['state'], 'paused')
+        self.assertEqual(self.scheduler.status(job_id)['epochs_finished'], 0)
+
+        self.scheduler.resume(job_id)
+        self.assertTrue(self.scheduler.wait(job_id, timeout=10))
+        self.assertEqual(self.scheduler.status(job_id)['state'], 'finished')
+        self.assertEqual(self.scheduler.status(job_id)['epochs_finished'], 5)
+
+        with self.assertRaises(ValueError):
+            self.scheduler.resume(job_id)
+
+        blocker = BlockingCallback()
+        job_id = self.scheduler.submit(Network(3, self.layers), self.inputs, self.labels, epochs=5, callbacks=[blocker])
+        self.assertTrue(blocker.started.wait(5))
+        self.scheduler.cancel(job_id)
+        blocker.release.set()
+        self.assertTrue(self.scheduler.wait(job_id, timeout=10))
+        self.assertEqual(self.scheduler.status(job_id)['state'], 'cancelled')
+
+    def test_resume_before_pause_settles(self):
+        print("\nImmediate Resume Test:")
+        start_blocker, stop_blocker = BlockingCallback(), BlockingStopCallback()
+        job_id = self.scheduler.submit(Network(3, self.layers), self.inputs, self.labels, epochs=5, batch_size=16,
+                                       callbacks=[start_blocker, stop_blocker])
+        self.assertTrue(start_blocker.started.wait(5))
+
+        # Training has been told to stop for the pause, but the worker hasn't settled the job's state yet
+        self.scheduler.pause(job_id)
+        start_blocker.release.set()
+        self.assertTrue(stop_blocker.stopped.wait(5))
+        self.scheduler.resume(job_id)
+        stop_blocker.release.set()
+
+        self.assertTrue(self.scheduler.wait(job_id, timeout=10))
+        self.assertEqual(self.scheduler.status(job_id)['state'], 'finished')
+        self.assertEqual(self.scheduler.status(job_id)['epochs_finished'], 5)
+
+    def test_cpu_budget(self):
+        print("\nCPU Budget Test:")
+        blocker = BlockingCallback()
+        first_job = self.scheduler.submit(Network(3, self.layers), self.inputs, self.labels, epochs=1, cpus=2,
+                                          callbacks=[blocker])
+        second_job = self.scheduler.submit(Network(3, self.layers), self.inputs, self.labels, epochs=1)
+        self.assertTrue(blocker.started.wait(5))
+
+        # The first job uses the whole budget, so the second waits even though a worker is free
+        self.assertEqual(self.scheduler.status(second_job)['state'], 'queued')
+        blocker.release.set()
+        self.assertTrue(self.scheduler.wait(first_job, timeout=10))
+        self.assertTrue(self.scheduler.wait(second_job, timeout=10))
+
+        with self.assertRaises(ValueError):
+            self.scheduler.submit(Network(3, self.layers), self.inputs, self.labels, cpus=3)
+
+    def test_time_slice(self):
+        print("\nTime Slice Test:")
+        scheduler = TrainingScheduler(max_concurrent_jobs=1, time_slice=0)
+        states = []
+        first_job = scheduler.submit(Network(3, self.layers), self.inputs, self.labels, epochs=3,
+                                     listener=lambda event: states.append((event['job_id'], event['state']))
+                                     if event['type'] == 'state' else None)
+        second_job = scheduler.submit(Network(3, self.layers), self.inputs, self.labels, epochs=3)
+
+        self.assertTrue(scheduler.wait(first_job, timeout=10))
+        self.assertTrue(scheduler.wait(second_job, timeout=10))
+        scheduler.shutdown()
+        # The first job gives up its worker after each epoch while the second is waiting
+        self.assertIn((first_job, 'queued'), states[1:])
+        self.assertEqual(scheduler.status(first_job)['epochs_finished'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,481 @@
+import itertools
+import os
+import threading
+import time
+from collections import deque
+
+from Callbacks import Callback, ThrottledProgress
+
+JOB_STATES = ('queued', 'running', 'paused', 'finished', 'cancelled', 'failed')
+DONE_STATES = ('finished', 'cancelled', 'failed')
+
+
+class TrainingJob:
+    def __init__(self, job_id, network, inputs, labels, epochs, cpus, callbacks, listener, train_settings,
+                 max_events=1000):
+        """
+        One network's training run on a `TrainingScheduler`, made by `TrainingScheduler.submit`
+
+        Attributes
+        ----------
+        id : str
+            The job's id, used to pause, resume and cancel it
+
+        state : str
+            One of 'queued', 'running', 'paused', 'finished', 'cancelled' or 'failed'
+
+        epochs_finished : int
+            How many of the job's epochs are done, a paused epoch is started again when resumed
+
+        error : Exception
+            What stopped a failed job
+
+        Methods
+        ------
+        events(timeout=None)
+            Yields the job's events as they happen
+        """
+        self.id = job_id
+        self.network = network
+        self.inputs = inputs
+        self.labels = labels
+        self.epochs = epochs
+        self.cpus = cpus
+        self.callbacks = callbacks
+        self.listener = listener
+        self.train_settings = train_settings
+
+        self.state = 'queued'
+        self.epochs_finished = 0
+        self.last_error = None
+        self.error = None
+        self.slice_start_time = None
+        self._stop_request = None
+
+        self._events = deque(maxlen=max_events)
+        self._num_of_events = 0
+        self._condition = threading.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.state in DONE_STATES
+
+    def _emit(self, event_type, **data):
+        """Records an event, wakes up anything streaming the job's events and calls the listener"""
+        event = dict(data, job_id=self.id, type=event_type, state=self.state, epochs=self.epochs,
+                     epochs_finished=self.epochs_finished, time=time.time())
+        with self._condition:
+            event['sequence'] = self._num_of_events
+            self._num_of_events += 1
+            self._events.append(event)
+            self._condition.notify_all()
+        if self.listener is not None:
+            self.listener(event)
+
+    def events(self, timeout=None):
+        """
+        Yields the job's events from the first one kept until the job is done
+
+        Events are dicts with the job_id, type, state, epochs, epochs_finished,
+        time and an increasing sequence number. The types are
+            state
+                The job changed state
+            batch
+                Progress during an epoch, at most once per `progress_interval`,
+                with the epoch, batch, error and samples_per_second
+            epoch
+                An epoch finished, with its error and samples_per_second
+
+        Only the last `max_events` events are kept, a slow reader skips
+        the ones that were dropped before it got to them.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Stops if no event comes for this many seconds, by default it waits for as long as the job lasts
+
+        Examples
+        --------
+        >>> for event in scheduler.jobs[job_id].events():
+        ...     print(event['type'], event['epochs_finished'])
+        """
+        next_sequence = 0
+        while True:
+            with self._condition:
+                if self._num_of_events == next_sequence and not self.done:
+                    self._condition.wait(timeout)
+                new_events = [event for event in self._events if event['sequence'] >= next_sequence]
+                done = self.done
+
+            if not new_events and (done or timeout is not None):
+                return
+            for event in new_events:
+                next_sequence = event['sequence'] + 1
+                yield event
+
+    def status(self) -> dict:
+        """
+        Gets the job's progress
+
+        Returns
+        -------
+        status : dict
+            id, state, epochs, epochs_finished, error (the last epoch's mean error per sample)
+            and failure, the error a failed job raised
+        """
+        return {
+            'id': self.id,
+            'state': self.state,
+            'epochs': self.epochs,
+            'epochs_finished': self.epochs_finished,
+            'error': self.last_error,
+            'failure': None if self.error is None else repr(self.error),
+        }
+
+
+class _JobControl(Callback):
+    def __init__(self, job, scheduler):
+        """Stops a job's training when it's paused, cancelled or its time slice is up, and reports its epochs"""
+        self.job = job
+        self.scheduler = scheduler
+        self.stopped_training = False
+
+    def on_batch_end(self, network, logs):
+        if self.job._stop_request in ('pause', 'cancel'):
+            network.stop_training = True
+            self.stopped_training = True
+
+    def on_epoch_end(self, network, logs):
+        if network.stop_training:
+            return
+
+        job = self.job
+        job.epochs_finished += 1
+        job.last_error = logs['error']
+        job._emit('epoch', epoch=job.epochs_finished - 1, error=logs['error'],
+                  samples_per_second=logs['samples_per_second'])
+
+        # Jobs only give up their slot between epochs, so no work is thrown away
+        time_slice = self.scheduler.time_slice
+        if (time_slice is not None and time.perf_counter() - job.slice_start_time >= time_slice
+                and job.epochs_finished < job.epochs and self.scheduler.num_of_queued_jobs):
+            job._stop_request = 'preempt'
+            network.stop_training = True
+
+
+class TrainingScheduler:
+    def __init__(self, max_concurrent_jobs=2, cpu_budget=None, time_slice=None, progress_interval=0.5,
+                 max_events=1000):
+        """
+        Runs many networks' training on a pool of worker threads
+
+        Jobs are started in the order they were submitted, as long as fewer than
+        `max_concurrent_jobs` are running and the `cpus` of the running jobs
+        fit in the `cpu_budget`. numpy releases the GIL in its matrix multiplies
+        so the jobs train in parallel, and the caller's thread is never blocked.
+
+        Each job should only use the cores it asks for, so limit numpy's BLAS
+        threads, such as with `OMP_NUM_THREADS=1`, when jobs ask for one cpu.
+
+        Parameters
+        ----------
+        max_concurrent_jobs : int
+            How many worker threads there are
+
+        cpu_budget : int, optional
+            How many cores the running jobs can use between them, defaults to all of them
+
+        time_slice : float, optional
+            When jobs are waiting, a running job gives up its worker after
+            training for this many seconds, at the end of an epoch, and goes to
+            the back of the queue. By default jobs run until they are done
+
+        progress_interval : float
+            The fewest seconds between a job's batch events
+
+        max_events : int
+            How many of its latest events each job keeps, see `TrainingJob.events`
+
+        Methods
+        ------
+        submit(network, inputs, labels, epochs=None, ...)
+            Queues a network to be trained, returning the job's id
+
+        pause(job_id)
+            Stops a job after its current batch, keeping its place in training
+
+        resume(job_id)
+            Queues a paused job again
+
+        cancel(job_id)
+            Stops a job for good
+
+        status(job_id)
+            Gets a job's progress
+
+        wait(job_id, timeout=None)
+            Blocks until a job is done
+
+        shutdown
+            Cancels every job and stops the workers
+
+        Examples
+        --------
+        >>> scheduler = TrainingScheduler(max_concurrent_jobs=4, cpu_budget=8)
+        >>> job_id = scheduler.submit(network, inputs, labels, epochs=50, batch_size=64)
+        >>> scheduler.pause(job_id)
+        >>> scheduler.resume(job_id)
+        >>> for event in scheduler.jobs[job_id].events():
+        ...     print(event)
+        """
+        if max_concurrent_jobs < 1:
+            raise ValueError(f'The scheduler needs at least one worker, got max_concurrent_jobs={max_concurrent_jobs}')
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.cpu_budget = cpu_budget or os.cpu_count() or 1
+        self.time_slice = time_slice
+        self.progress_interval = progress_interval
+        self.max_events = max_events
+
+        self.jobs = {}
+        self._queue = deque()
+        self._running_cpus = 0
+        self._job_ids = itertools.count(1)
+        self._is_shut_down = False
+        self._condition = threading.Condition()
+
+        self._workers = [threading.Thread(target=self._work, name=f'TrainingWorker-{index}', daemon=True)
+                         for index in range(max_concurrent_jobs)]
+        for worker in self._workers:
+            worker.start()
+
+    @property
+    def num_of_queued_jobs(self) -> int:
+        return len(self._queue)
+
+    @property
+    def num_of_running_jobs(self) -> int:
+        with self._condition:
+            return sum(job.state == 'running' for job in self.jobs.values())
+
+    def submit(self, network, inputs, labels, epochs=None, batch_size=32, cpus=1, callbacks=None, listener=None,
+               **train_settings) -> str:
+        """
+        Queues a network to be trained
+
+        Parameters
+        ----------
+        network : Network
+            The network to train, don't change it until the job is done or paused
+
+        inputs, labels : array_like
+            The data set, see `Network.train`
+
+        epochs : int, optional
+            How many epochs to train for, defaults to the network's `num_of_epochs`
+
+        batch_size : int
+            See `Network.train`
+
+        cpus : int
+            How many cores of the `cpu_budget` the job takes up while it runs
+
+        callbacks : list, optional
+            Extra `Callback`s for the training, they are run on a worker thread
+
+        listener : callable, optional
+            Called with each of the job's events, on a worker thread for the
+            events made during training, see `TrainingJob.events`
+
+        train_settings
+            Passed on to `Network.train`, such as shuffle, prefetch or augment
+
+        Returns
+        -------
+        job_id : str
+        """
+        if not 1 <= cpus <= self.cpu_budget:
+            raise ValueError(f'A job needs between 1 and {self.cpu_budget} cpus, got {cpus}')
+        with self._condition:
+            if self._is_shut_down:
+                raise ValueError('Jobs can not be submitted after the scheduler has shut down')
+            job_id = str(next(self._job_ids))
+            job = TrainingJob(job_id, network, inputs, labels, network.num_of_epochs if epochs is None else epochs,
+                              cpus, list(callbacks or []), listener, dict(train_settings, batch_size=batch_size),
+                              self.max_events)
+            self.jobs[job_id] = job
+            self._queue.append(job)
+            self._condition.notify_all()
+        job._emit('state')
+        return job_id
+
+    def _get_job(self, job_id):
+        try:
+            return self.jobs[job_id]
+        except KeyError:
+            raise ValueError(f'There is no job with the id {job_id}') from None
+
+    def pause(self, job_id: str):
+        """
+        Pauses a job, a running job stops after its current batch
+
+        Parameters
+        ----------
+        job_id : str
+        """
+        job = self._get_job(job_id)
+        with self._condition:
+            if job.done:
+                raise ValueError(f'Job {job_id} is {job.state} so it can not be paused')
+            if job.state == 'running':
+                job._stop_request = 'pause'
+            if job.state != 'queued':
+                return
+            self._queue.remove(job)
+            job.state = 'paused'
+        job._emit('state')
+
+    def resume(self, job_id: str):
+        """
+        Queues a paused job again, it carries on from its last finished epoch
+
+        Parameters
+        ----------
+        job_id : str
+        """
+        job = self._get_job(job_id)
+        with self._condition:
+            if job.state == 'running' and job._stop_request == 'pause':
+                job._stop_request = None
+                return
+            if job.state != 'paused':
+                if job.state in ('queued', 'running'):
+                    return
+                raise ValueError(f'Job {job_id} is {job.state} so it can not be resumed')
+            job.state = 'queued'
+            self._queue.append(job)
+            self._condition.notify_all()
+        job._emit('state')
+
+    def cancel(self, job_id: str):
+        """
+        Cancels a job, a running job stops after its current batch
+
+        Parameters
+        ----------
+        job_id : str
+        """
+        job = self._get_job(job_id)
+        with self._condition:
+            if job.done:
+                return
+            if job.state == 'running':
+                job._stop_request = 'cancel'
+                return
+            if job.state == 'queued':
+                self._queue.remove(job)
+            job.state = 'cancelled'
+        job._emit('state')
+
+    def status(self, job_id: str) -> dict:
+        """See `TrainingJob.status`"""
+        return self._get_job(job_id).status()
+
+    def wait(self, job_id: str, timeout=None) -> bool:
+        """
+        Blocks until a job is done
+
+        Parameters
+        ----------
+        job_id : str
+
+        timeout : float, optional
+            The most seconds to wait
+
+        Returns
+        -------
+        done : bool
+            Whether the job finished, failed or was cancelled in time
+        """
+        job = self._get_job(job_id)
+        with job._condition:
+            return job._condition.wait_for(lambda: job.done, timeout)
+
+    def shutdown(self, wait=True):
+        """
+        Cancels every job that isn't done and stops the workers
+
+        Parameters
+        ----------
+        wait : bool
+            Waits for the running jobs to stop
+        """
+        with self._condition:
+            self._is_shut_down = True
+            job_ids = [job.id for job in self.jobs.values() if not job.done]
+        for job_id in job_ids:
+            self.cancel(job_id)
+        with self._condition:
+            self._condition.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def _next_job(self):
+        """Waits until the job at the front of the queue fits in the cpu budget and takes it, None once shut down"""
+        with self._condition:
+            while True:
+                if self._is_shut_down:
+                    return None
+                if self._queue and self._running_cpus + self._queue[0].cpus <= self.cpu_budget:
+                    job = self._queue.popleft()
+                    job.state = 'running'
+                    job._stop_request = None
+                    self._running_cpus += job.cpus
+                    return job
+                self._condition.wait()
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            job._emit('state')
+            try:
+                self._run(job)
+            finally:
+                with self._condition:
+                    self._running_cpus -= job.cpus
+                    self._condition.notify_all()
+            job._emit('state')
+
+    def _run(self, job):
+        """Trains a job for its remaining epochs, or until it's stopped, then works out its new state"""
+        progress = ThrottledProgress(lambda network, logs: job._emit(
+            'batch', epoch=job.epochs_finished, batch=logs['batch'], error=logs['error'],
+            samples_per_second=logs['samples_per_second']), self.progress_interval)
+        control = _JobControl(job, self)
+        job.slice_start_time = time.perf_counter()
+
+        try:
+            if job.epochs_finished < job.epochs:
+                job.network.train(job.inputs, job.labels, epochs=job.epochs - job.epochs_finished,
+                                  callbacks=job.callbacks + [progress, control], **job.train_settings)
+        except Exception as error:
+            with self._condition:
+                job.error = error
+                job.state = 'failed'
+            return
+
+        with self._condition:
+            if job._stop_request == 'cancel':
+                job.state = 'cancelled'
+            elif job._stop_request == 'pause' and job.epochs_finished < job.epochs:
+                job.state = 'paused'
+            elif job._stop_request == 'preempt' or (control.stopped_training and job.epochs_finished < job.epochs):
+                # A pause withdrawn by `resume` after training had already been told to stop queues the job again
+                job.state = 'queued'
+                self._queue.append(job)
+            else:
+                # Either every epoch is done or one of the job's callbacks stopped it early
+                job.state = 'finished'
+            job._stop_request = None
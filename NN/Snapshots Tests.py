@@ -0,0 +1,137 @@
+import unittest
+
+import numpy as np
+
+from Network import Network
+from Snapshots import SnapshotStream, SnapshotDecoder
+
+
+class SnapshotStreamTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.random_state = np.random.get_state()
+        np.random.seed(0)
+        self.layers = {
+            'layer1': {
+                'activation': 'relu',
+                'neurons': 40,
+            },
+            'layer2': {
+                'activation': 'softmax',
+                'neurons': 3,
+            }
+        }
+        self.network = Network(30, self.layers)
+        self.inputs = np.random.random_sample((64, 30))
+        self.labels = np.eye(3)[np.random.randint(0, 3, 64)]
+
+    def tearDown(self) -> None:
+        np.random.set_state(self.random_state)
+
+    def assert_decoded(self, decoder, atol=1e-6):
+        for layer_index, layer in enumerate(self.network.layers):
+            weights, biases = decoder.weights_and_biases(layer_index)
+            np.testing.assert_allclose(weights, layer.weights, atol=atol, rtol=0)
+            np.testing.assert_allclose(biases, layer.biases, atol=atol, rtol=0)
+
+    def test_version(self):
+        print("\nNetwork Version Test:")
+        version = self.network.version
+        self.network.train(self.inputs, self.labels, batch_size=16, epochs=1)
+        self.assertEqual(self.network.version, version + 4)
+
+        self.network.resize_layer(0, 41)
+        self.assertEqual(self.network.version, version + 5)
+
+    def test_full_then_deltas(self):
+        print("\nSnapshot Deltas Test:")
+        stream = SnapshotStream(self.network, max_rate=None, quantize=False)
+        subscriber_id = stream.subscribe()
+        decoder = SnapshotDecoder()
+
+        full_snapshot = stream.snapshot(subscriber_id)
+        decoder.apply(full_snapshot)
+        self.assert_decoded(decoder)
+        self.assertIsNone(stream.snapshot(subscriber_id))
+
+        # Only the changed weights of the output layer are sent
+        self.network.layers[1].weights[0, :5] += 1
+        self.network.version += 1
+        delta_snapshot = stream.snapshot(subscriber_id)
+        self.assertLess(len(delta_snapshot), len(full_snapshot) // 20)
+        decoder.apply(delta_snapshot)
+        self.assert_decoded(decoder)
+        self.assertEqual(decoder.version, self.network.version)
+
+    def test_quantized_deltas_catch_up(self):
+        print("\nQuantized Snapshot Test:")
+        stream = SnapshotStream(self.network, max_rate=None)
+        subscriber_id = stream.subscribe()
+        decoder = SnapshotDecoder()
+        full_snapshot = stream.snapshot(subscriber_id)
+        decoder.apply(full_snapshot)
+
+        for _ in range(3):
+            self.network.train(self.inputs, self.labels, batch_size=16, epochs=1)
+            delta_snapshot = stream.snapshot(subscriber_id)
+            # Training changes nearly every weight, so they are sent as one int8 step each
+            self.assertLess(len(delta_snapshot), len(full_snapshot) // 3)
+            decoder.apply(delta_snapshot)
+        largest_change = max(np.max(np.abs(layer.weights)) for layer in self.network.layers)
+        self.assert_decoded(decoder, atol=largest_change / 100)
+
+        # With nothing new to send, the rounded off changes are sent until the client has caught up
+        for _ in range(20):
+            self.network.version += 1
+            decoder.apply(stream.snapshot(subscriber_id))
+        self.assert_decoded(decoder, atol=1e-6)
+
+    def test_selection_and_rate_limit(self):
+        print("\nSnapshot Selection Test:")
+        stream = SnapshotStream(self.network, max_rate=1)
+        subscriber_id = stream.subscribe([(0, 7)])
+        decoder = SnapshotDecoder()
+
+        self.assertEqual(decoder.apply(stream.snapshot(subscriber_id)), [(0, 7)])
+        weights, bias = decoder.weights_and_biases(0, 7)
+        np.testing.assert_allclose(weights, self.network.layers[0].weights[7], rtol=1e-6)
+        self.assertAlmostEqual(float(bias), self.network.layers[0].biases[7])
+
+        self.network.version += 1
+        self.assertIsNone(stream.snapshot(subscriber_id))
+        self.assertIsNotNone(stream.snapshot(subscriber_id, force=True))
+
+        with self.assertRaises(ValueError):
+            stream.subscribe([(0, 40)])
+
+    def test_missed_snapshot(self):
+        print("\nMissed Snapshot Test:")
+        stream = SnapshotStream(self.network, max_rate=None)
+        subscriber_id = stream.subscribe()
+        decoder = SnapshotDecoder()
+        decoder.apply(stream.snapshot(subscriber_id))
+
+        self.network.train(self.inputs, self.labels, epochs=1)
+        stream.snapshot(subscriber_id)
+        self.network.train(self.inputs, self.labels, epochs=1)
+        with self.assertRaises(ValueError):
+            decoder.apply(stream.snapshot(subscriber_id))
+
+        stream.resync(subscriber_id)
+        decoder.apply(stream.snapshot(subscriber_id))
+        self.assert_decoded(decoder, atol=1e-6)
+
+    def test_layer_resized(self):
+        print("\nSnapshot Resize Test:")
+        stream = SnapshotStream(self.network, max_rate=None)
+        subscriber_id = stream.subscribe()
+        decoder = SnapshotDecoder()
+        decoder.apply(stream.snapshot(subscriber_id))
+
+        self.network.resize_layer(0, 45)
+        decoder.apply(stream.snapshot(subscriber_id))
+        self.assertEqual(decoder.values[0, None].shape, (45, 31))
+        self.assert_decoded(decoder, atol=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
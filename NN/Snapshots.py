@@ -0,0 +1,335 @@
+"""
+Streams a training network's weights to visualisation clients as compact binary snapshots
+
+A snapshot is a header followed by one block for each selected layer or neuron.
+Everything is little-endian:
+
+    header: magic b'PNNS', format version (uint8), network version (uint64),
+            base version (uint64), number of blocks (uint16)
+    block:  layer (uint16), neuron (int32, -1 for the whole layer), rows (uint32),
+            columns (uint32), encoding (uint8), then the encoding's payload
+
+A block's values are a (rows, columns) float32 array, the weights with the
+biases as an extra last column. The encodings are
+    FULL        every value as float32
+    DELTA       count (uint32), the flat indexes (uint32) of the changed values,
+                then what to add to each of them (float32)
+    INT8_DELTA  count (uint32) and scale (float32), the flat indexes (uint32),
+                then what to add to each of them as int8 multiples of the scale
+    INT8_DENSE  scale (float32), then what to add to every value as int8
+                multiples of the scale, used when most of the values changed
+
+Delta blocks are relative to the snapshot with the base version.
+"""
+import struct
+import threading
+import time
+
+import numpy as np
+
+FORMAT_VERSION = 1
+MAGIC = b'PNNS'
+FULL, DELTA, INT8_DELTA, INT8_DENSE = 0, 1, 2, 3
+
+_HEADER = struct.Struct('<4sBQQH')
+_BLOCK = struct.Struct('<HiIIB')
+_COUNT = struct.Struct('<I')
+_COUNT_AND_SCALE = struct.Struct('<If')
+_SCALE = struct.Struct('<f')
+
+
+def _block_values(network, layer_index, neuron_index):
+    """A layer's or one neuron's weights with the biases as the last column, as float32"""
+    layer = network.layers[layer_index]
+    if neuron_index is None:
+        return np.concatenate([layer.weights, layer.biases[:, None]], axis=1).astype(np.float32)
+    return np.append(layer.weights[neuron_index], layer.biases[neuron_index]).astype(np.float32)[None]
+
+
+class _Subscriber:
+    def __init__(self, selection):
+        """What one client has been sent, so it only needs what changed since"""
+        self.selection = selection
+        self.version = 0
+        self.values = {}
+        self.last_send_time = None
+
+
+class SnapshotStream:
+    def __init__(self, network, max_rate=10.0, quantize=True, tolerance=0.0):
+        """
+        Makes binary snapshots of a network's weights for any number of subscribers
+
+        Each subscriber is sent everything it selected once, then only the
+        values that changed since its last snapshot. Quantized deltas are int8
+        steps of one scale per block, what they round off is kept track of
+        and sent later, so a client's copy never drifts away from the network.
+
+        The network can be training on another thread, a snapshot then holds
+        weights from part way through a batch but the next one catches up.
+
+        Parameters
+        ----------
+        network : Network
+            The network to follow, its `version` tells when it has changed
+
+        max_rate : float, optional
+            The most snapshots a second for each subscriber, None for no limit
+
+        quantize : bool
+            Sends changes as int8 steps instead of float32, which is up to 4 times smaller
+
+        tolerance : float
+            Changes no bigger than this are held back until they add up to more
+
+        Methods
+        ------
+        subscribe(selection=None)
+            Adds a subscriber, returning its id
+
+        snapshot(subscriber_id, force=False)
+            Makes the subscriber's next snapshot
+
+        resync(subscriber_id)
+            Sends the subscriber everything again in its next snapshot
+
+        unsubscribe(subscriber_id)
+            Forgets a subscriber
+
+        Examples
+        --------
+        >>> stream = SnapshotStream(network, max_rate=5)
+        >>> subscriber_id = stream.subscribe([(1, 3)])
+        >>> data = stream.snapshot(subscriber_id)
+        >>> if data is not None:
+        ...     socketio.emit('neuron snapshot', data, to=sid)
+        """
+        self.network = network
+        self.max_rate = max_rate
+        self.quantize = quantize
+        self.tolerance = tolerance
+        self.subscribers = {}
+        self._next_subscriber_id = 1
+        self._lock = threading.Lock()
+
+    def subscribe(self, selection=None) -> int:
+        """
+        Adds a subscriber
+
+        Parameters
+        ----------
+        selection : list, optional
+            Layer indexes for whole layers and (layer, neuron) pairs for single
+            neurons, defaults to every layer with weights
+
+        Returns
+        -------
+        subscriber_id : int
+        """
+        if selection is None:
+            selection = [index for index, layer in enumerate(self.network.layers) if layer.weights is not None]
+        blocks = []
+        for item in selection:
+            layer_index, neuron_index = item if isinstance(item, tuple) else (item, None)
+            if not 0 <= layer_index < len(self.network.layers):
+                raise ValueError(f'The network has no layer {layer_index}')
+            if self.network.layers[layer_index].weights is None:
+                raise ValueError(f'Layer {layer_index} has no weights to send')
+            if neuron_index is not None and not 0 <= neuron_index < len(self.network.layers[layer_index]):
+                raise ValueError(f'Layer {layer_index} has no neuron {neuron_index}')
+            blocks.append((layer_index, neuron_index))
+
+        with self._lock:
+            subscriber_id = self._next_subscriber_id
+            self._next_subscriber_id += 1
+            self.subscribers[subscriber_id] = _Subscriber(blocks)
+        return subscriber_id
+
+    def unsubscribe(self, subscriber_id: int):
+        with self._lock:
+            self.subscribers.pop(subscriber_id, None)
+
+    def resync(self, subscriber_id: int):
+        """Makes the subscriber's next snapshot hold every value, such as when a client has lost its copy"""
+        with self._lock:
+            subscriber = self._get_subscriber(subscriber_id)
+            subscriber.values = {}
+            subscriber.version = 0
+
+    def _get_subscriber(self, subscriber_id):
+        try:
+            return self.subscribers[subscriber_id]
+        except KeyError:
+            raise ValueError(f'There is no subscriber with the id {subscriber_id}') from None
+
+    def snapshot(self, subscriber_id: int, force=False):
+        """
+        Makes the subscriber's next snapshot
+
+        Parameters
+        ----------
+        subscriber_id : int
+
+        force : bool
+            Ignores the rate limit
+
+        Returns
+        -------
+        data : bytes
+            The snapshot, None if the network hasn't changed since the last
+            one or the rate limit doesn't allow another yet
+        """
+        with self._lock:
+            subscriber = self._get_subscriber(subscriber_id)
+            version = self.network.version
+            now = time.perf_counter()
+            if subscriber.values and version == subscriber.version:
+                return None
+            if (not force and self.max_rate and subscriber.last_send_time is not None
+                    and now - subscriber.last_send_time < 1 / self.max_rate):
+                return None
+
+            chunks = [_HEADER.pack(MAGIC, FORMAT_VERSION, version, subscriber.version, len(subscriber.selection))]
+            for layer_index, neuron_index in subscriber.selection:
+                if layer_index >= len(self.network.layers) or (
+                        neuron_index is not None and neuron_index >= len(self.network.layers[layer_index])):
+                    raise ValueError(f'The selected layer {layer_index} neuron {neuron_index} has been removed '
+                                     f'from the network')
+                values = _block_values(self.network, layer_index, neuron_index)
+                chunks.extend(self._encode_block(subscriber, layer_index, neuron_index, values))
+
+            subscriber.version = version
+            subscriber.last_send_time = now
+        return b''.join(chunks)
+
+    def _encode_block(self, subscriber, layer_index, neuron_index, values):
+        """Encodes one block, updating the subscriber's copy to what the client will have once it's applied"""
+        key = layer_index, neuron_index
+        rows, columns = values.shape
+        sent_values = subscriber.values.get(key)
+
+        neuron = -1 if neuron_index is None else neuron_index
+        differences = None if sent_values is None or sent_values.shape != values.shape else (values - sent_values).ravel()
+        if differences is not None:
+            differences[np.abs(differences) <= self.tolerance] = 0
+            indexes = np.flatnonzero(differences).astype(np.uint32)
+
+        # A sparse delta costs an index for every change, so when too much has changed the block is sent whole
+        if differences is None or (not self.quantize and 2 * len(indexes) >= values.size):
+            subscriber.values[key] = values
+            return [_BLOCK.pack(layer_index, neuron, rows, columns, FULL), values.tobytes()]
+
+        flat_sent_values = sent_values.reshape(-1)
+        if not self.quantize:
+            differences = differences[indexes]
+            flat_sent_values[indexes] += differences
+            return [_BLOCK.pack(layer_index, neuron, rows, columns, DELTA),
+                    _COUNT.pack(len(indexes)), indexes.tobytes(), differences.tobytes()]
+
+        largest_difference = np.max(np.abs(differences)) if len(indexes) else 0
+        scale = np.float32(largest_difference / 127) if largest_difference else np.float32(1)
+        # Changes that round to no steps are left for later snapshots
+        steps = np.rint(differences / scale).astype(np.int8)
+        indexes = np.flatnonzero(steps).astype(np.uint32)
+
+        if 5 * len(indexes) >= values.size:
+            flat_sent_values += steps * scale
+            return [_BLOCK.pack(layer_index, neuron, rows, columns, INT8_DENSE), _SCALE.pack(scale), steps.tobytes()]
+
+        steps = steps[indexes]
+        flat_sent_values[indexes] += steps * scale
+        return [_BLOCK.pack(layer_index, neuron, rows, columns, INT8_DELTA),
+                _COUNT_AND_SCALE.pack(len(indexes), scale), indexes.tobytes(), steps.tobytes()]
+
+
+class SnapshotDecoder:
+    def __init__(self):
+        """
+        Rebuilds the values a `SnapshotStream` subscriber has been sent, the Python client for the format
+
+        Attributes
+        ----------
+        version : int
+            The network version of the last snapshot applied
+
+        values : dict
+            Maps (layer, neuron) to each block's (rows, columns) float32
+            values, neuron is None for a whole layer
+
+        Examples
+        --------
+        >>> decoder = SnapshotDecoder()
+        >>> decoder.apply(stream.snapshot(subscriber_id))
+        >>> weights, biases = decoder.weights_and_biases(1, 3)
+        """
+        self.version = 0
+        self.values = {}
+
+    def apply(self, data: bytes) -> list:
+        """
+        Applies a snapshot
+
+        Parameters
+        ----------
+        data : bytes
+
+        Returns
+        -------
+        keys : list
+            The (layer, neuron) keys of the blocks in the snapshot
+        """
+        magic, format_version, version, base_version, num_of_blocks = _HEADER.unpack_from(data)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError('The data is not a snapshot this decoder can read')
+        offset = _HEADER.size
+
+        keys = []
+        for _ in range(num_of_blocks):
+            layer_index, neuron_index, rows, columns, encoding = _BLOCK.unpack_from(data, offset)
+            offset += _BLOCK.size
+            key = layer_index, None if neuron_index == -1 else neuron_index
+            keys.append(key)
+
+            if encoding == FULL:
+                size = rows * columns
+                self.values[key] = np.frombuffer(data, np.float32, size, offset).reshape(rows, columns).copy()
+                offset += 4 * size
+                continue
+
+            if base_version != self.version or key not in self.values:
+                raise ValueError(f'The snapshot is based on version {base_version} but version {self.version} '
+                                 f'was applied last, the stream needs resyncing')
+            flat_values = self.values[key].reshape(-1)
+            if encoding == INT8_DENSE:
+                scale, = _SCALE.unpack_from(data, offset)
+                offset += _SCALE.size
+                flat_values += np.frombuffer(data, np.int8, flat_values.size, offset) * np.float32(scale)
+                offset += flat_values.size
+                continue
+
+            if encoding == DELTA:
+                count, = _COUNT.unpack_from(data, offset)
+                offset += _COUNT.size
+                differences_dtype, scale = np.float32, None
+            else:
+                count, scale = _COUNT_AND_SCALE.unpack_from(data, offset)
+                offset += _COUNT_AND_SCALE.size
+                differences_dtype = np.int8
+
+            indexes = np.frombuffer(data, np.uint32, count, offset)
+            offset += 4 * count
+            differences = np.frombuffer(data, differences_dtype, count, offset)
+            offset += differences.itemsize * count
+            if scale is not None:
+                differences = differences * np.float32(scale)
+            flat_values[indexes] += differences
+
+        self.version = version
+        return keys
+
+    def weights_and_biases(self, layer_index, neuron_index=None):
+        """Splits a block's values into its weights and biases"""
+        values = self.values[layer_index, neuron_index]
+        if neuron_index is None:
+            return values[:, :-1], values[:, -1]
+        return values[0, :-1], values[0, -1]
@@ -0,0 +1,77 @@
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from Sweep import grid_search, random_search, halving_rungs, run_sweep, format_results
+
+
+class SearchTesting(unittest.TestCase):
+    def test_grid_search(self):
+        print("\nGrid Search Test:")
+        configs = grid_search({'learning_rate': [0.1, 1.0], 'batch_size': [16, 32, 64]})
+
+        self.assertEqual(len(configs), 6)
+        self.assertIn({'learning_rate': 1.0, 'batch_size': 16}, configs)
+
+    def test_random_search(self):
+        print("\nRandom Search Test:")
+        space = {'batch_size': [16, 32], 'learning_rate': lambda random: 10 ** random.uniform(-3, 0)}
+        configs = random_search(space, 5, seed=3)
+
+        self.assertEqual(len(configs), 5)
+        self.assertEqual(configs, random_search(space, 5, seed=3))
+        for config in configs:
+            self.assertIn(config['batch_size'], [16, 32])
+            self.assertTrue(0.001 <= config['learning_rate'] <= 1)
+
+    def test_halving_rungs(self):
+        print("\nHalving Rungs Test:")
+        self.assertEqual(halving_rungs(1, 9, 3), [1, 3, 9])
+        self.assertEqual(halving_rungs(1, 10, 3), [1, 3, 9, 10])
+        self.assertEqual(halving_rungs(4, 4, 2), [4])
+
+
+class RunSweepTesting(unittest.TestCase):
+    def setUp(self) -> None:
+        random = np.random.RandomState(0)
+        self.inputs = random.random_sample((120, 4))
+        self.labels = np.eye(2)[(self.inputs[:, 0] > self.inputs[:, 1]).astype(int)]
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_successive_halving(self):
+        print("\nSuccessive Halving Test:")
+        layers = {'layer1': {'activation': 'relu', 'neurons': 8}}
+        configs = grid_search({'layers': [layers], 'learning_rate': [0.0001, 0.01, 0.5], 'batch_size': [8, 32]})
+        results_path = os.path.join(self.directory, 'results.csv')
+
+        results = run_sweep(configs, self.inputs[:90], self.labels[:90], self.inputs[90:], self.labels[90:],
+                            max_epochs=4, min_epochs=1, reduction_factor=2, cores=2,
+                            directory=self.directory, results_path=results_path, verbose=False)
+        print(format_results(results))
+
+        self.assertEqual(len(results), 6)
+        self.assertEqual([trial_results['rank'] for trial_results in results], list(range(1, 7)))
+        # 6 trials are cut to 3 after 1 epoch, then to 2 after 2 epochs, which both reach 4 epochs
+        self.assertEqual(sorted(trial_results['epochs'] for trial_results in results), [1, 1, 1, 2, 4, 4])
+        self.assertEqual(results[0]['epochs'], 4)
+
+        with open(results_path) as results_file:
+            rows = list(csv.DictReader(results_file))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(int(rows[0]['trial']), results[0]['trial'])
+
+    def test_no_configs(self):
+        print("\nNo Configs Test:")
+        with self.assertRaises(ValueError):
+            run_sweep([], self.inputs, self.labels, self.inputs, self.labels)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,314 @@
+"""
+Searches over layer layouts and training settings, training the trials on
+a pool of processes and stopping poor ones early with successive halving
+
+Each trial is a config dict, any key that's left out uses `DEFAULT_CONFIG`:
+    {
+        'layers': {'layer1': {'activation': 'relu', 'neurons': 64}},
+        'activation': 'sigmoid',    # optional, replaces every hidden layer's activation
+        'learning_rate': 0.1,
+        'batch_size': 32,
+        'optimizer': 'sgd',
+    }
+
+Examples
+--------
+>>> configs = grid_search({'layers': [small_layers, big_layers], 'learning_rate': [0.01, 0.1, 1.0]})
+>>> results = run_sweep(configs, inputs, labels, test_inputs, test_labels, max_epochs=9, cores=8)
+>>> print(format_results(results))
+"""
+import csv
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from Execution import BLAS_THREAD_VARIABLES
+from Network import Network
+from Optimizers import get_optimizer
+
+DEFAULT_CONFIG = {
+    'layers': {'layer1': {'activation': 'sigmoid', 'neurons': 32}},
+    'activation': None,
+    'learning_rate': 0.1,
+    'batch_size': 32,
+    'optimizer': 'sgd',
+}
+
+RESULT_FIELDS = ('rank', 'trial', 'loss', 'accuracy', 'epochs', 'train_time',
+                 'learning_rate', 'batch_size', 'optimizer', 'layers')
+
+_worker = {}
+
+
+def grid_search(space: dict) -> list:
+    """
+    Makes a config for every combination of the values
+
+    Parameters
+    ----------
+    space : dict
+        Maps each config key to a list of values to try
+
+    Returns
+    -------
+    configs : list
+    """
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[key] for key in keys))]
+
+
+def random_search(space: dict, num_of_trials: int, seed=0) -> list:
+    """
+    Makes configs with randomly picked values
+
+    Parameters
+    ----------
+    space : dict
+        Maps each config key to a list of values to pick from, or to a
+        function that takes a `np.random.RandomState` and returns a value,
+        such as `lambda random: 10 ** random.uniform(-3, 0)` for a learning rate
+
+    num_of_trials : int
+        How many configs to make
+
+    seed : int
+        Seeds the picks
+
+    Returns
+    -------
+    configs : list
+    """
+    random = np.random.RandomState(seed)
+    configs = []
+    for _ in range(num_of_trials):
+        config = {}
+        for key, values in space.items():
+            config[key] = values(random) if callable(values) else values[random.randint(len(values))]
+        configs.append(config)
+    return configs
+
+
+def halving_rungs(min_epochs: int, max_epochs: int, reduction_factor=3) -> list:
+    """
+    The epochs trials are trained to before each cut
+
+    Starts at `min_epochs` and grows by `reduction_factor` each rung up to `max_epochs`
+
+    Returns
+    -------
+    rungs : list
+    """
+    rungs = []
+    epochs = min_epochs
+    while epochs < max_epochs:
+        rungs.append(epochs)
+        epochs *= reduction_factor
+    return rungs + [max_epochs]
+
+
+def _build_network(config, num_of_inputs, num_of_outputs, output_activation, dtype):
+    layers = {}
+    for name, layer in config['layers'].items():
+        layers[name] = dict(layer, activation=config['activation'] or layer.get('activation'))
+
+    network = Network(num_of_inputs, layers, dtype)
+    network.add_layer(num_of_outputs, output_activation)
+    network.optimizer = get_optimizer(config['optimizer'], learning_rate=config['learning_rate'])
+    return network
+
+
+def _dataset_path(array, directory, name):
+    """Finds the `.npy` file a memory-mapped array came from, or saves the array to one"""
+    filename = getattr(array, 'filename', None)
+    if filename and filename.endswith('.npy') and np.load(filename, mmap_mode='r').shape == array.shape:
+        return filename
+    path = os.path.join(directory, f'{name}.npy')
+    np.save(path, np.asarray(array))
+    return path
+
+
+def _initialise_worker(dataset_paths, output_activation, dtype):
+    """Memory maps the data set in a worker, every worker shares the same pages"""
+    for name, path in dataset_paths.items():
+        _worker[name] = np.load(path, mmap_mode='r')
+    _worker['output_activation'] = output_activation
+    _worker['dtype'] = dtype
+
+
+def _train_trial(trial_index, config, start_epoch, end_epoch, checkpoint_path, seed):
+    """Trains one trial from `start_epoch` up to `end_epoch` then scores it on the validation set"""
+    start_time = time.perf_counter()
+    inputs, labels = _worker['inputs'], _worker['labels']
+
+    np.random.seed([seed, start_epoch])
+    if start_epoch == 0:
+        network = _build_network(config, inputs.shape[1], labels.shape[1], _worker['output_activation'],
+                                 _worker['dtype'])
+    else:
+        network = Network.load(checkpoint_path)
+
+    network.train(inputs, labels, batch_size=config['batch_size'], epochs=end_epoch - start_epoch)
+    network.save(checkpoint_path)
+
+    results = network.evaluate(_worker['validation_inputs'], _worker['validation_labels'])
+    return {
+        'trial': trial_index,
+        'loss': results['loss'],
+        'accuracy': results['accuracy'],
+        'epochs': end_epoch,
+        'train_time': time.perf_counter() - start_time,
+    }
+
+
+def run_sweep(configs, inputs, labels, validation_inputs, validation_labels, max_epochs=9, min_epochs=1,
+              reduction_factor=3, cores=None, threads_per_worker=1, output_activation='softmax',
+              dtype=np.float64, directory=None, results_path=None, seed=0, verbose=True) -> list:
+    """
+    Trains every config with successive halving on a pool of processes
+
+    All the trials are trained for `min_epochs` and scored on the validation
+    set, then the best `1 / reduction_factor` of them carry on for
+    `reduction_factor` times as many epochs, and so on until `max_epochs`.
+    Trials carry on from a checkpoint, so no training is repeated.
+
+    The data sets are memory mapped from `.npy` files by every worker, so
+    they are only held in memory once. Memory maps from `load_mnist` are
+    used as they are, other arrays are saved into `directory` first.
+
+    Parameters
+    ----------
+    configs : list
+        The trials, see `grid_search` and `random_search`
+
+    inputs, labels : array_like
+        The training data, labels are one-hot
+
+    validation_inputs, validation_labels : array_like
+        The data the trials are scored on, labels are one-hot
+
+    max_epochs : int
+        How many epochs the best trials are trained for
+
+    min_epochs : int
+        How many epochs every trial is trained for
+
+    reduction_factor : int
+        The fraction of trials kept at each rung is 1 / reduction_factor
+
+    cores : int, optional
+        How many cores the sweep may use, defaults to all of them
+
+    threads_per_worker : int
+        The BLAS threads each worker uses, there are `cores // threads_per_worker` workers
+
+    output_activation : str
+        The activation of the output layer, which is sized to the labels
+
+    dtype : np.dtype
+        The float type of the networks
+
+    directory : str, optional
+        Where the checkpoints and saved data sets go, defaults to a new temporary directory
+
+    results_path : str, optional
+        Writes the ranked results to this CSV file
+
+    seed : int
+        Trial `i` is seeded with `seed + i`
+
+    verbose : bool
+        Prints each rung's results
+
+    Returns
+    -------
+    results : list
+        One dict per trial, best first, see `RESULT_FIELDS`. Trials that
+        reached more epochs rank above ones that were cut, then lower loss ranks higher
+    """
+    if not configs:
+        raise ValueError('The sweep needs at least one config')
+    directory = directory or tempfile.mkdtemp(prefix='sweep')
+    os.makedirs(directory, exist_ok=True)
+    configs = [dict(DEFAULT_CONFIG, **config) for config in configs]
+
+    dataset_paths = {name: _dataset_path(array, directory, name) for name, array in (
+        ('inputs', inputs), ('labels', labels),
+        ('validation_inputs', validation_inputs), ('validation_labels', validation_labels))}
+
+    cores = cores or os.cpu_count() or 1
+    num_of_workers = max(min(cores // threads_per_worker, len(configs)), 1)
+
+    # Spawned workers read the thread limits when they import numpy, forked ones would inherit the parent's BLAS
+    previous_variables = {name: os.environ.get(name) for name in BLAS_THREAD_VARIABLES}
+    os.environ.update({name: str(threads_per_worker) for name in BLAS_THREAD_VARIABLES})
+    try:
+        context = multiprocessing.get_context('spawn')
+        pool = context.Pool(num_of_workers, _initialise_worker, (dataset_paths, output_activation, np.dtype(dtype)))
+    finally:
+        for name, value in previous_variables.items():
+            if value is None:
+                os.environ.pop(name)
+            else:
+                os.environ[name] = value
+
+    results = {}
+    survivors = list(range(len(configs)))
+    start_epoch = 0
+    with pool:
+        for end_epoch in halving_rungs(min_epochs, max_epochs, reduction_factor):
+            trials = [(index, configs[index], start_epoch, end_epoch,
+                       os.path.join(directory, f'trial{index}.pnn'), seed + index)
+                      for index in survivors]
+            for trial_results in pool.starmap(_train_trial, trials):
+                previous_time = results.get(trial_results['trial'], {}).get('train_time', 0)
+                trial_results['train_time'] += previous_time
+                results[trial_results['trial']] = trial_results
+
+            survivors.sort(key=lambda index: results[index]['loss'])
+            if verbose:
+                print(f'{end_epoch} epochs, best loss {results[survivors[0]]["loss"]:.4f} '
+                      f'from trial {survivors[0]} of {len(survivors)}')
+            survivors = survivors[:math.ceil(len(survivors) / reduction_factor)]
+            start_epoch = end_epoch
+
+    ranked_results = sorted(results.values(), key=lambda trial_results: (-trial_results['epochs'],
+                                                                         trial_results['loss']))
+    for rank, trial_results in enumerate(ranked_results):
+        config = configs[trial_results['trial']]
+        trial_results.update(rank=rank + 1, learning_rate=config['learning_rate'], batch_size=config['batch_size'],
+                             optimizer=config['optimizer'], layers=config['layers'])
+        if config['activation']:
+            trial_results['activation'] = config['activation']
+
+    if results_path:
+        write_results(ranked_results, results_path)
+    return ranked_results
+
+
+def write_results(results, path):
+    """Writes ranked results from `run_sweep` to a CSV file, the layers are written as json"""
+    with open(path, 'w', newline='') as results_file:
+        writer = csv.DictWriter(results_file, RESULT_FIELDS + ('activation',), extrasaction='ignore')
+        writer.writeheader()
+        for trial_results in results:
+            writer.writerow(dict(trial_results, layers=json.dumps(trial_results['layers'])))
+
+
+def format_results(results, limit=10) -> str:
+    """Formats the best ranked results from `run_sweep` as a table"""
+    lines = [f'{"rank":<6}{"trial":<7}{"loss":>9}{"accuracy":>10}{"epochs":>8}{"time (s)":>10}'
+             f'{"lr":>9}{"batch":>7}  layers']
+    for trial_results in results[:limit]:
+        layers = ', '.join(f'{layer["neurons"]} {trial_results.get("activation") or layer["activation"]}'
+                           if 'neurons' in layer else layer['type'] for layer in trial_results['layers'].values())
+        lines.append(f'{trial_results["rank"]:<6}{trial_results["trial"]:<7}{trial_results["loss"]:>9.4f}'
+                     f'{trial_results["accuracy"]:>10.4f}{trial_results["epochs"]:>8}'
+                     f'{trial_results["train_time"]:>10.2f}{trial_results["learning_rate"]:>9.3g}'
+                     f'{trial_results["batch_size"]:>7}  {layers}')
+    return '\n'.join(lines)
@@ -1,61 +1,38 @@
 import uuid
 import numpy as np
 from flask import Flask, render_template, request, make_response
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO
 from Network import Network
-from mlxtend.data import loadlocal_mnist
+from Dataset import load_mnist
+from Scheduler import TrainingScheduler
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'temp'
 socketio = SocketIO(app)
 cookie_name = 'PNNUserData'
+# Training runs on the scheduler's workers so the socket handlers return straight away
+scheduler = TrainingScheduler(max_concurrent_jobs=4, progress_interval=0.5)
 
 
-inputs, raw_labels = loadlocal_mnist(
+inputs, labels = load_mnist(
     images_path='NN/mnistDataset/train-images.idx3-ubyte',
     labels_path='NN/mnistDataset/train-labels.idx1-ubyte'
 )
 
-labels = np.zeros((len(raw_labels), 10))
-for raw_label, label in zip(raw_labels, labels):
-    label[raw_label - 1] = 1
-labels = labels.tolist()
-
 inputs = inputs[0:10]
 labels = labels[0:10]
 
 
-class Rememberable:
-    def __init__(self, source1, source2):
-        self.index = 0
-        self.source1, self.source2 = source1, source2
-        self.source = zip(source1, source2)
-
-    def __iter__(self):
-        return self
-
-    def __next__(self):
-        if self.index != len(self.source1):
-            item1 = self.source1[self.index]
-            item2 = self.source2[self.index]
-
-            output = (self.index, (item1, item2))
-            self.index += 1
-            return output
-        else:
-            self.index = 0
-            raise StopIteration
-
-
 class User:
     def __init__(self, inputs, layers):
         self.network = Network(len(inputs[0]), layers)
         self.layers = layers
-        self.data_set = Rememberable(inputs, labels)
         self.epoch = None
         self.play_pause_state = 'firstPlay'
         self.layer_index = None
         self.node_index = None
+        self.job_id = None
+        self.sid = None
 
     def switch_play_pause_state(self, new_state):
         self.play_pause_state = new_state
@@ -103,6 +80,12 @@ def set_pause_state():
     new_state = request.data.decode('utf-8')
     user = users[user_id]
     user.switch_play_pause_state(new_state)
+    if new_state == 'pause' and user.job_id is not None:
+        try:
+            scheduler.pause(user.job_id)
+        except ValueError:
+            # The job finished before it could be paused, so there's nothing to pause
+            pass
     return new_state
 
 
@@ -115,66 +98,68 @@ def start_training(data):
     print(f'Layers: {layers}')
 
     user = users[user_id]
+    user.sid = request.sid
     network = user.network
-    network.update_layers(len(inputs[0]), layers)
+    if user.job_id is not None:
+        scheduler.cancel(user.job_id)
+        scheduler.wait(user.job_id)
+
+    # Only the layers that changed lose what they have learnt
+    network.update_layers(len(inputs[0]), dict(layers, output={'activation': 'softmax', 'neurons': 10}))
     user.layers = layers
 
     user.epoch = 50
     network.learning_rate = 0.1
 
-    network.add_layer(10)
     train_network(user)
-    network.remove_layer(-1)
 
 
 @socketio.on('continue training')
 def continue_training():
     user_id = request.cookies.get(cookie_name)
     user = users[user_id]
-    network = user.network
-
-    network.add_layer(10)
-    train_network(user)
-    network.remove_layer(-1)
+    user.sid = request.sid
+    # A running job that hasn't reached the end of its batch yet just drops the pause request
+    if user.job_id is not None:
+        try:
+            scheduler.resume(user.job_id)
+        except ValueError:
+            # The job had already finished
+            pass
 
 
 def train_network(user):
-    network = user.network
-    for epoch in range(user.epoch):
-        print(f"Epoch {user.epoch - epoch}")
-        for index, (data, label) in user.data_set:
-
-            propagate_network(data, label, network)
-
-            if index % 10 == 0 or index == 0:
-                network_outputs = network.get_outputs()
+    def on_event(event):
+        # Batch events come from the worker thread that is training the network
+        if event['type'] == 'batch':
+            send_progress(user, event)
+        elif event['type'] == 'epoch':
+            print(f"Epoch {event['epochs'] - event['epoch']}")
 
-                # print_network_details(index, label, network, network_outputs)
-                send_network_data(user.epoch - epoch - 2, label, network_outputs)
-                send_node_data(network, user)
+    user.job_id = scheduler.submit(user.network, inputs, labels, epochs=user.epoch, batch_size=1, prefetch=4,
+                                   listener=on_event)
 
-            pause_state = user.play_pause_state
-            if pause_state == 'pause':
-                user.epoch -= epoch
-                return
 
-
-def propagate_network(data, label, network):
+def send_progress(user, event):
+    network = user.network
+    data, label = inputs[event['batch'] % len(inputs)], labels[event['batch'] % len(labels)]
     network.forward_prop(data)
-    network.back_prop(label)
-    network.update_weights(data)
-    network.update_biases()
+    network_outputs = network.get_outputs()
+
+    # print_network_details(event['batch'], label, network, network_outputs)
+    send_network_data(user, event['epochs'] - event['epoch'] - 2, label, network_outputs)
+    send_node_data(network, user)
 
 
-def send_network_data(epoch, label, network_outputs):
+def send_network_data(user, epoch, label, network_outputs):
     # TODO make these available from the network
     network_details = {
         'outputs': network_outputs,
         'networkDecision': network_outputs.index(max(network_outputs)),
-        'label': label.index(max(label)),
+        'label': int(np.argmax(label)),
         'epoch': epoch + 1,
     }
-    emit('Network Outputs', network_details)
+    socketio.emit('Network Outputs', network_details, to=user.sid)
 
 
 def print_network_details(index, label, network, network_outputs):
@@ -184,7 +169,7 @@ def print_network_details(index, label, network, network_outputs):
     for index, neuron in enumerate(network.layers[-1]):
         print(f"\t\t\t{index}: {neuron.output}")
 
-    print(f'\t\tLabel: {label.index(max(label))}   '
+    print(f'\t\tLabel: {np.argmax(label)}   '
           f'Guess: {network_outputs.index(max(network_outputs))}')
     print(f"\t\tError {network.calculate_error(label)}\n")
 
@@ -193,6 +178,7 @@ def print_network_details(index, label, network, network_outputs):
 def receive_node_data(data):
     user_id = request.cookies.get(cookie_name)
     user = users[user_id]
+    user.sid = request.sid
     network = user.network
 
     user.layer_index, user.node_index = data['layerIndex'], data['nodeIndex']
@@ -208,7 +194,7 @@ def send_node_data(network, user):
             'output': neuron.output,
             'activationType': neuron.activation_function.__name__,
         }
-        emit('neuron data', neuron_data)
+        socketio.emit('neuron data', neuron_data, to=user.sid)
 
 
 if __name__ == '__main__':